@@ -0,0 +1,383 @@
+#analysis.py
+"""
+Per-student dashboard analysis and its materialised snapshot.
+
+compute_student_analysis() builds the payload served by analysis/.
+StudentAnalysisSnapshot stores it with two counters: data_version is bumped
+by every write to a student's results or profile (mark_students_changed),
+computed_version is the data_version the stored payload was built from.
+The payload also carries the ML domain recommendation, so the fingerprint
+of the model that made it (as reported by whichever process scored it,
+the inference server included) is stored alongside. Reads (get_student_analysis)
+are one indexed lookup while both match and recompute otherwise, so a newly
+published model reaches every student on their next read.
+
+Signals cover single-row saves, and SemesterResult deletes (one row or a
+queryset) mark their students changed themselves. Other bulk paths
+(bulk_create, queryset update) send no signals and call
+mark_students_changed themselves; interactive writes then call
+refresh_snapshot so the next read is warm.
+"""
+import heapq
+import logging
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Sum
+from django.utils import timezone
+
+from apps.ml_engine import subject_classifier
+from apps.ml_engine.predictor import model_fingerprint
+
+from .models import SemesterResult, StudentAnalysisSnapshot, StudentProfile
+
+logger = logging.getLogger(__name__)
+
+
+def mark_students_changed(student_ids):
+    """Bump the data version of each student's snapshot so it is recomputed on the next read"""
+    student_ids = set(student_ids)
+    snapshots = StudentAnalysisSnapshot.objects.filter(student_id__in=student_ids)
+    if snapshots.update(data_version=F("data_version") + 1) < len(student_ids):
+        # A student without a row reads as version 0 (student_data_version): create
+        # the missing rows, then bump them all, so no write leaves a student at 0
+        StudentAnalysisSnapshot.objects.bulk_create(
+            [StudentAnalysisSnapshot(student_id=student_id) for student_id in student_ids],
+            ignore_conflicts=True
+        )
+        snapshots.update(data_version=F("data_version") + 1)
+
+
+def student_data_version(student_id):
+    """Current data version of a student's results and profile; 0 before the first write"""
+    version = StudentAnalysisSnapshot.objects.filter(student_id=student_id).values_list(
+        "data_version", flat=True
+    ).first()
+    return version or 0
+
+
+def refresh_snapshot(student_id):
+    """Recompute a student's snapshot now if it is stale"""
+    snapshot, _ = StudentAnalysisSnapshot.objects.get_or_create(student_id=student_id)
+    fingerprint = model_fingerprint()
+    if not snapshot.is_current(fingerprint):
+        return _recompute(snapshot, fingerprint)
+    return snapshot.payload
+
+
+def refresh_snapshot_on_commit(student_id):
+    transaction.on_commit(lambda: refresh_snapshot(student_id))
+
+
+def get_student_analysis(student):
+    """Return (payload, data_version), recomputing only when the snapshot is stale"""
+    snapshot, _ = StudentAnalysisSnapshot.objects.get_or_create(student=student)
+    fingerprint = model_fingerprint()
+    if not snapshot.is_current(fingerprint):
+        return _recompute(snapshot, fingerprint), snapshot.data_version
+    return snapshot.payload, snapshot.data_version
+
+
+def _recompute(snapshot, fingerprint):
+    version = snapshot.data_version
+    payload, served = compute_student_analysis_served(snapshot.student_id)
+    if served is not None:
+        # The model that actually made the recommendation, which may have been
+        # swapped since model_fingerprint() was read
+        fingerprint = served
+    # Only store it if no write landed while computing; otherwise the next read recomputes
+    StudentAnalysisSnapshot.objects.filter(pk=snapshot.pk, data_version=version).update(
+        payload=payload,
+        computed_version=version,
+        model_fingerprint=fingerprint,
+        computed_at=timezone.now()
+    )
+    snapshot.payload = payload
+    return payload
+
+
+DOMAIN_KEYS = (
+    "frontend",
+    "backend",
+    "ai_ml",
+    "cybersecurity",
+    "data_science",
+    "mobile",
+    "devops",
+    "iot",
+    "blockchain",
+    "game_dev",
+)
+
+
+def compute_student_analysis(student):
+    """
+    Full dashboard analysis for one student, as served by analysis/.
+
+    Costs three queries however many results the student has.
+    """
+    return compute_student_analysis_served(student)[0]
+
+
+def compute_student_analysis_served(student):
+    """
+    (compute_student_analysis(student), fingerprint of the model that made
+    its domain recommendation), None when no prediction was made.
+    """
+    results = SemesterResult.objects.filter(student=student)
+
+    # Query 1: per-semester average/count/total, grouped in the database
+    semester_stats = {
+        row["semester"]: row
+        for row in results.values("semester").annotate(
+            avg=Avg("marks"),
+            count=Count("id"),
+            total=Sum("marks")
+        ).order_by("semester")
+    }
+
+    if not semester_stats:
+        return {
+            "has_results": False,
+            "message": "No results uploaded yet"
+        }, None
+
+    semesters_uploaded = list(semester_stats)
+    total_subjects = sum(row["count"] for row in semester_stats.values())
+
+    # Calculate overall CGPA
+    total_marks = sum(row["total"] for row in semester_stats.values())
+    cgpa = (total_marks / (total_subjects * 100)) * 10
+
+    # Query 2: the subject rows themselves, needed for the breakdown and domain analysis
+    rows = list(
+        results.order_by("semester", "subject").values_list("semester", "subject", "marks", named=True)
+    )
+
+    subjects_by_semester = {}
+    for row in rows:
+        subjects_by_semester.setdefault(row.semester, []).append({
+            'subject': row.subject,
+            'marks': row.marks,
+            'grade': marks_to_grade(row.marks)
+        })
+
+    # SGPA for each semester
+    semester_scores = []
+    for sem in range(1, 7):
+        if sem in semester_stats:
+            sem_avg = semester_stats[sem]["avg"]
+            sgpa = (sem_avg / 100) * 10
+            semester_scores.append({
+                'semester': sem,
+                'score': round(sem_avg, 2),
+                'sgpa': round(sgpa, 2),
+                'subjects': subjects_by_semester[sem],
+                'has_data': True
+            })
+        else:
+            semester_scores.append({
+                'semester': sem,
+                'score': 0,
+                'sgpa': 0,
+                'subjects': [],
+                'has_data': False
+            })
+
+    # Query 3
+    profile = StudentProfile.objects.filter(user=student).only("assessment_domain_scores").first()
+
+    # Domain recommendation
+    domain_recommendation, fingerprint = analyze_domain(rows, profile)
+
+    return {
+        "has_results": True,
+        "cgpa": round(cgpa, 2),
+        "semesters_uploaded": semesters_uploaded,
+        "total_semesters": len(semesters_uploaded),
+        "semester_scores": semester_scores,
+        "domain_recommendation": domain_recommendation,
+        "total_subjects": total_subjects
+    }, fingerprint
+
+
+def marks_to_grade(marks):
+    """Convert marks to grade"""
+    if marks >= 90:
+        return 'O'
+    elif marks >= 80:
+        return 'A+'
+    elif marks >= 70:
+        return 'A'
+    elif marks >= 60:
+        return 'B+'
+    elif marks >= 50:
+        return 'B'
+    elif marks >= 40:
+        return 'P'
+    else:
+        return 'F'
+
+
+def _normalize_domain_scores(source_scores):
+    normalized = {key: 0.0 for key in DOMAIN_KEYS}
+    if not isinstance(source_scores, dict):
+        return normalized
+
+    for key in DOMAIN_KEYS:
+        value = source_scores.get(key, 0)
+        try:
+            numeric_value = float(value)
+        except (TypeError, ValueError):
+            numeric_value = 0.0
+        normalized[key] = max(0.0, min(100.0, numeric_value))
+
+    return normalized
+
+
+def _blend_domain_scores(marks_map, assessment_map, has_assessment_data):
+    if not has_assessment_data:
+        return marks_map
+
+    blended = {}
+    for key in DOMAIN_KEYS:
+        blended[key] = round((marks_map[key] * 0.7) + (assessment_map[key] * 0.3), 2)
+    return blended
+
+
+def domain_features(subject_marks, assessment_scores=None):
+    """
+    The model's input features for one student.
+
+    subject_marks: (subject, marks) pairs
+    assessment_scores: the profile's assessment_domain_scores, if any
+    Returns (features keyed by DOMAIN_KEYS, has_assessment_data).
+    """
+
+    # Initialize subject category scores
+    marks_map = {
+        'frontend': 0,
+        'backend': 0,
+        'ai_ml': 0,
+        'cybersecurity': 0,
+        'data_science': 0,
+        'mobile': 0,
+        'devops': 0,
+        'iot': 0,
+        'blockchain': 0,
+        'game_dev': 0
+    }
+
+    # Count for averaging
+    counts = {key: 0 for key in marks_map.keys()}
+
+    # Classify subjects and aggregate marks; each subject counts once, for its first matching category
+    for subject, marks in subject_marks:
+        category = subject_classifier.analysis_domains.first(subject)
+        if category is not None:
+            marks_map[category] += marks
+            counts[category] += 1
+
+    # Calculate averages (avoid division by zero)
+    for category in marks_map.keys():
+        if counts[category] > 0:
+            marks_map[category] = marks_map[category] / counts[category]
+        else:
+            marks_map[category] = 0
+
+    logger.debug("Marks map for prediction: %s", marks_map)
+
+    assessment_map = _normalize_domain_scores(assessment_scores or {})
+    has_assessment_data = any(score > 0 for score in assessment_map.values())
+    return _blend_domain_scores(marks_map, assessment_map, has_assessment_data), has_assessment_data
+
+
+def analyze_domain(results, profile):
+    """
+    Analyze and recommend career domain based on ML prediction.
+
+    results: rows with .subject and .marks, ordered by semester and subject
+    Returns (recommendation, fingerprint of the model that made it, or None
+    when it is unknown)
+    """
+    model_features, has_assessment_data = domain_features(
+        ((result.subject, result.marks) for result in results),
+        getattr(profile, "assessment_domain_scores", {}) if profile else {}
+    )
+
+    # Use ML predictor with blended model inputs
+    try:
+        from apps.ml_engine.predictor import predict_domain_served
+        prediction, confidence, fingerprint = predict_domain_served(model_features)
+
+        # Map ML prediction to display-friendly names
+        domain_name_mapping = {
+            'frontend': 'Frontend Development',
+            'backend': 'Backend Development',
+            'ai_ml': 'AI/ML',
+            'cybersecurity': 'Cybersecurity',
+            'data_science': 'Data Science',
+            'mobile': 'Mobile Development',
+            'devops': 'DevOps',
+            'iot': 'IoT',
+            'blockchain': 'Blockchain',
+            'game_dev': 'Game Development'
+        }
+
+        recommended_domain = domain_name_mapping.get(prediction, 'Software Engineering')
+
+        # If model confidence is weak, rely on blended-score fallback.
+        if confidence < 35:
+            top_feature_score = max(model_features.values())
+            if top_feature_score > 0:
+                prediction = max(model_features.items(), key=lambda item: item[1])[0]
+                confidence = round(top_feature_score, 2)
+
+        # Create top domains list from blended domain scores
+        sorted_categories = sorted(model_features.items(), key=lambda x: x[1], reverse=True)
+        top_domains = [
+            {
+                'domain': domain_name_mapping.get(cat, cat),
+                'score': round(score, 2)
+            }
+            for cat, score in sorted_categories[:3]
+            if score > 0
+        ]
+
+    except Exception:
+        logger.exception("ML prediction error")
+
+        # Fallback to keyword-based recommendation
+        fallback = subject_classifier.fallback_domains
+        domain_scores = {domain: 0 for domain in fallback.labels}
+
+        for result in results:
+            for domain in fallback.matches(result.subject):
+                domain_scores[domain] += result.marks
+
+        sorted_domains = sorted(domain_scores.items(), key=lambda x: x[1], reverse=True)
+        top_domains = [
+            {'domain': domain, 'score': round(score, 2)} 
+            for domain, score in sorted_domains[:3] 
+            if score > 0
+        ]
+
+        recommended_domain = top_domains[0]['domain'] if top_domains else 'Software Engineering'
+        confidence = 0
+        fingerprint = None
+
+    # Find weak and strong subjects (same picks as a stable sort, without sorting every row)
+    weak_subjects = heapq.nsmallest(3, results, key=lambda x: x.marks)
+    weak_areas = [result.subject for result in weak_subjects]
+
+    strong_subjects = heapq.nlargest(3, results, key=lambda x: x.marks)
+
+    return {
+        'recommended_domain': recommended_domain,
+        'confidence': confidence,
+        'top_domains': top_domains,
+        'weak_areas': weak_areas,
+        'strong_subjects': [s.subject for s in strong_subjects],
+        'prediction_signals': {
+            'used_assessment_answers': has_assessment_data,
+        }
+    }, fingerprint
@@ -0,0 +1,259 @@
+#bulk_import.py
+"""
+Institution-scale marks import from CSV or XLSX.
+
+Rows of (enrollment number, semester, subject, marks or grade) are streamed
+from the file and written in chunks: each chunk resolves its enrollment
+numbers with one UserProfile query and upserts its SemesterResult rows with
+one bulk statement, in the same transaction that advances the import's
+rows_processed checkpoint. An interrupted import of the same file (matched
+by SHA-256) resumes after the last committed chunk.
+
+Used by `manage.py import_marks` and, through the ingestion worker, the
+admin-only bulk-imports/ endpoint.
+"""
+import csv
+import logging
+import os
+
+from django.db import transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from apps.accounts.models import UserProfile
+
+from .analysis import mark_students_changed
+from .extraction_cache import file_digest
+from .ingestion import GRADE_TO_MARKS
+from .models import BulkMarksImport, SemesterResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+MAX_RECORDED_ERRORS = 100
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+
+COLUMN_ALIASES = {
+    "enrollment_no": ("enrollment_no", "enrollment", "enrollment_number", "enrollment no", "enrolment_no"),
+    "semester": ("semester", "sem"),
+    "subject": ("subject", "subject_name", "subject name"),
+    "marks": ("marks", "mark", "score"),
+    "grade": ("grade",),
+}
+
+
+class BulkImportError(ValueError):
+    pass
+
+
+def _columns(header):
+    """Map canonical column name -> index for a header row"""
+    names = [str(cell or "").strip().lower() for cell in header]
+    columns = {}
+    for key, aliases in COLUMN_ALIASES.items():
+        for index, name in enumerate(names):
+            if name in aliases:
+                columns[key] = index
+                break
+
+    missing = [key for key in ("enrollment_no", "semester", "subject") if key not in columns]
+    if missing or ("marks" not in columns and "grade" not in columns):
+        raise BulkImportError(
+            "Header must contain enrollment_no, semester, subject and marks or grade columns"
+        )
+    return columns
+
+
+def _csv_rows(path):
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        yield from csv.reader(fh)
+
+
+def _xlsx_rows(path):
+    # read_only streams rows instead of loading the whole sheet
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(path, file_name=None):
+    """
+    Return an iterator of dicts with the canonical column names, one per data row.
+
+    The file type is checked immediately; the header when iteration starts.
+    """
+    extension = os.path.splitext(file_name or path)[1].lower()
+    if extension == ".csv":
+        return _mapped_rows(_csv_rows(path))
+    if extension == ".xlsx":
+        return _mapped_rows(_xlsx_rows(path))
+    raise BulkImportError("Only .csv and .xlsx files can be imported")
+
+
+def _mapped_rows(rows):
+    header = next(rows, None)
+    if header is None:
+        raise BulkImportError("File is empty")
+    columns = _columns(header)
+
+    for row in rows:
+        yield {
+            key: row[index] if index < len(row) else None
+            for key, index in columns.items()
+        }
+
+
+def _text(value):
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets turn enrollment numbers into floats
+        value = int(value)
+    return str(value).strip() if value is not None else ""
+
+
+def _parse_row(row):
+    """Return (enrollment_no, semester, subject, marks) or raise ValueError"""
+    enrollment_no = _text(row["enrollment_no"])
+    if not enrollment_no:
+        raise ValueError("missing enrollment number")
+
+    try:
+        semester = int(float(_text(row["semester"])))
+    except ValueError:
+        raise ValueError(f"invalid semester {row['semester']!r}")
+    if not 1 <= semester <= 6:
+        raise ValueError(f"semester {semester} out of range")
+
+    subject = _text(row["subject"])
+    if not subject or len(subject) > 100:
+        raise ValueError("subject must be 1-100 characters")
+
+    marks = _text(row.get("marks"))
+    if marks:
+        try:
+            marks = float(marks)
+        except ValueError:
+            raise ValueError(f"invalid marks {row['marks']!r}")
+        if not 0 <= marks <= 100:
+            raise ValueError(f"marks {marks} out of range")
+    else:
+        grade = _text(row.get("grade")).upper()
+        if grade not in GRADE_TO_MARKS:
+            raise ValueError(f"needs marks or a known grade, got {row.get('grade')!r}")
+        marks = GRADE_TO_MARKS[grade]
+
+    return enrollment_no, semester, subject, marks
+
+
+def _record_error(run, message):
+    run.rows_skipped += 1
+    if len(run.errors) < MAX_RECORDED_ERRORS:
+        run.errors.append(message)
+
+
+def _write_chunk(run, chunk):
+    """chunk: list of (row number, raw row). Commits the rows and the checkpoint together."""
+    parsed = []
+    for row_number, row in chunk:
+        try:
+            parsed.append((row_number, _parse_row(row)))
+        except ValueError as e:
+            _record_error(run, f"row {row_number}: {e}")
+
+    students = dict(
+        UserProfile.objects.filter(
+            enrollment_no__in={values[0] for _, values in parsed}
+        ).values_list("enrollment_no", "user_id")
+    )
+
+    results = {}
+    for row_number, (enrollment_no, semester, subject, marks) in parsed:
+        student_id = students.get(enrollment_no)
+        if student_id is None:
+            _record_error(run, f"row {row_number}: unknown enrollment number {enrollment_no}")
+            continue
+        # A repeated row in the same chunk keeps its last value
+        results[(student_id, semester, subject)] = SemesterResult(
+            student_id=student_id,
+            semester=semester,
+            subject=subject,
+            marks=marks
+        )
+
+    with transaction.atomic():
+        SemesterResult.objects.bulk_create(
+            list(results.values()),
+            update_conflicts=True,
+            unique_fields=["student", "semester", "subject"],
+            update_fields=["marks"]
+        )
+        mark_students_changed({student_id for student_id, _, _ in results})
+        run.rows_processed += len(chunk)
+        run.rows_written += len(results)
+        run.save(update_fields=["rows_processed", "rows_written", "rows_skipped", "errors", "updated_at"])
+
+
+def _start_run(path, file_name, resume, user):
+    digest = file_digest(path)
+    if resume:
+        run = BulkMarksImport.objects.filter(
+            digest=digest
+        ).exclude(status=BulkMarksImport.STATUS_COMPLETED).first()
+        if run is not None:
+            run.status = BulkMarksImport.STATUS_RUNNING
+            run.error = ""
+            run.save(update_fields=["status", "error", "updated_at"])
+            return run
+
+    return BulkMarksImport.objects.create(file_name=file_name, digest=digest, created_by=user)
+
+
+def import_marks(path, file_name=None, chunk_size=DEFAULT_CHUNK_SIZE, resume=True, user=None, progress=None):
+    """
+    Import a CSV/XLSX of marks into SemesterResult.
+
+    resume: continue the latest unfinished import of the same file
+    progress: optional callable receiving the BulkMarksImport after each chunk
+    Returns the BulkMarksImport; it is marked FAILED (and the error re-raised)
+    if the file cannot be read.
+    """
+    file_name = file_name or os.path.basename(path)
+    rows = read_rows(path, file_name)
+    run = _start_run(path, file_name, resume, user)
+    skip = run.rows_processed
+    if skip:
+        logger.info("Resuming marks import %s after row %d", run.id, skip)
+
+    chunk = []
+    try:
+        # Data rows are numbered from 2: row 1 is the header
+        for row_number, row in enumerate(rows, 2):
+            if row_number - 2 < skip:
+                continue
+            chunk.append((row_number, row))
+            if len(chunk) >= chunk_size:
+                _write_chunk(run, chunk)
+                chunk = []
+                if progress:
+                    progress(run)
+
+        if chunk:
+            _write_chunk(run, chunk)
+            if progress:
+                progress(run)
+    except Exception as e:
+        run.status = BulkMarksImport.STATUS_FAILED
+        run.error = str(e)
+        run.save(update_fields=["status", "error", "updated_at"])
+        logger.exception("Marks import %s failed after %d rows", run.id, run.rows_processed)
+        raise
+
+    run.status = BulkMarksImport.STATUS_COMPLETED
+    run.finished_at = timezone.now()
+    run.save(update_fields=["status", "finished_at", "updated_at"])
+    logger.info(
+        "Marks import %s completed: rows=%d written=%d skipped=%d",
+        run.id, run.rows_processed, run.rows_written, run.rows_skipped
+    )
+    return run
@@ -0,0 +1,31 @@
+#etags.py
+"""
+Strong ETags for per-student read endpoints.
+
+The tag is the endpoint scope, the student id and the student's data
+version (see analysis.mark_students_changed), so computing it is one
+indexed lookup and it changes whenever the student's results or profile
+are written. Endpoints that show a career model prediction pass
+with_model=True to add the model fingerprint, so publishing a new model
+changes their tags too. Used with django.views.decorators.http.condition,
+which answers a matching If-None-Match with 304 before the view does any
+work:
+
+    @method_decorator(condition(etag_func=student_etag("analysis", with_model=True)), name="get")
+    class StudentAnalysisView(APIView):
+        ...
+"""
+from apps.ml_engine.predictor import model_fingerprint
+
+from .analysis import student_data_version
+
+
+def student_etag(scope, with_model=False):
+    def etag_func(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return None
+        tag = f"{scope}-{request.user.pk}-{student_data_version(request.user.pk)}"
+        if with_model:
+            tag = f"{tag}-{model_fingerprint()}"
+        return tag
+    return etag_func
@@ -0,0 +1,83 @@
+#extraction_cache.py
+"""
+Content-addressed cache of extracted grade sheets.
+
+Entries are keyed by the SHA-256 of the uploaded PDF plus EXTRACTOR_VERSION,
+so re-uploading the same file skips parsing and a parser change invalidates
+every older entry. The table is kept under PDF_EXTRACTION_CACHE_MAX_ENTRIES
+by evicting the least recently used rows.
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ExtractedGradeSheet
+from .pdf_extractor import EXTRACTOR_VERSION
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """content_digest() of a file, read a chunk at a time"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_cached_rows(digest):
+    """Return the cached rows for a PDF digest, or None on a miss"""
+    entry = ExtractedGradeSheet.objects.filter(
+        digest=digest,
+        extractor_version=EXTRACTOR_VERSION
+    ).only("id", "rows").first()
+
+    with _stats_lock:
+        _stats["hits" if entry else "misses"] += 1
+
+    if entry is None:
+        return None
+
+    ExtractedGradeSheet.objects.filter(id=entry.id).update(
+        hits=F("hits") + 1,
+        last_used_at=timezone.now()
+    )
+    return entry.rows
+
+
+def store_rows(digest, rows, byte_size=0):
+    ExtractedGradeSheet.objects.get_or_create(
+        digest=digest,
+        extractor_version=EXTRACTOR_VERSION,
+        defaults={"rows": rows, "byte_size": byte_size}
+    )
+    evict(settings.PDF_EXTRACTION_CACHE_MAX_ENTRIES)
+
+
+def evict(max_entries):
+    """Delete least recently used entries beyond max_entries"""
+    stale_ids = list(
+        ExtractedGradeSheet.objects.order_by("-last_used_at", "-id")
+        .values_list("id", flat=True)[max_entries:]
+    )
+    if stale_ids:
+        ExtractedGradeSheet.objects.filter(id__in=stale_ids).delete()
+    return len(stale_ids)
+
+
+def cache_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    stats["entries"] = ExtractedGradeSheet.objects.count()
+    return stats
@@ -0,0 +1,373 @@
+#ingestion.py
+import logging
+import os
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .analysis import refresh_snapshot
+from .extraction_cache import file_digest, get_cached_rows, store_rows
+from .models import ResultIngestionFile, ResultIngestionJob
+from .pdf_pool import extract_grades_from_pdfs
+from .services import replace_semester_results
+from .timing import StageTimer
+from .uploads import discard_stored_uploads, store_upload, stored_upload_path
+
+logger = logging.getLogger(__name__)
+
+GRADE_TO_MARKS = {
+    "O": 95,
+    "A+": 85,
+    "A": 75,
+    "B+": 65,
+    "B": 55,
+    "P": 45,
+    "F": 30
+}
+
+
+def grade_to_marks(grade):
+    return GRADE_TO_MARKS.get(grade, 50)
+
+
+def enqueue_result_upload(student, uploads):
+    """
+    Persist uploaded grade sheets as a pending ingestion job.
+
+    uploads: dict of semester number -> uploaded PDF file
+    Each file is moved into RESULT_UPLOAD_DIR, not read into memory.
+    """
+    stored = {}
+    try:
+        for sem, pdf_file in sorted(uploads.items()):
+            stored[sem] = store_upload(pdf_file, f"{student.pk}_sem{sem}.pdf")
+
+        with transaction.atomic():
+            job = ResultIngestionJob.objects.create(student=student)
+            ResultIngestionFile.objects.bulk_create([
+                ResultIngestionFile(
+                    job=job,
+                    semester=sem,
+                    file_name=uploads[sem].name,
+                    stored_name=name
+                )
+                for sem, name in stored.items()
+            ])
+    except BaseException:
+        discard_stored_uploads(stored.values())
+        raise
+    return job
+
+
+def enqueue_class_zip(archive, user):
+    """Queue a ZIP of a whole class's grade sheets; the archive is moved into RESULT_UPLOAD_DIR"""
+    return _enqueue_file(archive, "class.zip", kind=ResultIngestionJob.KIND_CLASS_ZIP, created_by=user)
+
+
+def enqueue_marks_import(upload, user, resume=True):
+    """Queue a CSV/XLSX marks import; the file is moved into RESULT_UPLOAD_DIR"""
+    extension = os.path.splitext(upload.name)[1].lower()
+    return _enqueue_file(
+        upload, f"marks{extension}", kind=ResultIngestionJob.KIND_MARKS_IMPORT, created_by=user, resume=resume
+    )
+
+
+def _enqueue_file(upload, name, **fields):
+    stored_name = store_upload(upload, name)
+    try:
+        return ResultIngestionJob.objects.create(file_name=upload.name, stored_name=stored_name, **fields)
+    except BaseException:
+        discard_stored_uploads([stored_name])
+        raise
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest claimable job to RUNNING and return it.
+
+    PENDING jobs are claimable, and so are RUNNING jobs whose heartbeat is
+    older than INGESTION_JOB_TIMEOUT: their worker crashed or was redeployed
+    mid-job. A job abandoned INGESTION_JOB_MAX_ATTEMPTS times is failed instead.
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.INGESTION_JOB_TIMEOUT)
+    candidates = ResultIngestionJob.objects.filter(
+        Q(status=ResultIngestionJob.STATUS_PENDING)
+        | Q(status=ResultIngestionJob.STATUS_RUNNING, heartbeat_at__lt=stale_before)
+    ).order_by("created_at").values_list("id", "status", "heartbeat_at", "attempts")[:10]
+
+    for job_id, status, heartbeat_at, attempts in candidates:
+        if status == ResultIngestionJob.STATUS_RUNNING:
+            if attempts >= settings.INGESTION_JOB_MAX_ATTEMPTS:
+                _fail_abandoned(job_id, heartbeat_at, attempts)
+                continue
+            logger.warning("Reclaiming ingestion job %s, no heartbeat since %s", job_id, heartbeat_at)
+
+        # Conditional on the state just read so two workers never pick up the same job
+        now = timezone.now()
+        claimed = ResultIngestionJob.objects.filter(
+            id=job_id,
+            status=status,
+            heartbeat_at=heartbeat_at
+        ).update(
+            status=ResultIngestionJob.STATUS_RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1
+        )
+        if claimed:
+            return ResultIngestionJob.objects.get(id=job_id)
+    return None
+
+
+def _fail_abandoned(job_id, heartbeat_at, attempts):
+    failed = ResultIngestionJob.objects.filter(
+        id=job_id,
+        status=ResultIngestionJob.STATUS_RUNNING,
+        heartbeat_at=heartbeat_at
+    ).update(
+        status=ResultIngestionJob.STATUS_FAILED,
+        error=f"Abandoned by its worker {attempts} time(s)",
+        finished_at=timezone.now()
+    )
+    if failed:
+        logger.error("Ingestion job %s abandoned %d times, marked FAILED", job_id, attempts)
+        _fail_unfinished_files(job_id, "Job abandoned by its worker")
+
+
+def _fail_unfinished_files(job_id, error):
+    """Fail a job's unprocessed PDFs and delete every upload it still holds"""
+    unfinished = ResultIngestionFile.objects.filter(job_id=job_id).exclude(
+        status=ResultIngestionJob.STATUS_COMPLETED
+    )
+    discard_stored_uploads(list(unfinished.values_list("stored_name", flat=True)))
+    discard_stored_uploads(ResultIngestionJob.objects.filter(id=job_id).values_list("stored_name", flat=True))
+    unfinished.update(status=ResultIngestionJob.STATUS_FAILED, error=error)
+
+
+def process_job(job):
+    """
+    Extract, store and score every semester PDF attached to a job, or
+    ingest a queued class ZIP or marks file and keep its report on the job.
+
+    Never raises: an unexpected error marks the job FAILED with its message.
+    """
+    try:
+        if job.kind == ResultIngestionJob.KIND_CLASS_ZIP:
+            return _run_class_zip(job)
+        if job.kind == ResultIngestionJob.KIND_MARKS_IMPORT:
+            return _run_marks_import(job)
+        return _run_job(job)
+    except Exception as e:
+        logger.exception("Ingestion job %s failed", job.id)
+        _fail_unfinished_files(job.id, str(e))
+        job.status = ResultIngestionJob.STATUS_FAILED
+        job.error = "\n".join(filter(None, [job.error, str(e)]))
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
+        return job
+
+
+def _run_job(job):
+    failures = []
+    timer = StageTimer()
+    files = list(job.files.all())
+    # A reclaimed job keeps the semesters its previous attempt completed
+    uploads = [upload for upload in files if upload.status != ResultIngestionJob.STATUS_COMPLETED]
+
+    if job.started_at is None:
+        job.started_at = timezone.now()
+
+    job.files.exclude(status=ResultIngestionJob.STATUS_COMPLETED).update(status=ResultIngestionJob.STATUS_RUNNING)
+    parsed = _extract_uploads(uploads, timer)
+
+    for upload in uploads:
+        try:
+            result = parsed[upload.semester]
+            if isinstance(result, Exception):
+                raise result
+            extracted, upload.extraction_tier = result
+            with timer.stage("db_write"):
+                upload.subjects = _store_semester(job.student, upload.semester, extracted)
+            upload.status = ResultIngestionJob.STATUS_COMPLETED
+        except Exception as e:
+            logger.exception("Ingestion job %s: semester %s failed", job.id, upload.semester)
+            upload.status = ResultIngestionJob.STATUS_FAILED
+            upload.error = str(e)
+            failures.append(f"Semester {upload.semester} failed: {str(e)}")
+
+        # The PDF itself is never kept once it has been processed
+        discard_stored_uploads([upload.stored_name])
+        upload.save(update_fields=["status", "subjects", "extraction_tier", "error"])
+
+    completed = any(upload.status == ResultIngestionJob.STATUS_COMPLETED for upload in files)
+    if completed:
+        # The recommendation the dashboard shows, predicted from the same blended domain features
+        with timer.stage("snapshot"):
+            analysis = refresh_snapshot(job.student_id)
+        job.domain_recommendation = analysis.get("domain_recommendation", {})
+
+    job.status = ResultIngestionJob.STATUS_COMPLETED if completed else ResultIngestionJob.STATUS_FAILED
+    job.error = "\n".join(failures)
+    job.finished_at = timezone.now()
+    job.timings = timer.as_dict()
+    job.timings["queue_wait"] = round((job.started_at - job.created_at).total_seconds() * 1000, 2)
+    job.timings["total"] = round((job.finished_at - job.started_at).total_seconds() * 1000, 2)
+    job.save(update_fields=["status", "error", "domain_recommendation", "timings", "started_at", "finished_at"])
+
+    logger.info(
+        "Ingestion job %s %s: files=%d subjects=%d %s",
+        job.id,
+        job.status,
+        len(uploads),
+        sum(len(upload.subjects) for upload in uploads),
+        " ".join(f"{name}={ms}ms" for name, ms in job.timings.items())
+    )
+    return job
+
+
+def _run_class_zip(job):
+    from .zip_ingestion import ingest_grade_sheet_zip
+
+    def progress(done, total):
+        # Doubles as the heartbeat that keeps a long archive from being reclaimed
+        ResultIngestionJob.objects.filter(id=job.id).update(
+            heartbeat_at=timezone.now(),
+            report={"progress": {"processed": done, "total": total}}
+        )
+
+    if job.started_at is None:
+        job.started_at = timezone.now()
+
+    try:
+        job.report = ingest_grade_sheet_zip(stored_upload_path(job.stored_name), progress=progress)
+        job.status = ResultIngestionJob.STATUS_COMPLETED
+        job.error = ""
+    except zipfile.BadZipFile:
+        job.status = ResultIngestionJob.STATUS_FAILED
+        job.error = "File is not a valid ZIP archive"
+    return _finish_file_job(job)
+
+
+def _marks_import_report(run):
+    return {
+        "import_id": run.id,
+        "rows_processed": run.rows_processed,
+        "rows_written": run.rows_written,
+        "rows_skipped": run.rows_skipped,
+        "errors": run.errors,
+    }
+
+
+def _run_marks_import(job):
+    from .bulk_import import BulkImportError, import_marks
+
+    def progress(run):
+        # Doubles as the heartbeat; a reclaimed job resumes after the last committed chunk
+        ResultIngestionJob.objects.filter(id=job.id).update(
+            heartbeat_at=timezone.now(),
+            report=_marks_import_report(run)
+        )
+
+    if job.started_at is None:
+        job.started_at = timezone.now()
+
+    try:
+        run = import_marks(
+            stored_upload_path(job.stored_name),
+            file_name=job.file_name,
+            resume=job.resume,
+            user=job.created_by,
+            progress=progress
+        )
+        job.report = _marks_import_report(run)
+        job.status = ResultIngestionJob.STATUS_COMPLETED
+        job.error = ""
+    except BulkImportError as e:
+        job.status = ResultIngestionJob.STATUS_FAILED
+        job.error = str(e)
+    return _finish_file_job(job)
+
+
+def _finish_file_job(job):
+    """Delete a class ZIP or marks job's stored file and record its outcome"""
+    discard_stored_uploads([job.stored_name])
+
+    job.finished_at = timezone.now()
+    job.timings = {
+        "queue_wait": round((job.started_at - job.created_at).total_seconds() * 1000, 2),
+        "total": round((job.finished_at - job.started_at).total_seconds() * 1000, 2),
+    }
+    job.save(update_fields=["status", "error", "report", "timings", "started_at", "finished_at"])
+    return job
+
+
+def _extract_uploads(uploads, timer):
+    """
+    Extract (rows, tier) for every upload, parsing only sheets missing from the cache.
+
+    Stored uploads are hashed and parsed in place. Cache hits are reported
+    with the "cache" tier. Stage timings reported by the parser processes
+    are summed into timer, so page_extract/row_parse are CPU time across
+    files while parse is the wall-clock time of the pool.
+    """
+    digests = {}
+    to_parse = {}
+    extracted = {}
+    unreadable = {}
+
+    for upload in uploads:
+        path = stored_upload_path(upload.stored_name)
+        try:
+            digest = file_digest(path)
+        except OSError as e:
+            unreadable[upload.semester] = ValueError(f"Uploaded file could not be read: {e}")
+            continue
+        digests[upload.semester] = digest
+        # Parsers memory-map the file; the same sheet uploaded twice is parsed once
+        to_parse.setdefault(digest, path)
+
+    with timer.stage("cache_lookup"):
+        for digest in list(to_parse):
+            cached = get_cached_rows(digest)
+            if cached is not None:
+                extracted[digest] = (cached, "cache")
+                del to_parse[digest]
+
+    if to_parse:
+        with timer.stage("parse"):
+            fresh = extract_grades_from_pdfs(
+                to_parse,
+                workers=settings.PDF_PARSE_WORKERS,
+                timeout=settings.PDF_PARSE_TIMEOUT,
+                memory_limit_mb=settings.PDF_PARSE_MEMORY_LIMIT_MB
+            )
+        for digest, result in fresh.items():
+            if isinstance(result, Exception):
+                extracted[digest] = result
+                continue
+            rows, tier, timings = result
+            timer.merge(timings)
+            store_rows(digest, rows, os.path.getsize(to_parse[digest]))
+            extracted[digest] = (rows, tier)
+
+    return {**unreadable, **{sem: extracted[digest] for sem, digest in digests.items()}}
+
+
+def _store_semester(student, semester, extracted):
+    if not extracted:
+        raise ValueError("PDF parsed but no grade data found (unsupported format)")
+
+    saved_subjects = [
+        {"subject": item["subject"], "grade": item["grade"], "marks": grade_to_marks(item["grade"])}
+        for item in extracted
+    ]
+    # A subject listed twice keeps its last grade, as the per-row upsert used to
+    replace_semester_results(student, {
+        semester: {item["subject"]: item["marks"] for item in saved_subjects}
+    })
+    return saved_subjects
+
@@ -0,0 +1,168 @@
+#layout_templates.py
+"""
+Coordinate-based extraction for grade sheets from known issuers.
+
+Instead of running pdfplumber's table detection, a template learns the
+x-ranges of the Subject Code / Subject Name / Grade columns from the header
+line of page.extract_words() and reads each subject straight from the word
+coordinates inside the table region. A template returns None whenever the
+page does not look like its layout, so the caller can fall back to the
+generic extract_tables() path.
+
+Templates are shared by every document, so they hold no per-document
+state: the columns learned from a header are returned to the caller,
+which passes them back for the document's later pages without one.
+"""
+import re
+
+SUBJECT_CODE_RE = re.compile(r"^\d{8}$")
+VALID_GRADES = {"O", "A+", "A", "B+", "B", "P", "F", "F1", "F2", "F3"}
+
+# Horizontal gap (pt) that separates two header phrases / columns
+COLUMN_GAP = 6.0
+# Words whose tops are within this distance (pt) belong to the same line
+LINE_TOLERANCE = 3.0
+# Slack (pt) added to the left edge of each learned column range
+COLUMN_PADDING = 4.0
+
+
+def group_lines(words, tolerance=LINE_TOLERANCE):
+    """Group words into lines ordered top to bottom, each line ordered left to right"""
+    lines = []
+    for word in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if lines and abs(word["top"] - lines[-1][0]["top"]) <= tolerance:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda w: w["x0"]) for line in lines]
+
+
+def _phrases(line):
+    """Split a line into phrases separated by column-sized gaps"""
+    phrases = []
+    for word in line:
+        if phrases and word["x0"] - phrases[-1]["x1"] <= COLUMN_GAP:
+            phrases[-1]["text"] += " " + word["text"]
+            phrases[-1]["x1"] = word["x1"]
+            phrases[-1]["bottom"] = max(phrases[-1]["bottom"], word["bottom"])
+        else:
+            phrases.append({
+                "text": word["text"],
+                "x0": word["x0"],
+                "x1": word["x1"],
+                "bottom": word["bottom"],
+            })
+    return phrases
+
+
+class LayoutTemplate:
+    def __init__(self, issuer, markers, code_label, name_label, grade_label):
+        self.issuer = issuer
+        self.markers = tuple(m.lower() for m in markers)
+        self.labels = {
+            "code": code_label.lower(),
+            "name": name_label.lower(),
+            "grade": grade_label.lower(),
+        }
+
+    def matches(self, text):
+        text = text.lower()
+        return any(marker in text for marker in self.markers)
+
+    def learn(self, lines):
+        """
+        Find the header line and derive column x-ranges from it.
+
+        Returns (columns, y coordinate where the table body starts), or (None, None).
+        """
+        for line in lines:
+            phrases = _phrases(line)
+            positions = {}
+            for index, phrase in enumerate(phrases):
+                for key, label in self.labels.items():
+                    if phrase["text"].lower() == label:
+                        positions[key] = index
+
+            if len(positions) != len(self.labels):
+                continue
+
+            columns = {}
+            for key, index in positions.items():
+                start = phrases[index]["x0"] - COLUMN_PADDING
+                if index + 1 < len(phrases):
+                    end = phrases[index + 1]["x0"] - COLUMN_PADDING
+                else:
+                    end = float("inf")
+                columns[key] = (start, end)
+
+            return columns, max(p["bottom"] for p in phrases)
+
+        return None, None
+
+    def _cell(self, columns, line, key):
+        start, end = columns[key]
+        return " ".join(w["text"] for w in line if start <= w["x0"] < end)
+
+    def extract(self, words, columns=None):
+        """
+        Extract [{subject, grade}] rows from one page's words.
+
+        columns: learned from an earlier page of the same document, used
+        when this page has no header
+        Returns (rows, columns); rows is None when the page does not fit
+        this template.
+        """
+        lines = group_lines(words)
+        learned, body_top = self.learn(lines)
+        columns = learned or columns
+        if columns is None:
+            return None, None
+        return self._read_rows(lines, columns, body_top), columns
+
+    def _read_rows(self, lines, columns, body_top):
+        rows = []
+        current = None
+
+        for line in lines:
+            if body_top is not None and line[0]["top"] <= body_top:
+                continue
+
+            code = self._cell(columns, line, "code")
+            name = self._cell(columns, line, "name")
+            grade = self._cell(columns, line, "grade").upper()
+
+            if name.lower() == "total" and not code:
+                break
+
+            if SUBJECT_CODE_RE.match(code):
+                if grade not in VALID_GRADES:
+                    return None
+                current = {"subject": name, "grade": grade}
+                rows.append(current)
+            elif current is not None and name and not code and not grade:
+                # Wrapped subject name continues on the next line
+                current["subject"] += " " + name
+            elif code or grade:
+                # Something in the code/grade columns we cannot read: wrong layout
+                if rows:
+                    return None
+
+        return rows or None
+
+
+TEMPLATES = [
+    LayoutTemplate(
+        issuer="Parul University",
+        markers=("parul university",),
+        code_label="Subject Code",
+        name_label="Subject Name",
+        grade_label="Grade",
+    ),
+]
+
+
+def match_template(text):
+    for template in TEMPLATES:
+        if template.matches(text):
+            return template
+    return None
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.academics.bulk_import import DEFAULT_CHUNK_SIZE, BulkImportError, import_marks
+
+
+class Command(BaseCommand):
+    help = "Import marks for many students from a CSV or XLSX file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV/XLSX with enrollment_no, semester, subject and marks or grade columns")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Rows written per transaction",
+        )
+        parser.add_argument(
+            "--no-resume",
+            action="store_true",
+            help="Start over instead of resuming an unfinished import of the same file",
+        )
+
+    def handle(self, *args, **options):
+        def progress(run):
+            self.stdout.write(
+                f"  {run.rows_processed} rows processed "
+                f"({run.rows_written} written, {run.rows_skipped} skipped)"
+            )
+
+        try:
+            run = import_marks(
+                options["path"],
+                chunk_size=options["chunk_size"],
+                resume=not options["no_resume"],
+                progress=progress,
+            )
+        except (BulkImportError, OSError) as e:
+            raise CommandError(str(e))
+
+        for message in run.errors:
+            self.stdout.write(self.style.WARNING(message))
+        self.stdout.write(self.style.SUCCESS(
+            f"Import {run.id} completed: {run.rows_written} rows written, {run.rows_skipped} skipped"
+        ))
@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.academics.zip_ingestion import DEFAULT_BATCH_SIZE, ingest_grade_sheet_zip
+
+
+class Command(BaseCommand):
+    help = "Ingest a ZIP of grade-sheet PDFs named <enrollment>_sem<N>.pdf for a whole class"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="ZIP archive of grade-sheet PDFs")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="PDFs parsed and written per transaction",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the full per-file report as JSON",
+        )
+
+    def handle(self, *args, **options):
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} files processed")
+
+        try:
+            report = ingest_grade_sheet_zip(
+                options["path"],
+                batch_size=options["batch_size"],
+                progress=progress,
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for item in report["files"]:
+            if item["status"] != "COMPLETED":
+                self.stdout.write(self.style.WARNING(f"{item['status']:9} {item['file']}: {item['error']}"))
+
+        totals = report["totals"]
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['completed']}/{totals['files']} files ingested "
+            f"({totals['failed']} failed, {totals['skipped']} skipped, {totals['subjects']} subjects) "
+            f"in {report['seconds']}s, {report['files_per_sec']} files/s"
+        ))
@@ -0,0 +1,55 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.academics.ingestion import claim_next_job, process_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Process queued grade-sheet ingestion jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Ingestion worker started")
+
+        while True:
+            try:
+                job = claim_next_job()
+            except Exception:
+                if options["once"]:
+                    raise
+                # e.g. the database is briefly unreachable; keep the worker alive
+                logger.exception("Could not claim an ingestion job")
+                time.sleep(options["poll_interval"])
+                continue
+
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Processing ingestion job {job.id}")
+            try:
+                job = process_job(job)
+            except Exception:
+                # process_job records its own failures; this only happens when that write fails too.
+                # The job stays RUNNING and is reclaimed after INGESTION_JOB_TIMEOUT.
+                logger.exception("Ingestion job %s could not be processed", job.id)
+                continue
+            self.stdout.write(f"Ingestion job {job.id} finished: {job.status}")
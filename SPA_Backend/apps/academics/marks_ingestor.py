@@ -1,28 +1,46 @@
 #marks_ingestor.py
-from academics.models import Subject, StudentMark
+from .models import StudentMark
+from .subject_catalogue import get_subjects_by_code
 
-def ingest_grades(user, extracted_data):
-    saved = 0
-    skipped = 0
+
+def ingest_grades(user, extracted_data, batch_size=1000):
+    """
+    Store grade points for subjects found in the Subject catalogue.
+
+    extracted_data: [{"code", "grade_point"}]
+    Codes are resolved against the cached Subject catalogue and all marks are
+    upserted with one conflict-aware INSERT per batch_size rows, so the query
+    count does not depend on the number of subjects. A code listed twice
+    keeps its last grade.
+    Returns {"saved", "skipped", "skipped_codes"}.
+    """
+    subjects = get_subjects_by_code()
+
+    marks = {}
+    skipped_codes = []
 
     for item in extracted_data:
-        try:
-            subject = Subject.objects.get(code=item["code"])
-        except Subject.DoesNotExist:
-            skipped += 1
+        subject = subjects.get(item["code"])
+        if subject is None:
+            skipped_codes.append(item["code"])
             continue
 
-        StudentMark.objects.update_or_create(
+        marks[subject.id] = StudentMark(
             student=user,
-            subject=subject,
-            defaults={
-                "semester": subject.semester,
-                "marks": item["grade_point"]  # marks field now stores grade_point
-            }
+            subject_id=subject.id,
+            semester=subject.semester,
+            marks=item["grade_point"]  # marks field now stores grade_point
         )
-        saved += 1
 
-    if saved == 0:
+    if not marks:
         raise ValueError("No subjects matched syllabus")
 
-    return {"saved": saved, "skipped": skipped}
+    StudentMark.objects.bulk_create(
+        list(marks.values()),
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["student", "subject"],
+        update_fields=["semester", "marks"]
+    )
+
+    return {"saved": len(marks), "skipped": len(skipped_codes), "skipped_codes": skipped_codes}
@@ -0,0 +1,55 @@
+#metrics.py
+from django.db.models import Count
+
+from .extraction_cache import cache_stats
+from .models import ResultIngestionFile, ResultIngestionJob
+
+
+def extraction_tier_counts():
+    """How many processed grade sheets each extraction tier (or the cache) served"""
+    rows = ResultIngestionFile.objects.exclude(extraction_tier="").values(
+        "extraction_tier"
+    ).annotate(files=Count("id"))
+    return {row["extraction_tier"]: row["files"] for row in rows}
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def stage_timing_summary(limit=100):
+    """avg/p50/p95/max milliseconds per pipeline stage over the latest finished result-PDF jobs"""
+    recent = ResultIngestionJob.objects.filter(kind=ResultIngestionJob.KIND_RESULT_PDFS).exclude(
+        finished_at=None
+    ).order_by(
+        "-finished_at"
+    ).values_list("timings", flat=True)[:limit]
+
+    samples = {}
+    for timings in recent:
+        for stage, ms in (timings or {}).items():
+            samples.setdefault(stage, []).append(ms)
+
+    summary = {}
+    for stage, values in samples.items():
+        values.sort()
+        summary[stage] = {
+            "count": len(values),
+            "avg": round(sum(values) / len(values), 2),
+            "p50": _percentile(values, 0.5),
+            "p95": _percentile(values, 0.95),
+            "max": values[-1],
+        }
+    return summary
+
+
+def ingestion_metrics(limit=100):
+    return {
+        "jobs_by_status": dict(
+            ResultIngestionJob.objects.values_list("status").annotate(jobs=Count("id"))
+        ),
+        "extraction_tiers": extraction_tier_counts(),
+        "extraction_cache": cache_stats(),
+        "stage_timings_ms": stage_timing_summary(limit),
+    }
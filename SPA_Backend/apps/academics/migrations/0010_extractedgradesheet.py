@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 05:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0009_resultingestionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractedGradeSheet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64)),
+                ('extractor_version', models.CharField(max_length=20)),
+                ('rows', models.JSONField(default=list)),
+                ('byte_size', models.PositiveIntegerField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'unique_together': {('digest', 'extractor_version')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0010_extractedgradesheet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultingestionfile',
+            name='extraction_tier',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 05:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0011_resultingestionfile_extraction_tier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultingestionjob',
+            name='timings',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-18 05:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('academics', '0014_bulkmarksimport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentAnalysisSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('data_version', models.PositiveIntegerField(default=0)),
+                ('computed_version', models.PositiveIntegerField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0015_studentanalysissnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultingestionjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resultingestionjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0016_resultingestionjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultingestionfile',
+            name='stored_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Creates the DatabaseCache table that CACHES["default"] uses by default, so
+# `migrate` alone leaves a working shared cache. createcachetable skips
+# tables that already exist and backends that are not database caches.
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0017_resultingestionfile_stored_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-18 06:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('academics', '0018_create_cache_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultingestionjob',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_ingestion_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='resultingestionjob',
+            name='file_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='resultingestionjob',
+            name='kind',
+            field=models.CharField(choices=[('RESULT_PDFS', 'Student result PDFs'), ('CLASS_ZIP', 'Class ZIP archive')], default='RESULT_PDFS', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='resultingestionjob',
+            name='report',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='resultingestionjob',
+            name='stored_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='resultingestionjob',
+            name='student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ingestion_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0019_class_zip_ingestion_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentanalysissnapshot',
+            name='model_fingerprint',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Creates the DatabaseCache table behind CACHES["state"], added after 0018
+# had already run. createcachetable skips tables that already exist and
+# backends that are not database caches.
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0020_studentanalysissnapshot_model_fingerprint'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
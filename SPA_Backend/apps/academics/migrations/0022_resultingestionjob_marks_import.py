@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0021_create_state_cache_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultingestionjob',
+            name='resume',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='resultingestionjob',
+            name='kind',
+            field=models.CharField(choices=[('RESULT_PDFS', 'Student result PDFs'), ('CLASS_ZIP', 'Class ZIP archive'), ('MARKS_IMPORT', 'CSV/XLSX marks import')], default='RESULT_PDFS', max_length=20),
+        ),
+    ]
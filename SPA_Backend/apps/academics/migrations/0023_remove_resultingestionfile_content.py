@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 06:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0022_resultingestionjob_marks_import'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='resultingestionfile',
+            name='content',
+        ),
+    ]
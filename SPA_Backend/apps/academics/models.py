@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 
 # Create your models here.
@@ -35,6 +35,24 @@ class StudentProfile(models.Model):
         return self.user.email
 
 
+class SemesterResultQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the rows and mark their students' analysis snapshots stale"""
+        from .analysis import mark_students_changed
+
+        # One SELECT for the students keeps the DELETE itself a single fast query,
+        # which a post_delete receiver would turn into a fetch and a signal per row
+        student_ids = set(self.order_by().values_list("student_id", flat=True).distinct())
+        with transaction.atomic(using=self.db, savepoint=False):
+            deleted = super().delete()
+            if student_ids:
+                mark_students_changed(student_ids)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class SemesterResult(models.Model):
     SEMESTER_CHOICES = [(i, f"Semester {i}") for i in range(1, 7)]
 
@@ -44,6 +62,8 @@ class SemesterResult(models.Model):
     subject = models.CharField(max_length=100)
     marks = models.FloatField()
 
+    objects = SemesterResultQuerySet.as_manager()
+
 
     class Meta:
         unique_together = ('student', 'semester', 'subject')
@@ -51,6 +71,14 @@ class SemesterResult(models.Model):
 
     def __str__(self):
         return f"{self.student} | Sem {self.semester} | {self.subject}"
+
+    def delete(self, *args, **kwargs):
+        from .analysis import mark_students_changed
+
+        with transaction.atomic(savepoint=False):
+            deleted = super().delete(*args, **kwargs)
+            mark_students_changed([self.student_id])
+        return deleted
     
 class Subject(models.Model):
     code = models.CharField(max_length=20, unique=True)
@@ -71,6 +99,44 @@ class Subject(models.Model):
     weightage = models.FloatField()  # academic importance
 
 
+class StudentMark(models.Model):
+    """Grade point per catalogue Subject, written by marks_ingestor.ingest_grades"""
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name="subject_marks")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="student_marks")
+    semester = models.IntegerField()
+    marks = models.FloatField()  # grade point
+
+    class Meta:
+        unique_together = ("student", "subject")
+
+    def __str__(self):
+        return f"{self.student} | {self.subject.code} | {self.marks}"
+
+
+class StudentAnalysisSnapshot(models.Model):
+    """Materialised analysis/ payload; see apps/academics/analysis.py"""
+    student = models.OneToOneField(User, on_delete=models.CASCADE, related_name="analysis_snapshot")
+    payload = models.JSONField(default=dict, blank=True)
+    # Bumped on every write to the student's results or profile
+    data_version = models.PositiveIntegerField(default=0)
+    # data_version the payload was computed from; None until first computed
+    computed_version = models.PositiveIntegerField(blank=True, null=True)
+    # Career model the payload's domain recommendation came from (predictor.model_fingerprint)
+    model_fingerprint = models.CharField(max_length=255, blank=True)
+    computed_at = models.DateTimeField(blank=True, null=True)
+
+    @property
+    def is_stale(self):
+        return self.computed_version != self.data_version
+
+    def is_current(self, model_fingerprint):
+        """Built from the current data and by the model serving predictions now"""
+        return not self.is_stale and self.model_fingerprint == model_fingerprint
+
+    def __str__(self):
+        return f"{self.student} | v{self.data_version}"
+
+
 class ProctoringEvent(models.Model):
     EVENT_TYPE_CHOICES = [
         ("ASSESSMENT_STARTED", "Assessment Started"),
@@ -108,3 +174,154 @@ class ProctoringEvent(models.Model):
 
     def __str__(self):
         return f"{self.user} | {self.event_type} | {self.server_timestamp.isoformat()}"
+
+
+class ResultIngestionJob(models.Model):
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_COMPLETED = "COMPLETED"
+    STATUS_FAILED = "FAILED"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    KIND_RESULT_PDFS = "RESULT_PDFS"
+    KIND_CLASS_ZIP = "CLASS_ZIP"
+    KIND_MARKS_IMPORT = "MARKS_IMPORT"
+    KIND_CHOICES = [
+        (KIND_RESULT_PDFS, "Student result PDFs"),
+        (KIND_CLASS_ZIP, "Class ZIP archive"),
+        (KIND_MARKS_IMPORT, "CSV/XLSX marks import"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_RESULT_PDFS)
+    # The student whose PDFs these are; empty for a class ZIP or marks import
+    student = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="ingestion_jobs",
+        null=True,
+        blank=True
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name="created_ingestion_jobs",
+        null=True,
+        blank=True
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    error = models.TextField(blank=True)
+    # Class ZIP / marks import: the upload name and its name in RESULT_UPLOAD_DIR until processed
+    file_name = models.CharField(max_length=255, blank=True)
+    stored_name = models.CharField(max_length=255, blank=True)
+    # Class ZIP: progress while running, then ingest_grade_sheet_zip()'s per-file report.
+    # Marks import: the BulkMarksImport's counters, updated after every chunk
+    report = models.JSONField(default=dict, blank=True)
+    # Marks import: continue an unfinished import of the same file
+    resume = models.BooleanField(default=True)
+    domain_recommendation = models.JSONField(default=dict, blank=True)
+    # Milliseconds spent per pipeline stage (open, page_extract, row_parse, db_write, ...)
+    timings = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    # Refreshed while a worker holds the job; a RUNNING job whose heartbeat is
+    # older than INGESTION_JOB_TIMEOUT was abandoned and may be claimed again
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        owner = self.student if self.kind == self.KIND_RESULT_PDFS else self.file_name
+        return f"{owner} | Job {self.pk} | {self.status}"
+
+
+class ResultIngestionFile(models.Model):
+    job = models.ForeignKey(ResultIngestionJob, on_delete=models.CASCADE, related_name="files")
+    semester = models.PositiveSmallIntegerField(choices=SemesterResult.SEMESTER_CHOICES)
+    file_name = models.CharField(max_length=255, blank=True)
+    # Name in RESULT_UPLOAD_DIR of the queued PDF, deleted once the worker has processed it
+    stored_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=ResultIngestionJob.STATUS_CHOICES,
+        default=ResultIngestionJob.STATUS_PENDING
+    )
+    subjects = models.JSONField(default=list, blank=True)
+    # Which pdf_extractor tier (or the extraction cache) produced the rows
+    extraction_tier = models.CharField(max_length=20, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["semester"]
+        unique_together = ("job", "semester")
+
+    def __str__(self):
+        return f"Job {self.job_id} | Sem {self.semester} | {self.status}"
+
+
+class ExtractedGradeSheet(models.Model):
+    """Rows extracted from a grade-sheet PDF, keyed by the SHA-256 of its bytes"""
+    digest = models.CharField(max_length=64)
+    extractor_version = models.CharField(max_length=20)
+    rows = models.JSONField(default=list)
+    byte_size = models.PositiveIntegerField(default=0)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ("digest", "extractor_version")
+
+    def __str__(self):
+        return f"{self.digest[:12]} | v{self.extractor_version} | {len(self.rows)} rows"
+
+
+class BulkMarksImport(models.Model):
+    """
+    One CSV/XLSX marks import. rows_processed is the resume checkpoint: it is
+    committed together with each chunk of SemesterResult rows.
+    """
+    STATUS_RUNNING = "RUNNING"
+    STATUS_COMPLETED = "COMPLETED"
+    STATUS_FAILED = "FAILED"
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    file_name = models.CharField(max_length=255)
+    digest = models.CharField(max_length=64, db_index=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="bulk_marks_imports"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    rows_skipped = models.PositiveIntegerField(default=0)
+    # First MAX_RECORDED_ERRORS row problems, e.g. "row 12: unknown enrollment number 2203..."
+    errors = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.file_name} | {self.status} | {self.rows_processed} rows"
@@ -1,158 +1,270 @@
-import pdfplumber
+import logging
 import re
 
-def extract_grades_from_pdf(pdf_file):
+import pdfplumber
+
+from .layout_templates import match_template
+from .timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the parsing logic changes so cached extractions are not reused
+EXTRACTOR_VERSION = "3"
+
+# Extraction tiers, cheapest first. A file is attributed to the most expensive tier any page needed.
+EXTRACTION_TIERS = ("text", "template", "tables")
+
+SUBJECT_LINE_RE = re.compile(
+    r"^(?P<code>\d{8})\s+(?P<name>.+?)\s+\d+(?:\.\d+)?\s+(?P<grade>O|A\+|A|B\+|B|P|F[1-3]?)$"
+)
+SUBJECT_CODE_RE = re.compile(r"(?<!\d)\d{8}(?!\d)")
+
+
+def extract_grades_from_pdf(pdf_file, timer=None):
     """Extract grades from Parul University grade sheet PDF"""
+    extracted, _ = extract_grade_sheet(pdf_file, timer)
+    return extracted
+
+
+def extract_grade_sheet(pdf_file, timer=None):
+    """
+    Extract grades trying the text layer, then the issuer layout template,
+    then full table detection.
+
+    timer: optional StageTimer that receives open/page_extract/row_parse durations
+    Returns (rows, tier) where tier names the most expensive extraction tier used.
+    """
+    timer = timer or StageTimer()
     extracted = []
+    template = None
+    # Template columns learned from this document's header, for its pages without one
+    template_columns = None
+    tier_index = 0
+
+    with timer.stage("open"):
+        pdf = pdfplumber.open(pdf_file)
     
-    with pdfplumber.open(pdf_file) as pdf:
-        print(f"[DEBUG] Total pages in PDF: {len(pdf.pages)}")
+    with pdf:
+        logger.debug("Total pages in PDF: %d", len(pdf.pages))
         
         for page_num, page in enumerate(pdf.pages, 1):
-            print(f"\n[DEBUG] === PAGE {page_num} ===")
+            # Tier 1: regex over the page text stream
+            with timer.stage("page_extract"):
+                text = page.extract_text() or ""
+            with timer.stage("row_parse"):
+                if template is None:
+                    template = match_template(text)
+                rows = _extract_page_text(text)
+            tier = "text"
+
+            # Tier 2: read known issuer layouts straight from word coordinates
+            if rows is None and template is not None:
+                logger.debug("Page %d: text layer failed validation, trying layout template", page_num)
+                with timer.stage("page_extract"):
+                    words = page.extract_words()
+                with timer.stage("row_parse"):
+                    rows, template_columns = template.extract(words, template_columns)
+                tier = "template"
+
+            # Tier 3: table detection plus merged-row reconstruction
+            if rows is None:
+                logger.debug("Page %d: falling back to table extraction", page_num)
+                rows = _extract_page_tables(page, timer)
+                tier = "tables"
+
+            logger.debug("Page %d served by %s tier: %d subjects", page_num, tier, len(rows))
+            extracted.extend(rows)
+            tier_index = max(tier_index, EXTRACTION_TIERS.index(tier))
+
+            # Drop the page's cached chars/layout so memory stays flat across long documents
+            page.close()
+    
+    if not extracted:
+        logger.warning("No grade data extracted from PDF")
+        raise ValueError("No grade data extracted from PDF")
+    
+    tier = EXTRACTION_TIERS[tier_index]
+    logger.info("Extracted %d subjects (%s tier) in %s", len(extracted), tier, timer.summary())
+    
+    return extracted, tier
+
+
+def _extract_page_text(text):
+    """
+    Text-layer path: one subject per line, wrapped names on the following lines.
+
+    Returns None when the result cannot be trusted (no rows, a subject code
+    that did not parse, or a wrapped name with no row/Total line after it).
+    """
+    rows = []
+    pending = []
+    codes_seen = 0
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+
+        codes_seen += len(SUBJECT_CODE_RE.findall(line))
+        match = SUBJECT_LINE_RE.match(line)
+        if match:
+            if pending and rows:
+                rows[-1]["subject"] += " " + " ".join(pending)
+            pending = []
+            rows.append({"subject": match.group("name"), "grade": match.group("grade")})
+        elif line.lower() == "total":
+            if pending and rows:
+                rows[-1]["subject"] += " " + " ".join(pending)
+            pending = []
+            break
+        elif rows:
+            pending.append(line)
+
+    # Every subject code above the Total line must have produced a row
+    if not rows or pending or codes_seen != len(rows):
+        return None
+
+    return rows
+
+
+def _extract_page_tables(page, timer):
+    """Generic path: table detection plus merged-row reconstruction"""
+    # Extract tables from the page
+    with timer.stage("page_extract"):
+        tables = page.extract_tables()
+    logger.debug("Number of tables found: %d", len(tables) if tables else 0)
+
+    with timer.stage("row_parse"):
+        return _parse_tables(tables or [])
+
+
+def _parse_tables(tables):
+    extracted = []
+    
+    for table_num, table in enumerate(tables, 1):
+        logger.debug("Processing table %d with %d rows", table_num, len(table))
+        
+        for row_num, row in enumerate(table):
+            if not row or len(row) < 4:
+                continue
             
-            # Extract tables from the page
-            tables = page.extract_tables()
-            print(f"[DEBUG] Number of tables found: {len(tables) if tables else 0}")
+            # Clean all cells
+            cleaned_row = [safe_strip(cell) for cell in row]
             
-            if not tables:
-                print("[DEBUG] No tables found on this page")
+            # Skip if row is empty
+            if not any(cleaned_row):
                 continue
             
-            for table_num, table in enumerate(tables, 1):
-                print(f"\n[DEBUG] Processing table {table_num} with {len(table)} rows")
+            # Get the cells
+            subject_code_cell = cleaned_row[0] if len(cleaned_row) > 0 else ""
+            subject_name_cell = cleaned_row[1] if len(cleaned_row) > 1 else ""
+            grade_cell = cleaned_row[3] if len(cleaned_row) > 3 else ""
+            
+            # Skip header rows
+            if 'subject code' in subject_code_cell.lower() or 'subject name' in subject_name_cell.lower():
+                logger.debug("Row %d: skipped header row", row_num)
+                continue
+            
+            # Check if this cell contains multiple entries (separated by newlines)
+            if '\n' in subject_code_cell or '\n' in subject_name_cell or '\n' in grade_cell:
+                logger.debug("Row %d: found merged row, splitting by newlines", row_num)
+                
+                # Split by newlines
+                codes = [c.strip() for c in subject_code_cell.split('\n') if c.strip()]
+                name_lines = [n.strip() for n in subject_name_cell.split('\n') if n.strip()]
+                grades = [g.strip() for g in grade_cell.split('\n') if g.strip()]
+                
+                logger.debug("Raw split: %d codes, %d name lines, %d grades", len(codes), len(name_lines), len(grades))
                 
-                for row_num, row in enumerate(table):
-                    if not row or len(row) < 4:
+                # Reconstruct subject names (merge lines that don't have corresponding codes)
+                names = []
+                current_name = ""
+                name_idx = 0
+                
+                for line in name_lines:
+                    if line.lower() == 'total':
                         continue
+                        
+                    # If we have accumulated a name and this line starts a new subject
+                    # (we have more codes to process), save the current name
+                    if current_name and name_idx < len(codes) - 1:
+                        # Check if next line looks like a continuation (doesn't start with capital)
+                        # or if we've collected enough for this code
+                        if len(names) < len(codes):
+                            # Only add if not already added for this code
+                            if len(names) == name_idx:
+                                names.append(current_name)
+                                name_idx += 1
+                                current_name = line
+                            else:
+                                current_name += " " + line
+                        else:
+                            current_name += " " + line
+                    else:
+                        if current_name:
+                            current_name += " " + line
+                        else:
+                            current_name = line
+                
+                # Add the last accumulated name
+                if current_name and current_name.lower() != 'total':
+                    names.append(current_name)
+                
+                # If reconstruction didn't work well, fall back to matching by count
+                if len(names) != len(codes):
+                    logger.debug("Name reconstruction mismatch, using simpler approach")
+                    # Simple approach: pair codes with grades, use best-effort names
+                    names = []
+                    for i, code in enumerate(codes):
+                        if i < len(name_lines):
+                            # Collect name lines until we hit the next code or run out
+                            name = name_lines[i]
+                            # Check if next line is a continuation (no matching code at this position)
+                            if i + 1 < len(name_lines) and i + 1 < len(codes):
+                                # If there are more name lines than codes, it's a multi-line name
+                                if len(name_lines) > len(codes):
+                                    extra_idx = i + len(codes) - len(grades)
+                                    if extra_idx < len(name_lines):
+                                        name += " " + name_lines[extra_idx]
+                            names.append(name)
+                
+                logger.debug("Final: %d codes, %d names, %d grades", len(codes), len(names), len(grades))
+                
+                # Match them up
+                min_len = min(len(codes), len(names), len(grades))
+                logger.debug("Processing %d subjects from this row", min_len)
+                
+                for i in range(min_len):
+                    code = codes[i]
+                    name = names[i].strip()
+                    grade = grades[i]
                     
-                    # Clean all cells
-                    cleaned_row = [safe_strip(cell) for cell in row]
+                    logger.debug("Subject %d: '%s' | '%s' | '%s'", i + 1, code, name, grade)
                     
-                    # Skip if row is empty
-                    if not any(cleaned_row):
+                    # Skip if name is "Total"
+                    if name.lower() == 'total':
+                        logger.debug("Skipped Total row")
                         continue
                     
-                    # Get the cells
-                    subject_code_cell = cleaned_row[0] if len(cleaned_row) > 0 else ""
-                    subject_name_cell = cleaned_row[1] if len(cleaned_row) > 1 else ""
-                    grade_cell = cleaned_row[3] if len(cleaned_row) > 3 else ""
+                    # Validate subject code (8 digits)
+                    if not re.match(r'^\d{8}$', code):
+                        logger.debug("Skipped: code doesn't match 8 digits: '%s'", code)
+                        continue
                     
-                    # Skip header rows
-                    if 'subject code' in subject_code_cell.lower() or 'subject name' in subject_name_cell.lower():
-                        print(f"[DEBUG] Row {row_num}: Skipped - header row")
+                    # Validate grade
+                    valid_grades = ['O', 'A+', 'A', 'B+', 'B', 'P', 'F', 'F1', 'F2', 'F3']
+                    if grade.upper() not in valid_grades:
+                        logger.debug("Skipped: invalid grade: '%s'", grade)
                         continue
                     
-                    # Check if this cell contains multiple entries (separated by newlines)
-                    if '\n' in subject_code_cell or '\n' in subject_name_cell or '\n' in grade_cell:
-                        print(f"[DEBUG] Row {row_num}: Found merged row - splitting by newlines")
-                        
-                        # Split by newlines
-                        codes = [c.strip() for c in subject_code_cell.split('\n') if c.strip()]
-                        name_lines = [n.strip() for n in subject_name_cell.split('\n') if n.strip()]
-                        grades = [g.strip() for g in grade_cell.split('\n') if g.strip()]
-                        
-                        print(f"[DEBUG] Raw split: {len(codes)} codes, {len(name_lines)} name lines, {len(grades)} grades")
-                        
-                        # Reconstruct subject names (merge lines that don't have corresponding codes)
-                        names = []
-                        current_name = ""
-                        name_idx = 0
-                        
-                        for line in name_lines:
-                            if line.lower() == 'total':
-                                continue
-                                
-                            # If we have accumulated a name and this line starts a new subject
-                            # (we have more codes to process), save the current name
-                            if current_name and name_idx < len(codes) - 1:
-                                # Check if next line looks like a continuation (doesn't start with capital)
-                                # or if we've collected enough for this code
-                                if len(names) < len(codes):
-                                    # Only add if not already added for this code
-                                    if len(names) == name_idx:
-                                        names.append(current_name)
-                                        name_idx += 1
-                                        current_name = line
-                                    else:
-                                        current_name += " " + line
-                                else:
-                                    current_name += " " + line
-                            else:
-                                if current_name:
-                                    current_name += " " + line
-                                else:
-                                    current_name = line
-                        
-                        # Add the last accumulated name
-                        if current_name and current_name.lower() != 'total':
-                            names.append(current_name)
-                        
-                        # If reconstruction didn't work well, fall back to matching by count
-                        if len(names) != len(codes):
-                            print(f"[DEBUG] Name reconstruction mismatch. Using simpler approach...")
-                            # Simple approach: pair codes with grades, use best-effort names
-                            names = []
-                            for i, code in enumerate(codes):
-                                if i < len(name_lines):
-                                    # Collect name lines until we hit the next code or run out
-                                    name = name_lines[i]
-                                    # Check if next line is a continuation (no matching code at this position)
-                                    if i + 1 < len(name_lines) and i + 1 < len(codes):
-                                        # If there are more name lines than codes, it's a multi-line name
-                                        if len(name_lines) > len(codes):
-                                            extra_idx = i + len(codes) - len(grades)
-                                            if extra_idx < len(name_lines):
-                                                name += " " + name_lines[extra_idx]
-                                    names.append(name)
-                        
-                        print(f"[DEBUG] Final: {len(codes)} codes, {len(names)} names, {len(grades)} grades")
-                        
-                        # Match them up
-                        min_len = min(len(codes), len(names), len(grades))
-                        print(f"[DEBUG] Processing {min_len} subjects from this row")
-                        
-                        for i in range(min_len):
-                            code = codes[i]
-                            name = names[i].strip()
-                            grade = grades[i]
-                            
-                            print(f"[DEBUG]   Subject {i+1}: '{code}' | '{name}' | '{grade}'")
-                            
-                            # Skip if name is "Total"
-                            if name.lower() == 'total':
-                                print(f"[DEBUG]   Skipped - is Total row")
-                                continue
-                            
-                            # Validate subject code (8 digits)
-                            if not re.match(r'^\d{8}$', code):
-                                print(f"[DEBUG]   Skipped - code doesn't match 8 digits: '{code}'")
-                                continue
-                            
-                            # Validate grade
-                            valid_grades = ['O', 'A+', 'A', 'B+', 'B', 'P', 'F', 'F1', 'F2', 'F3']
-                            if grade.upper() not in valid_grades:
-                                print(f"[DEBUG]   Skipped - invalid grade: '{grade}'")
-                                continue
-                            
-                            # Add to extracted data
-                            extracted.append({
-                                "subject": name,
-                                "grade": grade.upper()
-                            })
-                            
-                            print(f"[SUCCESS]   ✓ Added: {code} | {name} | {grade}")
-    
-    if not extracted:
-        print("\n[ERROR] No grade data extracted from PDF")
-        raise ValueError("No grade data extracted from PDF")
-    
-    print(f"\n[SUCCESS] ========================================")
-    print(f"[SUCCESS] Total subjects extracted: {len(extracted)}")
-    print(f"[SUCCESS] ========================================")
-    for item in extracted:
-        print(f"[SUCCESS]   - {item['subject']}: {item['grade']}")
-    
+                    # Add to extracted data
+                    extracted.append({
+                        "subject": name,
+                        "grade": grade.upper()
+                    })
+                    
+                    logger.debug("Added: %s | %s | %s", code, name, grade)
+
     return extracted
 
 
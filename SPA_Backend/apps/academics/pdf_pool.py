@@ -0,0 +1,157 @@
+#pdf_pool.py
+"""
+Process-pool backend for extract_grade_sheet.
+
+Every PDF is parsed in its own child process so several semesters are parsed
+concurrently across cores, a file that runs past the wall-clock timeout is
+killed, and the child's address space is capped so a pathological PDF raises
+MemoryError instead of growing the parent worker.
+
+A file may be given as bytes or as the path of a spooled PDF; paths are
+memory-mapped read-only in the child, so the parser pages the file in from
+the OS page cache instead of holding a private copy of it.
+"""
+import io
+import logging
+import mmap
+import multiprocessing
+import os
+import time
+from contextlib import contextmanager
+from multiprocessing.connection import wait
+
+from .pdf_extractor import extract_grade_sheet
+from .timing import StageTimer
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, timeouts still apply
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class PDFParseError(ValueError):
+    pass
+
+
+class PDFParseTimeout(PDFParseError):
+    pass
+
+
+def _mp_context():
+    # fork shares the already-imported pdfplumber and the PDF bytes with the child for free
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _address_space_in_use():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _limit_memory(limit_bytes):
+    if resource is None or not limit_bytes:
+        return
+    # The limit is headroom on top of what the forked interpreter already maps
+    soft = _address_space_in_use() + limit_bytes
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+@contextmanager
+def open_pdf_source(source):
+    """Yield a seekable stream over PDF bytes or a memory-mapped PDF path"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            raise ValueError("PDF file is empty")
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _parse_in_child(conn, source, memory_limit):
+    try:
+        _limit_memory(memory_limit)
+        timer = StageTimer()
+        with open_pdf_source(source) as stream:
+            rows, tier = extract_grade_sheet(stream, timer)
+        conn.send(("ok", (rows, tier, timer.as_dict())))
+    except MemoryError:
+        conn.send(("error", "PDF exceeded the parser memory limit"))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
+def _stop(process):
+    process.terminate()
+    process.join(1)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def extract_grades_from_pdfs(files, workers=None, timeout=30, memory_limit_mb=512):
+    """
+    Parse several grade-sheet PDFs concurrently.
+
+    files: dict of key (e.g. semester) -> PDF bytes or path to a PDF file
+    Returns a dict of key -> (rows, tier, stage timings in ms), or the
+    PDFParseError raised for that file.
+    """
+    ctx = _mp_context()
+    workers = max(1, workers or os.cpu_count() or 1)
+    memory_limit = (memory_limit_mb or 0) * 1024 * 1024
+
+    pending = list(files.items())
+    running = {}
+    results = {}
+
+    while pending or running:
+        while pending and len(running) < workers:
+            key, source = pending.pop(0)
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=_parse_in_child,
+                args=(child_conn, source, memory_limit),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            deadline = time.monotonic() + timeout if timeout else None
+            running[parent_conn] = (key, process, deadline)
+
+        deadlines = [d for _, _, d in running.values() if d is not None]
+        wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+        for conn in wait(list(running), timeout=wait_for):
+            key, process, _ = running.pop(conn)
+            try:
+                state, payload = conn.recv()
+            except EOFError:
+                process.join()
+                state, payload = "error", f"PDF parser exited unexpectedly (code {process.exitcode})"
+            conn.close()
+            process.join()
+            results[key] = payload if state == "ok" else PDFParseError(payload)
+
+        now = time.monotonic()
+        for conn, (key, process, deadline) in list(running.items()):
+            if deadline is not None and now >= deadline:
+                logger.warning("PDF parse for %s exceeded %ss, killing parser", key, timeout)
+                _stop(process)
+                conn.close()
+                del running[conn]
+                results[key] = PDFParseTimeout(f"PDF parsing timed out after {timeout}s")
+
+    return results
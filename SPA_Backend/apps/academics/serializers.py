@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ProctoringEvent, SemesterResult, StudentProfile
+from .models import BulkMarksImport, ProctoringEvent, ResultIngestionFile, ResultIngestionJob, SemesterResult, StudentProfile
 
 
 class StudentProfileSerializer(serializers.ModelSerializer):
@@ -26,6 +26,34 @@ class SemesterResultSerializer(serializers.ModelSerializer):
         read_only_fields = ('student',)
 
 
+class ManualSubjectMarksSerializer(serializers.Serializer):
+    subject = serializers.CharField(max_length=100)
+    marks = serializers.FloatField(min_value=0, max_value=100)
+    grade = serializers.CharField(max_length=5, required=False, allow_blank=True, default="")
+
+
+class ManualSemesterMarksSerializer(serializers.Serializer):
+    semester = serializers.ChoiceField(choices=SemesterResult.SEMESTER_CHOICES)
+    subjects = ManualSubjectMarksSerializer(many=True, allow_empty=False)
+
+    def validate_subjects(self, value):
+        names = [item["subject"] for item in value]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise serializers.ValidationError(f"Duplicate subjects: {', '.join(duplicates)}")
+        return value
+
+
+class ManualMarksBatchSerializer(serializers.Serializer):
+    semesters = ManualSemesterMarksSerializer(many=True, allow_empty=False)
+
+    def validate_semesters(self, value):
+        numbers = [item["semester"] for item in value]
+        if len(numbers) != len(set(numbers)):
+            raise serializers.ValidationError("Each semester may only be sent once")
+        return value
+
+
 class ProctoringEventSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProctoringEvent
@@ -45,3 +73,83 @@ class ProctoringEventSerializer(serializers.ModelSerializer):
         if not isinstance(value, dict):
             raise serializers.ValidationError("metadata must be an object.")
         return value
+
+
+class ResultIngestionFileSerializer(serializers.ModelSerializer):
+    subjects_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ResultIngestionFile
+        fields = ("semester", "file_name", "status", "extraction_tier", "subjects_count", "subjects", "error")
+
+    def get_subjects_count(self, obj):
+        return len(obj.subjects)
+
+
+class ResultIngestionJobSerializer(serializers.ModelSerializer):
+    semesters = ResultIngestionFileSerializer(source="files", many=True, read_only=True)
+    progress = serializers.SerializerMethodField()
+    total_subjects = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ResultIngestionJob
+        fields = (
+            "id",
+            "status",
+            "error",
+            "progress",
+            "semesters",
+            "total_subjects",
+            "domain_recommendation",
+            "timings",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+
+    def get_progress(self, obj):
+        files = obj.files.all()
+        finished = [
+            f for f in files
+            if f.status in (ResultIngestionJob.STATUS_COMPLETED, ResultIngestionJob.STATUS_FAILED)
+        ]
+        return {"processed": len(finished), "total": len(files)}
+
+    def get_total_subjects(self, obj):
+        return sum(len(f.subjects) for f in obj.files.all())
+
+
+class FileIngestionJobSerializer(serializers.ModelSerializer):
+    """A queued class ZIP or marks import"""
+    class Meta:
+        model = ResultIngestionJob
+        fields = (
+            "id",
+            "kind",
+            "status",
+            "file_name",
+            "error",
+            "report",
+            "timings",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+
+
+class BulkMarksImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BulkMarksImport
+        fields = (
+            "id",
+            "file_name",
+            "status",
+            "rows_processed",
+            "rows_written",
+            "rows_skipped",
+            "errors",
+            "error",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        )
@@ -0,0 +1,47 @@
+#services.py
+from django.db import transaction
+from django.db.models import Q
+
+from .analysis import mark_students_changed
+from .models import SemesterResult
+
+
+def replace_semester_results(student, results):
+    """
+    Replace a student's results for whole semesters in one transaction.
+
+    results: dict of semester -> dict of subject -> marks
+    Costs one DELETE and one INSERT however many semesters and subjects are given.
+    """
+    return replace_results_for_students({student.pk: results})
+
+
+def replace_results_for_students(results):
+    """
+    Replace whole semesters for many students in one transaction.
+
+    results: dict of student id -> dict of semester -> dict of subject -> marks
+    Still one DELETE and one INSERT, whatever the number of students, plus
+    one UPDATE marking their analysis snapshots stale.
+    """
+    if not results:
+        return []
+
+    rows = [
+        SemesterResult(student_id=student_id, semester=semester, subject=subject, marks=marks)
+        for student_id, semesters in results.items()
+        for semester, subjects in semesters.items()
+        for subject, marks in subjects.items()
+    ]
+
+    replaced = Q()
+    for student_id, semesters in results.items():
+        replaced |= Q(student_id=student_id, semester__in=list(semesters))
+
+    with transaction.atomic():
+        SemesterResult.objects.filter(replaced).delete()
+        SemesterResult.objects.bulk_create(rows)
+        mark_students_changed(results)
+
+    return rows
+
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import subject_catalogue
+from .analysis import mark_students_changed, refresh_snapshot_on_commit
+from .models import SemesterResult, StudentProfile, Subject
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def invalidate_subject_catalogue(sender, **kwargs):
+    """Refresh every process's Subject catalogue once the change is committed"""
+    transaction.on_commit(subject_catalogue.invalidate)
+
+
+# No post_delete receiver on SemesterResult: it would turn every bulk
+# queryset delete into a SELECT plus one signal per row. SemesterResult.delete
+# and its queryset's delete() call mark_students_changed instead, and bulk
+# writes call it themselves.
+@receiver(post_save, sender=SemesterResult)
+def semester_result_saved(sender, instance, **kwargs):
+    mark_students_changed([instance.student_id])
+    refresh_snapshot_on_commit(instance.student_id)
+
+
+@receiver(post_save, sender=StudentProfile)
+def student_profile_saved(sender, instance, **kwargs):
+    # assessment_domain_scores feed the domain recommendation
+    mark_students_changed([instance.user_id])
+    refresh_snapshot_on_commit(instance.user_id)
@@ -0,0 +1,107 @@
+#subject_catalogue.py
+"""
+Process-local cache of the Subject catalogue.
+
+The catalogue is loaded lazily on first use and kept per process. A
+version stamp in the shared Django cache (CACHES["state"], which never
+culls or expires entries) is replaced with a new random value whenever a
+Subject is saved or deleted (see signals.py); every process compares it
+with the version it loaded at most once per SUBJECT_CATALOGUE_CHECK_SECONDS
+and reloads when it has changed, so all gunicorn workers and the ingestion
+worker converge on the same catalogue. Stamps never repeat, so a lost key
+is re-seeded with a value no process has loaded.
+
+Bulk writes (bulk_create, queryset update/delete) do not send signals:
+call invalidate() after them.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Subject
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "academics:subject_catalogue:version"
+
+CatalogueSubject = namedtuple(
+    "CatalogueSubject",
+    ["id", "code", "name", "semester", "category", "weightage", "subject_type"]
+)
+
+_lock = threading.Lock()
+_state = {"version": None, "checked_at": 0.0, "by_code": None, "by_id": None}
+
+
+def _shared_version():
+    cache = caches["state"]
+    try:
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # Another process may seed it first; everyone then reads the same stamp
+            cache.add(VERSION_KEY, uuid4().hex, timeout=None)
+            version = cache.get(VERSION_KEY)
+        return version
+    except Exception:
+        # Without the shared stamp, reload on every check instead of serving stale data
+        logger.warning("Subject catalogue version unavailable, reloading", exc_info=True)
+        return None
+
+
+def _load():
+    from apps.ml_engine.feature_builder import map_subject_to_type
+
+    by_code = {}
+    for subject in Subject.objects.all():
+        by_code[subject.code] = CatalogueSubject(
+            id=subject.id,
+            code=subject.code,
+            name=subject.name,
+            semester=subject.semester,
+            category=subject.category,
+            weightage=subject.weightage,
+            subject_type=map_subject_to_type(subject),
+        )
+    return by_code, {entry.id: entry for entry in by_code.values()}
+
+
+def _current():
+    now = time.monotonic()
+    with _lock:
+        if _state["by_code"] is not None and now - _state["checked_at"] < settings.SUBJECT_CATALOGUE_CHECK_SECONDS:
+            return _state
+
+        version = _shared_version()
+        if _state["by_code"] is None or version is None or version != _state["version"]:
+            _state["by_code"], _state["by_id"] = _load()
+            _state["version"] = version
+            logger.debug("Loaded subject catalogue v%s: %d subjects", version, len(_state["by_code"]))
+
+        _state["checked_at"] = now
+        return _state
+
+
+def get_subjects_by_code():
+    """code -> CatalogueSubject for the whole catalogue"""
+    return _current()["by_code"]
+
+
+def get_subjects_by_id():
+    """Subject id -> CatalogueSubject for the whole catalogue"""
+    return _current()["by_id"]
+
+
+def invalidate():
+    """Drop this process's copy and bump the shared version so other processes reload"""
+    with _lock:
+        _state["by_code"] = None
+        _state["by_id"] = None
+    try:
+        caches["state"].set(VERSION_KEY, uuid4().hex, timeout=None)
+    except Exception:
+        logger.warning("Could not bump subject catalogue version", exc_info=True)
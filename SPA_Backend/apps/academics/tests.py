@@ -1,3 +1,888 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock, skipIf
 
-# Create your tests here.
+import pdfplumber
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from benchmarks.gradesheet_corpus import build_pdf, expected_rows, make_rows
+
+from .extraction_cache import content_digest, evict, get_cached_rows, store_rows
+from .ingestion import claim_next_job, process_job
+from .layout_templates import match_template
+from .marks_ingestor import ingest_grades
+from .models import (
+    BulkMarksImport,
+    ExtractedGradeSheet,
+    ResultIngestionFile,
+    ResultIngestionJob,
+    SemesterResult,
+    StudentAnalysisSnapshot,
+    StudentMark,
+    StudentProfile,
+    Subject,
+)
+from . import pdf_pool, subject_catalogue
+from .analysis import compute_student_analysis
+from .bulk_import import import_marks
+from .pdf_extractor import _extract_page_tables, _extract_page_text, extract_grade_sheet
+from .pdf_pool import PDFParseError, PDFParseTimeout, extract_grades_from_pdfs
+from .services import replace_semester_results
+from .timing import StageTimer
+from .uploads import store_upload, stored_upload_path
+from .zip_ingestion import ingest_grade_sheet_zip, parse_entry_name
+
+
+def _subjects(count, marks=70):
+    return {f"Subject {i}": marks for i in range(count)}
+
+
+class StoredUploadsMixin:
+    """Queues semester PDFs in a temporary RESULT_UPLOAD_DIR, as UploadResultPDFView does"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = self.settings(RESULT_UPLOAD_DIR=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _queue_pdf(self, job, semester, content):
+        return ResultIngestionFile.objects.create(
+            job=job, semester=semester, file_name="sheet.pdf",
+            stored_name=store_upload(ContentFile(content), "sheet.pdf")
+        )
+
+
+class ReplaceSemesterResultsTests(TestCase):
+    def setUp(self):
+        self.student = get_user_model().objects.create_user(email="student@example.com")
+
+    def test_query_count_does_not_grow_with_subjects(self):
+        # savepoint, students being deleted from, DELETE, INSERT, snapshot version bump,
+        # release; the first write also creates the snapshot row and bumps it
+        with self.assertNumQueries(8):
+            replace_semester_results(self.student, {1: _subjects(1)})
+        # The replaced semester's student is bumped by the delete too
+        with self.assertNumQueries(7):
+            replace_semester_results(self.student, {1: _subjects(12), 2: _subjects(12)})
+
+        self.assertEqual(SemesterResult.objects.filter(student=self.student).count(), 24)
+
+    def test_replaces_only_the_given_semesters(self):
+        replace_semester_results(self.student, {1: _subjects(3), 2: _subjects(3)})
+        replace_semester_results(self.student, {1: {"Maths": 95}})
+
+        self.assertEqual(
+            sorted(SemesterResult.objects.filter(student=self.student).values_list("semester", "subject")),
+            [(1, "Maths"), (2, "Subject 0"), (2, "Subject 1"), (2, "Subject 2")]
+        )
+
+
+class ProcessJobQueryTests(StoredUploadsMixin, TestCase):
+    def test_upload_queries_do_not_grow_with_subjects(self):
+        student = get_user_model().objects.create_user(email="uploader@example.com")
+        rows = [{"subject": f"Subject {i}", "grade": "A"} for i in range(10)]
+
+        job = ResultIngestionJob.objects.create(student=student)
+        for semester in (1, 2):
+            content = f"%PDF-semester-{semester}".encode()
+            # Cached sheets keep the worker from forking parsers in tests
+            store_rows(content_digest(content), rows)
+            self._queue_pdf(job, semester, content)
+
+        # files + status update, 2 per cache hit, 6 per semester write plus its file save,
+        # 2 creating the snapshot row on the first write, 5 to rebuild the snapshot, job save
+        with self.assertNumQueries(28):
+            process_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ResultIngestionJob.STATUS_COMPLETED)
+        self.assertEqual(SemesterResult.objects.filter(student=student).count(), 20)
+        # The job reports the recommendation the dashboard shows
+        snapshot = StudentAnalysisSnapshot.objects.get(student=student)
+        self.assertEqual(job.domain_recommendation, snapshot.payload["domain_recommendation"])
+
+
+class IngestionJobFailureTests(StoredUploadsMixin, TestCase):
+    rows = [{"subject": "Web Technology", "grade": "A"}]
+
+    def setUp(self):
+        super().setUp()
+        self.student = get_user_model().objects.create_user(email="failures@example.com")
+
+    def _job(self, content=b"%PDF-cached", **fields):
+        job = ResultIngestionJob.objects.create(student=self.student, **fields)
+        self._queue_pdf(job, 1, content)
+        return job
+
+    def test_unparseable_pdf_fails_the_job(self):
+        job = self._job(b"%PDF-1.4 truncated")
+
+        with self.settings(PDF_PARSE_WORKERS=1):
+            process_job(job)
+
+        job.refresh_from_db()
+        upload = job.files.get()
+        self.assertEqual(job.status, ResultIngestionJob.STATUS_FAILED)
+        self.assertEqual(upload.status, ResultIngestionJob.STATUS_FAILED)
+        self.assertIn("Semester 1 failed", job.error)
+        self.assertFalse(os.path.exists(stored_upload_path(upload.stored_name)))
+
+    def test_unexpected_error_fails_the_job_instead_of_raising(self):
+        job = self._job()
+
+        with mock.patch("apps.academics.ingestion.get_cached_rows", side_effect=RuntimeError("cache down")):
+            process_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ResultIngestionJob.STATUS_FAILED)
+        self.assertEqual(job.error, "cache down")
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(job.files.get().status, ResultIngestionJob.STATUS_FAILED)
+
+    def test_worker_keeps_going_after_a_failed_job(self):
+        store_rows(content_digest(b"%PDF-cached"), self.rows)
+        first, second = self._job(), self._job()
+
+        with mock.patch("apps.academics.ingestion.refresh_snapshot", side_effect=[RuntimeError("snapshot"), {}]):
+            call_command("process_ingestion_jobs", once=True, stdout=io.StringIO())
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, first.error), (ResultIngestionJob.STATUS_FAILED, "snapshot"))
+        self.assertEqual(second.status, ResultIngestionJob.STATUS_COMPLETED)
+
+    def test_abandoned_running_jobs_are_reclaimed(self):
+        long_ago = timezone.now() - timedelta(hours=2)
+        stale = self._job(status=ResultIngestionJob.STATUS_RUNNING, heartbeat_at=long_ago, attempts=1)
+        self._job(status=ResultIngestionJob.STATUS_RUNNING, heartbeat_at=timezone.now(), attempts=1)
+
+        with self.settings(INGESTION_JOB_TIMEOUT=600):
+            self.assertEqual(claim_next_job().id, stale.id)
+            self.assertIsNone(claim_next_job())
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.attempts, 2)
+        self.assertGreater(stale.heartbeat_at, long_ago)
+
+    def test_job_abandoned_too_often_is_failed(self):
+        job = self._job(
+            status=ResultIngestionJob.STATUS_RUNNING,
+            heartbeat_at=timezone.now() - timedelta(hours=2),
+            attempts=3
+        )
+
+        with self.settings(INGESTION_JOB_TIMEOUT=600, INGESTION_JOB_MAX_ATTEMPTS=3):
+            self.assertIsNone(claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ResultIngestionJob.STATUS_FAILED)
+        self.assertEqual(job.files.get().status, ResultIngestionJob.STATUS_FAILED)
+
+
+class IngestionMetricsTests(TestCase):
+    url = "/api/academics/ingestion-metrics/"
+
+    def setUp(self):
+        self.client = APIClient()
+        student = get_user_model().objects.create_user(email="metrics@example.com")
+        finished = timezone.now()
+        for timings, tiers in (
+            ({"parse": 100.0, "db_write": 10.0, "total": 120.0}, ("text", "cache")),
+            ({"parse": 300.0, "db_write": 30.0, "total": 340.0}, ("text", "table")),
+        ):
+            job = ResultIngestionJob.objects.create(
+                student=student, status=ResultIngestionJob.STATUS_COMPLETED, timings=timings, finished_at=finished
+            )
+            for semester, tier in enumerate(tiers, start=1):
+                ResultIngestionFile.objects.create(
+                    job=job, semester=semester, status=ResultIngestionJob.STATUS_COMPLETED, extraction_tier=tier
+                )
+        # Neither an unfinished job nor a class ZIP counts towards the stage timings
+        ResultIngestionJob.objects.create(student=student, timings={"parse": 9000.0})
+        ResultIngestionJob.objects.create(
+            kind=ResultIngestionJob.KIND_CLASS_ZIP, status=ResultIngestionJob.STATUS_COMPLETED,
+            timings={"parse": 9000.0}, finished_at=finished
+        )
+
+    def test_staff_see_stage_timings_and_tier_counts(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(email="metrics-staff@example.com", is_staff=True)
+        )
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["extraction_tiers"], {"text": 2, "cache": 1, "table": 1})
+        self.assertEqual(
+            response.data["jobs_by_status"],
+            {ResultIngestionJob.STATUS_COMPLETED: 3, ResultIngestionJob.STATUS_PENDING: 1}
+        )
+        timings = response.data["stage_timings_ms"]
+        self.assertEqual(set(timings), {"parse", "db_write", "total"})
+        self.assertEqual(timings["parse"], {"count": 2, "avg": 200.0, "p50": 100.0, "p95": 300.0, "max": 300.0})
+        self.assertEqual(timings["db_write"]["avg"], 20.0)
+
+    def test_non_admin_is_forbidden(self):
+        self.client.force_authenticate(get_user_model().objects.get(email="metrics@example.com"))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+def _sleep_forever(stream, timer):
+    time.sleep(60)
+
+
+def _allocate(stream, timer):
+    return bytearray(1024 * 1024 * 1024), "text"
+
+
+def _crash(stream, timer):
+    os._exit(3)
+
+
+class PDFPoolTests(SimpleTestCase):
+    def test_parses_paths_and_bytes_in_child_processes(self):
+        pages_rows = [make_rows(8, seed=1)]
+        data = build_pdf(pages_rows, merged=True)
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as fh:
+            fh.write(data)
+            fh.flush()
+            results = extract_grades_from_pdfs({"path": fh.name, "bytes": data}, workers=2)
+
+        for rows, tier, timings in results.values():
+            self.assertEqual(rows, expected_rows(pages_rows))
+            self.assertIn("open", timings)
+
+    def test_a_slow_parser_is_killed_at_the_timeout(self):
+        start = time.monotonic()
+        with mock.patch("apps.academics.pdf_pool.extract_grade_sheet", _sleep_forever):
+            results = extract_grades_from_pdfs({1: b"%PDF-"}, workers=1, timeout=0.5)
+
+        self.assertIsInstance(results[1], PDFParseTimeout)
+        self.assertLess(time.monotonic() - start, 10)
+
+    @skipIf(pdf_pool.resource is None, "no rlimits on this platform")
+    def test_memory_limit_comes_back_as_an_error(self):
+        with mock.patch("apps.academics.pdf_pool.extract_grade_sheet", _allocate):
+            results = extract_grades_from_pdfs({1: b"%PDF-"}, workers=1, timeout=30, memory_limit_mb=64)
+
+        self.assertIsInstance(results[1], PDFParseError)
+        self.assertIn("memory limit", str(results[1]))
+
+    def test_a_crashed_parser_is_reported(self):
+        with mock.patch("apps.academics.pdf_pool.extract_grade_sheet", _crash):
+            results = extract_grades_from_pdfs({1: b"%PDF-", 2: b"%PDF-"}, workers=2, timeout=30)
+
+        for result in results.values():
+            self.assertIsInstance(result, PDFParseError)
+            self.assertIn("exited unexpectedly", str(result))
+
+
+class ExtractionCacheTests(TestCase):
+    rows = [{"subject": "Web Technology", "grade": "A"}]
+
+    def _store(self, name, age_minutes):
+        digest = content_digest(name.encode())
+        store_rows(digest, self.rows)
+        ExtractedGradeSheet.objects.filter(digest=digest).update(
+            last_used_at=timezone.now() - timedelta(minutes=age_minutes)
+        )
+        return digest
+
+    def test_hit_returns_rows_and_miss_returns_none(self):
+        digest = self._store("sheet", 0)
+
+        self.assertEqual(get_cached_rows(digest), self.rows)
+        self.assertIsNone(get_cached_rows(content_digest(b"other")))
+        self.assertEqual(ExtractedGradeSheet.objects.get(digest=digest).hits, 1)
+
+    def test_evicts_least_recently_used_beyond_max(self):
+        oldest = self._store("oldest", 30)
+        used = self._store("used", 20)
+        middle = self._store("middle", 10)
+        # A hit makes the oldest entry the most recently used
+        get_cached_rows(oldest)
+
+        with self.settings(PDF_EXTRACTION_CACHE_MAX_ENTRIES=2):
+            newest = self._store("newest", 0)
+
+        self.assertEqual(set(ExtractedGradeSheet.objects.values_list("digest", flat=True)), {oldest, newest})
+        self.assertIsNone(get_cached_rows(used))
+        self.assertIsNone(get_cached_rows(middle))
+        self.assertEqual(evict(1), 1)
+        self.assertEqual(list(ExtractedGradeSheet.objects.values_list("digest", flat=True)), [newest])
+
+
+class LayoutTemplateTests(SimpleTestCase):
+    def setUp(self):
+        # "-" credits defeat the text tier, so the template serves these sheets
+        self.pages_rows = [make_rows(10, seed=page, credits=False) for page in range(3)]
+        self.pdf = pdfplumber.open(io.BytesIO(build_pdf(self.pages_rows, merged=True)))
+        self.addCleanup(self.pdf.close)
+
+    def test_template_rows_match_the_generic_table_path(self):
+        rows, tier = extract_grade_sheet(io.BytesIO(build_pdf(self.pages_rows, merged=True)))
+
+        generic = []
+        for page in self.pdf.pages:
+            generic.extend(_extract_page_tables(page, StageTimer()))
+
+        self.assertEqual(tier, "template")
+        self.assertEqual(rows, generic)
+        self.assertEqual(rows, expected_rows(self.pages_rows))
+
+    def test_learned_columns_stay_with_the_document(self):
+        template = match_template("PARUL UNIVERSITY")
+        words = self.pdf.pages[0].extract_words()
+        rows, columns = template.extract(words)
+        self.assertEqual(rows, expected_rows(self.pages_rows[:1]))
+
+        # A page without a header only uses columns its own document learned
+        header_top = next(word["top"] for word in words if word["text"] == "Subject")
+        body = [word for word in words if word["top"] > header_top + 5]
+        self.assertEqual(template.extract(body), (None, None))
+        self.assertEqual(template.extract(body, columns)[0], rows)
+
+
+class TextTierTests(SimpleTestCase):
+    def test_text_layer_serves_standard_sheets_with_wrapped_names(self):
+        pages_rows = [make_rows(12, seed=page, long_names=True) for page in range(2)]
+
+        rows, tier = extract_grade_sheet(io.BytesIO(build_pdf(pages_rows, merged=False)))
+
+        self.assertEqual(tier, "text")
+        self.assertEqual(rows, expected_rows(pages_rows))
+
+    def test_untrusted_text_falls_through(self):
+        text = "03031010 Web Technology 4 A\n03031011 Data Mining - B\nTotal"
+        self.assertIsNone(_extract_page_text(text))
+        self.assertEqual(
+            _extract_page_text("03031010 Web Technology 4 A\nand Practices\nTotal"),
+            [{"subject": "Web Technology and Practices", "grade": "A"}]
+        )
+        # A wrapped name with nothing after it may continue on the next page
+        self.assertIsNone(_extract_page_text("03031010 Web Technology 4 A\nand Practices"))
+
+
+class UploadResultPDFTests(TestCase):
+    url = "/api/academics/upload-result-pdf/"
+
+    def setUp(self):
+        self.student = get_user_model().objects.create_user(email="pdf-upload@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        override = self.settings(RESULT_UPLOAD_DIR=self.dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _post(self, content, name="sheet.pdf"):
+        upload = io.BytesIO(content)
+        upload.name = name
+        return self.client.post(self.url, {"semester_1": upload}, format="multipart")
+
+    def test_non_pdf_is_rejected_before_anything_is_queued(self):
+        with mock.patch("apps.academics.ingestion.extract_grades_from_pdfs") as parse:
+            response = self._post(b"PK\x03\x04 not a pdf")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("is not a PDF", response.data["error"])
+        self.assertFalse(ResultIngestionJob.objects.exists())
+        parse.assert_not_called()
+
+    def test_oversized_upload_is_rejected_while_streaming(self):
+        with self.settings(RESULT_PDF_MAX_BYTES=1024):
+            response = self._post(b"%PDF-1.4\n" + b"0" * 4096)
+
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(ResultIngestionJob.objects.exists())
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+    def test_accepted_pdf_waits_on_disk_and_is_deleted_once_processed(self):
+        content = b"%PDF-1.4 stored sheet"
+        store_rows(content_digest(content), [{"subject": "Web Technology", "grade": "A"}])
+
+        response = self._post(content)
+
+        self.assertEqual(response.status_code, 202)
+        upload = ResultIngestionFile.objects.get()
+        with open(os.path.join(self.dir.name, upload.stored_name), "rb") as fh:
+            self.assertEqual(fh.read(), content)
+
+        process_job(upload.job)
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, ResultIngestionJob.STATUS_COMPLETED)
+        self.assertEqual(upload.extraction_tier, "cache")
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+
+class ManualMarksEntryTests(TestCase):
+    url = "/api/academics/manual-marks/"
+
+    def setUp(self):
+        self.student = get_user_model().objects.create_user(email="manual@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def _semester(self, semester, count):
+        return {
+            "semester": semester,
+            "subjects": [{"subject": f"Subject {i}", "marks": 75, "grade": "A"} for i in range(count)]
+        }
+
+    def test_saves_all_semesters_in_one_request(self):
+        response = self.client.post(
+            self.url,
+            {"semesters": [self._semester(1, 10), self._semester(2, 8)]},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["subjects_saved"], 18)
+        self.assertEqual(SemesterResult.objects.filter(student=self.student).count(), 18)
+
+    def test_invalid_semester_writes_nothing(self):
+        replace_semester_results(self.student, {1: {"Maths": 40}})
+        bad = self._semester(2, 3)
+        bad["subjects"][1]["marks"] = 140
+
+        response = self.client.post(
+            self.url,
+            {"semesters": [self._semester(1, 10), bad]},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            list(SemesterResult.objects.filter(student=self.student).values_list("subject", flat=True)),
+            ["Maths"]
+        )
+
+    def test_single_semester_payload_is_still_accepted(self):
+        response = self.client.post(self.url, self._semester(3, 4), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["semester"], 3)
+        self.assertEqual(response.data["subjects_saved"], 4)
+
+
+class IngestGradesTests(TestCase):
+    def setUp(self):
+        self.student = get_user_model().objects.create_user(email="catalogue@example.com")
+        Subject.objects.bulk_create([
+            Subject(code=f"0310{i:04d}", name=f"Subject {i}", semester=1 + i % 6, category="CORE", weightage=1.0)
+            for i in range(30)
+        ])
+        # bulk_create sends no signals
+        subject_catalogue.invalidate()
+
+    def test_upserts_in_one_query_once_catalogue_is_loaded(self):
+        rows = [{"code": f"0310{i:04d}", "grade_point": 8} for i in range(30)]
+        rows.append({"code": "99999999", "grade_point": 9})
+        subject_catalogue.get_subjects_by_code()
+
+        with self.assertNumQueries(1):
+            report = ingest_grades(self.student, rows)
+
+        self.assertEqual(report, {"saved": 30, "skipped": 1, "skipped_codes": ["99999999"]})
+
+        rows[0]["grade_point"] = 10
+        ingest_grades(self.student, rows)
+        self.assertEqual(StudentMark.objects.filter(student=self.student).count(), 30)
+        self.assertEqual(StudentMark.objects.get(student=self.student, subject__code="03100000").marks, 10)
+
+    def test_no_matching_subject_raises(self):
+        with self.assertRaises(ValueError):
+            ingest_grades(self.student, [{"code": "99999999", "grade_point": 9}])
+
+
+class SubjectCatalogueTests(TestCase):
+    def setUp(self):
+        subject_catalogue.invalidate()
+
+    def test_loaded_once_and_refreshed_on_save(self):
+        with self.assertNumQueries(2):  # shared version + catalogue
+            self.assertEqual(subject_catalogue.get_subjects_by_code(), {})
+        with self.assertNumQueries(0):
+            subject_catalogue.get_subjects_by_code()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Subject.objects.create(code="03105201", name="Database Management System", semester=3,
+                                   category="CORE", weightage=1.0)
+
+        entry = subject_catalogue.get_subjects_by_code()["03105201"]
+        self.assertEqual(entry.subject_type, "DBMS")
+        self.assertIs(subject_catalogue.get_subjects_by_id()[entry.id], entry)
+
+    def test_other_process_bump_is_picked_up_after_check_interval(self):
+        subject_catalogue.get_subjects_by_code()
+        Subject.objects.create(code="03105202", name="Web Technology", semester=4,
+                               category="CORE", weightage=1.0)
+        # Another process committed the change and bumped the shared version
+        caches["state"].set(subject_catalogue.VERSION_KEY, "other-process")
+
+        with self.settings(SUBJECT_CATALOGUE_CHECK_SECONDS=0):
+            self.assertIn("03105202", subject_catalogue.get_subjects_by_code())
+
+    def test_lost_version_is_reseeded_with_a_new_stamp(self):
+        subject_catalogue.get_subjects_by_code()
+        loaded = caches["state"].get(subject_catalogue.VERSION_KEY)
+        # Written without signals, and the stamp was evicted before anyone bumped it
+        Subject.objects.bulk_create([
+            Subject(code="03105203", name="Computer Networks", semester=4, category="CORE", weightage=1.0)
+        ])
+        caches["state"].delete(subject_catalogue.VERSION_KEY)
+
+        with self.settings(SUBJECT_CATALOGUE_CHECK_SECONDS=0):
+            self.assertIn("03105203", subject_catalogue.get_subjects_by_code())
+        self.assertNotEqual(caches["state"].get(subject_catalogue.VERSION_KEY), loaded)
+
+
+class BulkMarksImportTests(TestCase):
+    def setUp(self):
+        for i in range(3):
+            user = get_user_model().objects.create_user(email=f"bulk{i}@example.com")
+            user.profile.enrollment_no = f"22030310{i:04d}"
+            user.profile.save()
+
+        lines = ["Enrollment No,Semester,Subject,Marks,Grade"]
+        for i in range(3):
+            for subject in ("Maths", "Physics"):
+                lines.append(f"22030310{i:04d},1,{subject},70,")
+        lines.append("220303109999,1,Maths,70,")   # unknown student
+        lines.append("220303100000,2,Chemistry,,A+")
+        lines.append("220303100001,9,Maths,70,")   # bad semester
+
+        fd, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w") as fh:
+            fh.write("\n".join(lines) + "\n")
+        self.addCleanup(os.remove, self.path)
+
+    def test_imports_in_chunks_and_reports_skips(self):
+        # resume lookup + create, 6 per chunk (profiles, savepoint, upsert, snapshot bump,
+        # checkpoint, release) plus 2 creating the first chunk's snapshot rows, finish
+        with self.assertNumQueries(2 + 2 * 6 + 2 + 1):
+            run = import_marks(self.path, chunk_size=5)
+
+        self.assertEqual(run.status, BulkMarksImport.STATUS_COMPLETED)
+        self.assertEqual((run.rows_processed, run.rows_written, run.rows_skipped), (9, 7, 2))
+        self.assertEqual(len(run.errors), 2)
+        self.assertEqual(SemesterResult.objects.count(), 7)
+        self.assertEqual(SemesterResult.objects.get(subject="Chemistry").marks, 85)
+
+    def test_interrupted_import_resumes_after_last_chunk(self):
+        def interrupt(run):
+            raise RuntimeError("worker killed")
+
+        with self.assertRaises(RuntimeError):
+            import_marks(self.path, chunk_size=4, progress=interrupt)
+
+        run = BulkMarksImport.objects.get()
+        self.assertEqual((run.status, run.rows_processed), (BulkMarksImport.STATUS_FAILED, 4))
+
+        resumed = import_marks(self.path, chunk_size=4)
+
+        self.assertEqual(resumed.id, run.id)
+        self.assertEqual((resumed.rows_processed, resumed.rows_written, resumed.rows_skipped), (9, 7, 2))
+        self.assertEqual(SemesterResult.objects.count(), 7)
+
+    def _post(self, name):
+        staff = get_user_model().objects.create_user(email="bulk-staff@example.com", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(staff)
+        with open(self.path, "rb") as fh:
+            upload = io.BytesIO(fh.read())
+        upload.name = name
+        return client, client.post("/api/academics/bulk-imports/", {"file": upload}, format="multipart")
+
+    def test_upload_is_queued_and_imported_by_the_worker(self):
+        upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(upload_dir.cleanup)
+
+        with self.settings(RESULT_UPLOAD_DIR=upload_dir.name):
+            client, response = self._post("marks.csv")
+            self.assertEqual(response.status_code, 202)
+            self.assertFalse(BulkMarksImport.objects.exists())
+
+            job = claim_next_job()
+            self.assertEqual(job.id, response.data["job_id"])
+            process_job(job)
+
+            self.assertEqual(os.listdir(upload_dir.name), [])
+            status = client.get(response.data["status_url"]).data
+
+        run = BulkMarksImport.objects.get()
+        self.assertEqual(status["status"], ResultIngestionJob.STATUS_COMPLETED)
+        self.assertEqual(status["report"]["import_id"], run.id)
+        self.assertEqual((status["report"]["rows_written"], status["report"]["rows_skipped"]), (7, 2))
+        self.assertEqual(run.file_name, "marks.csv")
+        self.assertEqual(SemesterResult.objects.count(), 7)
+
+    def test_unsupported_file_is_rejected_without_queueing(self):
+        _, response = self._post("marks.txt")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ResultIngestionJob.objects.exists())
+
+
+class ZipIngestionTests(TestCase):
+    def test_entry_names(self):
+        self.assertEqual(parse_entry_name("class/220303105123_sem4.pdf"), ("220303105123", 4))
+        self.assertEqual(parse_entry_name("220303105123/Semester 2.pdf"), ("220303105123", 2))
+        self.assertIsNone(parse_entry_name("220303105123.pdf"))
+
+    def test_ingests_class_archive_with_per_file_report(self):
+        rows = [{"subject": f"Subject {i}", "grade": "B+"} for i in range(8)]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for i in range(4):
+                user = get_user_model().objects.create_user(email=f"zip{i}@example.com")
+                user.profile.enrollment_no = f"22030310{i:04d}"
+                user.profile.save()
+                content = f"%PDF-zip-{i}".encode()
+                # Cached sheets keep the pool from forking parsers in tests
+                store_rows(content_digest(content), rows)
+                archive.writestr(f"class/22030310{i:04d}_sem1.pdf", content)
+            archive.writestr("class/220303109999_sem1.pdf", b"%PDF-unknown")
+            archive.writestr("class/220303100000_sem2.pdf", b"not a pdf")
+
+        report = ingest_grade_sheet_zip(buffer, batch_size=10)
+
+        self.assertEqual(
+            report["totals"],
+            {"files": 6, "completed": 4, "failed": 1, "skipped": 1, "subjects": 32}
+        )
+        self.assertEqual(SemesterResult.objects.filter(semester=1).count(), 32)
+        failed = [item for item in report["files"] if item["status"] == "FAILED"]
+        self.assertEqual(failed[0]["error"], "not a PDF")
+
+    def test_corrupt_member_fails_alone(self):
+        rows = [{"subject": "Web Technology", "grade": "A"}]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+            for i in range(3):
+                user = get_user_model().objects.create_user(email=f"zip-crc{i}@example.com")
+                user.profile.enrollment_no = f"22030320{i:04d}"
+                user.profile.save()
+                content = f"%PDF-crc-member-{i}".encode()
+                store_rows(content_digest(content), rows)
+                archive.writestr(f"22030320{i:04d}_sem1.pdf", content)
+        # Flip a byte inside the second member's data so its CRC check fails
+        data = buffer.getvalue().replace(b"%PDF-crc-member-1", b"%PDF-crc-member-X")
+
+        report = ingest_grade_sheet_zip(io.BytesIO(data), batch_size=1)
+
+        statuses = {item["file"]: (item["status"], item["error"]) for item in report["files"]}
+        self.assertEqual(statuses["220303200000_sem1.pdf"], ("COMPLETED", ""))
+        self.assertEqual(statuses["220303200002_sem1.pdf"], ("COMPLETED", ""))
+        status, error = statuses["220303200001_sem1.pdf"]
+        self.assertEqual(status, "FAILED")
+        self.assertIn("corrupt archive entry", error)
+        self.assertEqual(SemesterResult.objects.count(), 2)
+
+    def _post_archive(self, content, name="class.zip"):
+        staff = get_user_model().objects.create_user(email="zip-staff@example.com", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(staff)
+        upload = io.BytesIO(content)
+        upload.name = name
+        return client, client.post("/api/academics/bulk-result-zip/", {"file": upload}, format="multipart")
+
+    def test_upload_is_queued_and_the_worker_stores_its_report(self):
+        upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(upload_dir.cleanup)
+        rows = [{"subject": "Web Technology", "grade": "A"}]
+        user = get_user_model().objects.create_user(email="zip-queued@example.com")
+        user.profile.enrollment_no = "220303105123"
+        user.profile.save()
+        content = b"%PDF-queued"
+        store_rows(content_digest(content), rows)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("220303105123_sem1.pdf", content)
+
+        with self.settings(RESULT_UPLOAD_DIR=upload_dir.name):
+            with mock.patch("apps.academics.zip_ingestion.extract_grades_from_pdfs") as parse:
+                client, response = self._post_archive(buffer.getvalue())
+            parse.assert_not_called()
+            self.assertEqual(response.status_code, 202)
+            self.assertFalse(SemesterResult.objects.exists())
+
+            job = claim_next_job()
+            self.assertEqual(job.id, response.data["job_id"])
+            process_job(job)
+
+            self.assertEqual(os.listdir(upload_dir.name), [])
+            status = client.get(response.data["status_url"]).data
+
+        self.assertEqual(status["status"], ResultIngestionJob.STATUS_COMPLETED)
+        self.assertEqual(status["report"]["totals"]["completed"], 1)
+        self.assertEqual(SemesterResult.objects.filter(student=user).count(), 1)
+
+    def test_invalid_archive_is_rejected_without_queueing(self):
+        _, response = self._post_archive(b"not a zip")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ResultIngestionJob.objects.exists())
+
+
+class StudentAnalysisQueryBudgetTests(TestCase):
+    url = "/api/academics/analysis/"
+
+    def setUp(self):
+        self.student = get_user_model().objects.create_user(email="analysis@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_no_results(self):
+        with self.assertNumQueries(1):
+            self.assertFalse(compute_student_analysis(self.student)["has_results"])
+
+    def test_compute_query_count_does_not_grow_with_results(self):
+        # semester aggregates, subject rows, profile
+        replace_semester_results(self.student, {1: _subjects(2, marks=60)})
+        with self.assertNumQueries(3):
+            compute_student_analysis(self.student)
+
+        replace_semester_results(self.student, {sem: _subjects(10, marks=50 + sem) for sem in range(1, 7)})
+        with self.assertNumQueries(3):
+            payload = compute_student_analysis(self.student)
+
+        self.assertEqual(payload["total_subjects"], 60)
+        self.assertEqual(payload["semesters_uploaded"], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(payload["cgpa"], 5.35)
+        self.assertEqual(payload["semester_scores"][5]["sgpa"], 5.6)
+
+
+class StudentAnalysisSnapshotTests(TestCase):
+    url = "/api/academics/analysis/"
+
+    def setUp(self):
+        self.student = get_user_model().objects.create_user(email="snapshot@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_fresh_snapshot_is_read_without_recomputing(self):
+        replace_semester_results(self.student, {1: _subjects(10)})
+        self.client.get(self.url)
+
+        # ETag data version, snapshot
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data["total_subjects"], 10)
+
+    def test_writes_make_the_snapshot_stale(self):
+        self.client.get(self.url)
+        replace_semester_results(self.student, {1: _subjects(4)})
+        self.assertEqual(self.client.get(self.url).data["total_subjects"], 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SemesterResult.objects.create(student=self.student, semester=2, subject="Maths", marks=90)
+        snapshot = StudentAnalysisSnapshot.objects.get(student=self.student)
+        self.assertFalse(snapshot.is_stale)
+        self.assertEqual(snapshot.payload["total_subjects"], 5)
+
+        version = snapshot.data_version
+        StudentProfile.objects.create(user=self.student, assessment_domain_scores={"ai_ml": 90})
+        snapshot.refresh_from_db()
+        self.assertEqual(snapshot.data_version, version + 1)
+        self.assertTrue(snapshot.is_stale)
+
+    def test_new_model_makes_the_snapshot_stale(self):
+        replace_semester_results(self.student, {1: _subjects(4)})
+        # Stored with the fingerprint the prediction reported, which model_fingerprint() then matches
+        self.client.get(self.url)
+        with mock.patch("apps.academics.analysis.compute_student_analysis_served") as compute:
+            self.client.get(self.url)
+        compute.assert_not_called()
+
+        with mock.patch("apps.academics.analysis.model_fingerprint", return_value="model.npz:2:100"):
+            with mock.patch(
+                "apps.academics.analysis.compute_student_analysis_served", return_value=({"total_subjects": 4}, None)
+            ) as compute:
+                self.client.get(self.url)
+            compute.assert_called_once()
+
+        snapshot = StudentAnalysisSnapshot.objects.get(student=self.student)
+        self.assertEqual(snapshot.model_fingerprint, "model.npz:2:100")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.student = get_user_model().objects.create_user(email="etag@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+        replace_semester_results(self.student, {1: _subjects(3)})
+
+    def test_matching_etag_returns_304_without_running_the_view(self):
+        for url in ("/api/academics/analysis/", "/api/academics/my-results/", "/api/academics/student-profile/"):
+            etag = self.client.get(url)["ETag"]
+
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        url = "/api/academics/my-results/"
+        etag = self.client.get(url)["ETag"]
+
+        replace_semester_results(self.student, {2: _subjects(2)})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        StudentProfile.objects.create(user=self.student)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_deletes_change_the_payload_and_etag(self):
+        url = "/api/academics/analysis/"
+        replace_semester_results(self.student, {2: _subjects(2)})
+        response = self.client.get(url)
+        self.assertEqual(response.data["total_subjects"], 5)
+
+        SemesterResult.objects.filter(student=self.student, semester=2).delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_subjects"], 3)
+
+        SemesterResult.objects.filter(student=self.student).first().delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_subjects"], 2)
+
+    def test_new_model_changes_only_prediction_etags(self):
+        urls = {"/api/academics/analysis/": 200, "/api/academics/my-results/": 304, "/api/roadmap/generate/": 304}
+        with mock.patch("apps.academics.etags.model_fingerprint", return_value="model.npz:1:100"):
+            etags = {url: self.client.get(url)["ETag"] for url in urls}
+
+        with mock.patch("apps.academics.etags.model_fingerprint", return_value="model.npz:2:100"):
+            for url, expected in urls.items():
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etags[url]).status_code, expected)
+
+    def test_etag_read_writes_nothing_and_first_write_changes_it(self):
+        student = get_user_model().objects.create_user(email="etag-new@example.com")
+        self.client.force_authenticate(student)
+        url = "/api/academics/my-results/"
+
+        with self.assertNumQueries(2):
+            etag = self.client.get(url)["ETag"]
+        self.assertFalse(StudentAnalysisSnapshot.objects.filter(student=student).exists())
+
+        replace_semester_results(student, {1: _subjects(2)})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,30 @@
+#timing.py
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Accumulates wall-clock time per named stage of the upload pipeline"""
+
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start
+
+    def merge(self, durations_ms):
+        """Add durations (in ms) reported by another timer, e.g. from a parser process"""
+        for name, ms in durations_ms.items():
+            self.durations[name] = self.durations.get(name, 0.0) + ms / 1000
+
+    def as_dict(self):
+        """Durations per stage in milliseconds"""
+        return {name: round(seconds * 1000, 2) for name, seconds in self.durations.items()}
+
+    def summary(self):
+        return " ".join(f"{name}={ms}ms" for name, ms in self.as_dict().items())
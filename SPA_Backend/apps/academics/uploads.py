@@ -0,0 +1,89 @@
+#uploads.py
+"""
+Upload handling for result PDFs.
+
+UploadResultPDFView swaps Django's default upload handlers for
+result_pdf_upload_handlers(), so every file is streamed chunk by chunk to a
+temp file instead of being buffered in memory. The first chunk must start
+with the PDF magic bytes and the running size is checked against
+RESULT_PDF_MAX_BYTES, so non-PDFs and oversized files are rejected while
+they are still arriving rather than after they have been read in full.
+
+Accepted files are then moved (or copied chunk by chunk) into
+RESULT_UPLOAD_DIR by store_upload(), where the ingestion worker reads them;
+they are never read into memory as a whole.
+"""
+import logging
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import FileUploadHandler, TemporaryFileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+PDF_MAGIC = b"%PDF-"
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Uploaded file is too large"
+    default_code = "upload_too_large"
+
+
+class NotAPDF(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "Uploaded file is not a PDF"
+    default_code = "not_a_pdf"
+
+
+class ResultPDFUploadHandler(FileUploadHandler):
+    """Checks magic bytes and size of each streamed chunk, then passes it on unchanged"""
+
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or settings.RESULT_PDF_MAX_BYTES
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and not raw_data.startswith(PDF_MAGIC):
+            raise NotAPDF(f"{self.file_name} is not a PDF")
+        if start + len(raw_data) > self.max_bytes:
+            raise UploadTooLarge(
+                f"{self.file_name} is larger than the {self.max_bytes / (1024 * 1024):.1f} MB limit"
+            )
+        return raw_data
+
+    def file_complete(self, file_size):
+        if file_size == 0:
+            raise NotAPDF(f"{self.file_name} is empty")
+        # Let the temp file handler build the UploadedFile
+        return None
+
+
+def result_pdf_upload_handlers(request):
+    return [ResultPDFUploadHandler(request), TemporaryFileUploadHandler(request)]
+
+
+def upload_storage():
+    return FileSystemStorage(location=settings.RESULT_UPLOAD_DIR)
+
+
+def store_upload(uploaded_file, name):
+    """Save an uploaded file for the ingestion worker; returns its stored name"""
+    return upload_storage().save(name, uploaded_file)
+
+
+def stored_upload_path(name):
+    return upload_storage().path(name)
+
+
+def discard_stored_uploads(names):
+    storage = upload_storage()
+    for name in names:
+        if not name:
+            continue
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning("Could not delete stored upload %s", name, exc_info=True)
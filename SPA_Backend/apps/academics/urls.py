@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import SemesterResultCreateView, SemesterResultListView, StudentProfileView, ProctoringEventView, UploadResultPDFView, StudentAnalysisView, ManualMarksEntryView, HealthCheckView
+from .views import SemesterResultCreateView, SemesterResultListView, StudentProfileView, ProctoringEventView, UploadResultPDFView, StudentAnalysisView, ManualMarksEntryView, HealthCheckView, IngestionJobStatusView, IngestionMetricsView, BulkMarksImportView, BulkMarksImportStatusView, BulkMarksImportJobStatusView, ResultZipIngestionView, ResultZipIngestionStatusView
 
 
 urlpatterns = [
@@ -8,6 +8,13 @@ urlpatterns = [
     path('add/', SemesterResultCreateView.as_view()),
     path('my-results/', SemesterResultListView.as_view()),
     path("upload-result-pdf/", UploadResultPDFView.as_view(), name="upload-result-pdf"),
+    path("ingestion-jobs/<int:pk>/", IngestionJobStatusView.as_view(), name="ingestion-job-status"),
+    path("ingestion-metrics/", IngestionMetricsView.as_view(), name="ingestion-metrics"),
+    path("bulk-imports/", BulkMarksImportView.as_view(), name="bulk-marks-import"),
+    path("bulk-result-zip/", ResultZipIngestionView.as_view(), name="bulk-result-zip"),
+    path("bulk-result-zip/<int:pk>/", ResultZipIngestionStatusView.as_view(), name="bulk-result-zip-status"),
+    path("bulk-imports/<int:pk>/", BulkMarksImportStatusView.as_view(), name="bulk-marks-import-status"),
+    path("bulk-imports/jobs/<int:pk>/", BulkMarksImportJobStatusView.as_view(), name="bulk-marks-import-job-status"),
     path('analysis/', StudentAnalysisView.as_view(), name='student-analysis'),
     path('manual-marks/', ManualMarksEntryView.as_view(), name='manual-marks'),
     path("health/", HealthCheckView.as_view()),
@@ -1,20 +1,38 @@
 #views.py
-from urllib import request
-from django.shortcuts import render
-from numpy import rint
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import generics, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.parsers import MultiPartParser, FormParser
 
-import re
-
-from .models import ProctoringEvent, SemesterResult, StudentProfile
-from .serializers import ProctoringEventSerializer, SemesterResultSerializer, StudentProfileSerializer
-from apps.ml_engine.predictor import predict_domain
-from apps.academics.pdf_extractor import extract_grades_from_pdf
+import logging
+import os
+import zipfile
+
+from .models import BulkMarksImport, ProctoringEvent, ResultIngestionJob, SemesterResult, StudentProfile
+from .serializers import (
+    BulkMarksImportSerializer,
+    FileIngestionJobSerializer,
+    ManualMarksBatchSerializer,
+    ManualSemesterMarksSerializer,
+    ProctoringEventSerializer,
+    ResultIngestionJobSerializer,
+    SemesterResultSerializer,
+    StudentProfileSerializer,
+)
+from .analysis import get_student_analysis, refresh_snapshot_on_commit
+from .bulk_import import SUPPORTED_EXTENSIONS
+from .etags import student_etag
+from .ingestion import enqueue_class_zip, enqueue_marks_import, enqueue_result_upload
+from .metrics import ingestion_metrics
+from .services import replace_semester_results
+from .uploads import NotAPDF, UploadTooLarge, result_pdf_upload_handlers
+
+logger = logging.getLogger(__name__)
 
 
 def _get_client_ip(request):
@@ -32,6 +50,7 @@ class SemesterResultCreateView(generics.CreateAPIView):
         serializer.save(student=self.request.user)
 
 
+@method_decorator(condition(etag_func=student_etag("my-results")), name="get")
 class SemesterResultListView(generics.ListAPIView):
     serializer_class = SemesterResultSerializer
     permission_classes = [IsAuthenticated]
@@ -40,6 +59,7 @@ class SemesterResultListView(generics.ListAPIView):
         return SemesterResult.objects.filter(student=self.request.user)
 
 
+@method_decorator(condition(etag_func=student_etag("student-profile")), name="get")
 class StudentProfileView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -145,20 +165,27 @@ class UploadResultPDFView(APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
-    
+    def initialize_request(self, request, *args, **kwargs):
+        # Stream PDFs to temp files, rejecting non-PDFs and oversized files mid-upload
+        request.upload_handlers = result_pdf_upload_handlers(request)
+        return super().initialize_request(request, *args, **kwargs)
+
     def post(self, request):
-        print("FILES:", request.FILES)
-        print("DATA:", request.data)
+        try:
+            files = request.FILES
+        except (NotAPDF, UploadTooLarge) as e:
+            return Response({"error": str(e.detail)}, status=e.status_code)
+
+        logger.debug("Result upload from user %s: files=%s", request.user.pk, list(files))
 
-        uploaded_semesters = []
-        total_subjects = 0
+        uploads = {}
 
         for sem in range(1, 7):
             field = f"semester_{sem}"
-            if field not in request.FILES:
+            if field not in files:
                 continue
 
-            pdf_file = request.FILES[field]
+            pdf_file = files[field]
 
             if not pdf_file.name.lower().endswith(".pdf"):
                 return Response(
@@ -166,451 +193,239 @@ class UploadResultPDFView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            try:
-                extracted = extract_grades_from_pdf(pdf_file)
-                print(f"[DEBUG] Extracted data for semester {sem}:", extracted)
-
-                if not extracted:
-                    raise ValueError("PDF parsed but no grade data found (unsupported format)")
-                SemesterResult.objects.filter(
-                    student=request.user,
-                    semester=sem
-                ).delete()
-
-                saved_subjects = []
-
-                for item in extracted:
-                    marks = self.grade_to_marks(item["grade"])
-
-                    SemesterResult.objects.update_or_create(
-                        student=request.user,
-                        semester=sem,
-                        subject=item["subject"],
-                        defaults={'marks': marks}
-                    )
-
-                    saved_subjects.append({
-                        "subject": item["subject"],
-                        "grade": item["grade"],
-                        "marks": marks
-                    })
-
-                uploaded_semesters.append({
-                    "semester": sem,
-                    "subjects_count": len(saved_subjects),
-                    "subjects": saved_subjects
-                })
-
-                total_subjects += len(saved_subjects)
-
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
-                return Response(
-                    {"error": f"Semester {sem} failed: {str(e)}"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            uploads[sem] = pdf_file
 
-        if not uploaded_semesters:
+        if not uploads:
             return Response(
                 {"error": "No valid PDFs uploaded"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        marks_map = {}
-        for r in SemesterResult.objects.filter(student=request.user):
-            marks_map[r.subject.upper()] = r.marks
+        # Parsing happens in the process_ingestion_jobs worker, not in the request
+        job = enqueue_result_upload(request.user, uploads)
+        logger.info("Queued ingestion job %s for semesters %s", job.id, sorted(uploads))
+
+        return Response(
+            {
+                "message": "Results queued for processing",
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/academics/ingestion-jobs/{job.id}/"
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class IngestionMetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(ingestion_metrics(), status=status.HTTP_200_OK)
+
+
+class IngestionJobStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = ResultIngestionJob.objects.filter(
+            pk=pk,
+            student=request.user
+        ).prefetch_related("files").first()
+
+        if not job:
+            return Response(
+                {"error": "Ingestion job not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        serializer = ResultIngestionJobSerializer(job)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+
+class BulkMarksImportView(APIView):
+    """Admin-only CSV/XLSX marks import, run by the ingestion worker; re-posting a file resumes its unfinished import"""
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
 
-        prediction = predict_domain(marks_map)
+    def initialize_request(self, request, *args, **kwargs):
+        # Spooled to disk, then moved into RESULT_UPLOAD_DIR for the worker
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None or os.path.splitext(upload.name)[1].lower() not in SUPPORTED_EXTENSIONS:
+            return Response(
+                {"error": "A CSV or XLSX file is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        resume = str(request.data.get("resume", "true")).lower() != "false"
+        job = enqueue_marks_import(upload, request.user, resume=resume)
+        logger.info("Queued marks import job %s (%s)", job.id, upload.name)
 
         return Response(
             {
-                "message": "Results processed successfully",
-                "uploaded_semesters": uploaded_semesters,
-                "total_subjects": total_subjects,
-                "domain_recommendation": prediction
+                "message": "File queued for import",
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/academics/bulk-imports/jobs/{job.id}/"
             },
-            status=status.HTTP_200_OK
+            status=status.HTTP_202_ACCEPTED
         )
 
-    def grade_to_marks(self, grade):
-        grade_map = {
-            "O": 95,
-            "A+": 85,
-            "A": 75,
-            "B+": 65,
-            "B": 55,
-            "P": 45,
-            "F": 30
-        }
-        return grade_map.get(grade, 50)
 
-    
+class BulkMarksImportStatusView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, pk):
+        run = BulkMarksImport.objects.filter(pk=pk).first()
+        if not run:
+            return Response(
+                {"error": "Import not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(BulkMarksImportSerializer(run).data, status=status.HTTP_200_OK)
+
+
+class ResultZipIngestionView(APIView):
+    """Admin-only: queue a ZIP of <enrollment>_sem<N>.pdf grade sheets for a whole class"""
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Spooled to disk, then moved into RESULT_UPLOAD_DIR for the worker
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def post(self, request):
+        archive = request.FILES.get("file")
+        if archive is None or not archive.name.lower().endswith(".zip"):
+            return Response(
+                {"error": "A ZIP file is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Reads only the central directory; the entries are parsed by the worker
+        if not zipfile.is_zipfile(archive.temporary_file_path()):
+            return Response({"error": "File is not a valid ZIP archive"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = enqueue_class_zip(archive, request.user)
+        logger.info("Queued class ZIP ingestion job %s (%s)", job.id, archive.name)
+
+        return Response(
+            {
+                "message": "Archive queued for processing",
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/academics/bulk-result-zip/{job.id}/"
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class ResultZipIngestionStatusView(APIView):
+    permission_classes = [IsAdminUser]
+    kind = ResultIngestionJob.KIND_CLASS_ZIP
+
+    def get(self, request, pk):
+        job = ResultIngestionJob.objects.filter(pk=pk, kind=self.kind).first()
+        if not job:
+            return Response(
+                {"error": "Ingestion job not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(FileIngestionJobSerializer(job).data, status=status.HTTP_200_OK)
+
+
+class BulkMarksImportJobStatusView(ResultZipIngestionStatusView):
+    """The queued marks import; report["import_id"] names its BulkMarksImport once it has started"""
+    kind = ResultIngestionJob.KIND_MARKS_IMPORT
+
+
+@method_decorator(condition(etag_func=student_etag("analysis", with_model=True)), name="get")
 class StudentAnalysisView(APIView):
     permission_classes = [IsAuthenticated]
-    DOMAIN_KEYS = (
-        "frontend",
-        "backend",
-        "ai_ml",
-        "cybersecurity",
-        "data_science",
-        "mobile",
-        "devops",
-        "iot",
-        "blockchain",
-        "game_dev",
-    )
 
     def get(self, request):
         """Get student's results and analysis"""
         try:
-            results = SemesterResult.objects.filter(student=request.user).order_by('semester', 'subject')
-            
-            if not results.exists():
-                return Response({
-                    "has_results": False,
-                    "message": "No results uploaded yet"
-                }, status=status.HTTP_200_OK)
-            
-            # Get unique semesters
-            semesters_uploaded = list(results.values_list('semester', flat=True).distinct().order_by('semester'))
-            
-            # Calculate overall CGPA
-            total_marks = sum(result.marks for result in results)
-            cgpa = (total_marks / (results.count() * 100)) * 10
-            
-            # Semester-wise breakdown
-            semester_data = {}
-            for result in results:
-                sem = result.semester
-                if sem not in semester_data:
-                    semester_data[sem] = {
-                        'subjects': [],
-                        'total_marks': 0,
-                        'count': 0
-                    }
-                semester_data[sem]['subjects'].append({
-                    'subject': result.subject,
-                    'marks': result.marks,
-                    'grade': self.marks_to_grade(result.marks)
-                })
-                semester_data[sem]['total_marks'] += result.marks
-                semester_data[sem]['count'] += 1
-            
-            # Calculate SGPA for each semester
-            semester_scores = []
-            for sem in range(1, 7):
-                if sem in semester_data:
-                    sem_avg = semester_data[sem]['total_marks'] / semester_data[sem]['count']
-                    sgpa = (sem_avg / 100) * 10
-                    semester_scores.append({
-                        'semester': sem,
-                        'score': round(sem_avg, 2),
-                        'sgpa': round(sgpa, 2),
-                        'subjects': semester_data[sem]['subjects'],
-                        'has_data': True
-                    })
-                else:
-                    semester_scores.append({
-                        'semester': sem,
-                        'score': 0,
-                        'sgpa': 0,
-                        'subjects': [],
-                        'has_data': False
-                    })
-            
-            profile = StudentProfile.objects.filter(user=request.user).first()
-
-            # Domain recommendation
-            domain_recommendation = self.analyze_domain(results, profile)
-            
-            return Response({
-                "has_results": True,
-                "cgpa": round(cgpa, 2),
-                "semesters_uploaded": semesters_uploaded,
-                "total_semesters": len(semesters_uploaded),
-                "semester_scores": semester_scores,
-                "domain_recommendation": domain_recommendation,
-                "total_subjects": results.count()
-            }, status=status.HTTP_200_OK)
-            
+            payload, _ = get_student_analysis(request.user)
         except Exception as e:
-            print(f"Error fetching analysis: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error fetching analysis for user %s", request.user.pk)
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-    
-    def marks_to_grade(self, marks):
-        """Convert marks to grade"""
-        if marks >= 90:
-            return 'O'
-        elif marks >= 80:
-            return 'A+'
-        elif marks >= 70:
-            return 'A'
-        elif marks >= 60:
-            return 'B+'
-        elif marks >= 50:
-            return 'B'
-        elif marks >= 40:
-            return 'P'
-        else:
-            return 'F'
-    
-    def _normalize_domain_scores(self, source_scores):
-        normalized = {key: 0.0 for key in self.DOMAIN_KEYS}
-        if not isinstance(source_scores, dict):
-            return normalized
-
-        for key in self.DOMAIN_KEYS:
-            value = source_scores.get(key, 0)
-            try:
-                numeric_value = float(value)
-            except (TypeError, ValueError):
-                numeric_value = 0.0
-            normalized[key] = max(0.0, min(100.0, numeric_value))
-
-        return normalized
-
-    def _blend_domain_scores(self, marks_map, assessment_map, has_assessment_data):
-        if not has_assessment_data:
-            return marks_map
-
-        blended = {}
-        for key in self.DOMAIN_KEYS:
-            blended[key] = round((marks_map[key] * 0.7) + (assessment_map[key] * 0.3), 2)
-        return blended
-
-    def analyze_domain(self, results, profile):
-        """Analyze and recommend career domain based on ML prediction"""
-        
-        # Initialize subject category scores
-        marks_map = {
-            'frontend': 0,
-            'backend': 0,
-            'ai_ml': 0,
-            'cybersecurity': 0,
-            'data_science': 0,
-            'mobile': 0,
-            'devops': 0,
-            'iot': 0,
-            'blockchain': 0,
-            'game_dev': 0
-        }
-        
-        # Subject keywords mapping to categories
-        subject_keywords = {
-            'frontend': ['web', 'html', 'css', 'javascript', 'react', 'angular', 'vue', 'ui', 'ux', 'frontend'],
-            'backend': ['backend', 'server', 'api', 'database', 'sql', 'node', 'django', 'flask', 'spring', '.net', 'java', 'programming'],
-            'ai_ml': ['machine learning', 'artificial intelligence', 'neural', 'deep learning', 'ai', 'ml', 'nlp', 'computer vision'],
-            'cybersecurity': ['security', 'cryptography', 'network security', 'ethical hacking', 'information security', 'cyber'],
-            'data_science': ['data', 'statistics', 'analytics', 'visualization', 'mining', 'big data', 'data science'],
-            'mobile': ['mobile', 'android', 'ios', 'flutter', 'react native', 'swift', 'kotlin'],
-            'devops': ['devops', 'docker', 'kubernetes', 'ci/cd', 'jenkins', 'aws', 'cloud', 'deployment'],
-            'iot': ['iot', 'internet of things', 'embedded', 'sensors', 'arduino', 'raspberry'],
-            'blockchain': ['blockchain', 'cryptocurrency', 'smart contract', 'ethereum', 'web3'],
-            'game_dev': ['game', 'unity', '3d', 'graphics', 'animation', 'game development']
-        }
-        
-        # Count for averaging
-        counts = {key: 0 for key in marks_map.keys()}
-        
-        # Classify subjects and aggregate marks
-        for result in results:
-            subject_name = result.subject.lower()
-            marks = result.marks
-            
-            matched = False
-            for category, keywords in subject_keywords.items():
-                if not matched:  # Only count each subject once
-                    for keyword in keywords:
-                        if keyword in subject_name:
-                            marks_map[category] += marks
-                            counts[category] += 1
-                            matched = True
-                            break
-        
-        # Calculate averages (avoid division by zero)
-        for category in marks_map.keys():
-            if counts[category] > 0:
-                marks_map[category] = marks_map[category] / counts[category]
-            else:
-                marks_map[category] = 0
-        
-        print(f"Marks map for prediction: {marks_map}")  # Debug log
-        
-        raw_assessment_scores = getattr(profile, "assessment_domain_scores", {}) if profile else {}
-        assessment_map = self._normalize_domain_scores(raw_assessment_scores)
-        has_assessment_data = any(score > 0 for score in assessment_map.values())
-        model_features = self._blend_domain_scores(marks_map, assessment_map, has_assessment_data)
-
-        # Use ML predictor with blended model inputs
-        try:
-            from apps.ml_engine.predictor import predict_domain
-            prediction, confidence = predict_domain(model_features)
-            
-            # Map ML prediction to display-friendly names
-            domain_name_mapping = {
-                'frontend': 'Frontend Development',
-                'backend': 'Backend Development',
-                'ai_ml': 'AI/ML',
-                'cybersecurity': 'Cybersecurity',
-                'data_science': 'Data Science',
-                'mobile': 'Mobile Development',
-                'devops': 'DevOps',
-                'iot': 'IoT',
-                'blockchain': 'Blockchain',
-                'game_dev': 'Game Development'
-            }
-            
-            recommended_domain = domain_name_mapping.get(prediction, 'Software Engineering')
-            
-            # If model confidence is weak, rely on blended-score fallback.
-            if confidence < 35:
-                top_feature_score = max(model_features.values())
-                if top_feature_score > 0:
-                    prediction = max(model_features.items(), key=lambda item: item[1])[0]
-                    confidence = round(top_feature_score, 2)
-
-            # Create top domains list from blended domain scores
-            sorted_categories = sorted(model_features.items(), key=lambda x: x[1], reverse=True)
-            top_domains = [
-                {
-                    'domain': domain_name_mapping.get(cat, cat),
-                    'score': round(score, 2)
-                }
-                for cat, score in sorted_categories[:3]
-                if score > 0
-            ]
-            
-        except Exception as e:
-            print(f"ML prediction error: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            
-            # Fallback to keyword-based recommendation
-            domain_keywords = {
-                'AI/ML': ['machine learning', 'artificial intelligence', 'data mining', 'neural', 'deep learning'],
-                'Web Development': ['web', 'internet', 'html', 'javascript', 'react', '.net', 'programming'],
-                'Cybersecurity': ['security', 'cryptography', 'network security', 'ethical hacking', 'information security'],
-                'IoT': ['iot', 'internet of things', 'embedded', 'sensors'],
-                'Data Science': ['data', 'statistics', 'analytics', 'visualization', 'mining'],
-                'Software Engineering': ['software', 'engineering', 'design patterns', 'testing', 'project']
-            }
-            
-            domain_scores = {domain: 0 for domain in domain_keywords.keys()}
-            
-            for result in results:
-                subject_name = result.subject.lower()
-                marks = result.marks
-                
-                for domain, keywords in domain_keywords.items():
-                    for keyword in keywords:
-                        if keyword in subject_name:
-                            domain_scores[domain] += marks
-                            break
-            
-            sorted_domains = sorted(domain_scores.items(), key=lambda x: x[1], reverse=True)
-            top_domains = [
-                {'domain': domain, 'score': round(score, 2)} 
-                for domain, score in sorted_domains[:3] 
-                if score > 0
-            ]
-            
-            recommended_domain = top_domains[0]['domain'] if top_domains else 'Software Engineering'
-            confidence = 0
-        
-        # Find weak and strong subjects
-        weak_subjects = sorted(results, key=lambda x: x.marks)[:3]
-        weak_areas = [result.subject for result in weak_subjects]
-        
-        strong_subjects = sorted(results, key=lambda x: x.marks, reverse=True)[:3]
-        
-        return {
-            'recommended_domain': recommended_domain,
-            'confidence': confidence,
-            'top_domains': top_domains,
-            'weak_areas': weak_areas,
-            'strong_subjects': [s.subject for s in strong_subjects],
-            'prediction_signals': {
-                'used_assessment_answers': has_assessment_data,
-            }
-        }
+
+        return Response(payload, status=status.HTTP_200_OK)
 
 
-    
-    def marks_to_grade(self, marks):
-        """Convert marks to grade"""
-        if marks >= 90:
-            return 'O'
-        elif marks >= 80:
-            return 'A+'
-        elif marks >= 70:
-            return 'A'
-        elif marks >= 60:
-            return 'B+'
-        elif marks >= 50:
-            return 'B'
-        elif marks >= 40:
-            return 'P'
-        else:
-            return 'F'
-    
 class ManualMarksEntryView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        """Save manually entered marks"""
-        try:
-            semester = request.data.get('semester')
-            subjects = request.data.get('subjects', [])
-
-            if not semester or not subjects:
-                return Response(
-                    {"error": "Semester and subjects are required"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        """
+        Save manually entered marks.
+
+        Accepts one semester ({"semester", "subjects"}) or several
+        ({"semesters": [{"semester", "subjects"}, ...]}). Everything is
+        validated before any write, and all semesters are replaced in one
+        transaction.
+        """
+        multi = "semesters" in request.data
+        if multi:
+            serializer = ManualMarksBatchSerializer(data=request.data)
+        else:
+            serializer = ManualSemesterMarksSerializer(data=request.data)
 
-            # Delete existing results for this semester
-            SemesterResult.objects.filter(
-                student=request.user,
-                semester=semester
-            ).delete()
-
-            # Save new results
-            saved_subjects = []
-            for subject_data in subjects:
-                result = SemesterResult.objects.create(
-                    student=request.user,
-                    semester=semester,
-                    subject=subject_data['subject'],
-                    marks=subject_data['marks']
-                )
-                saved_subjects.append({
-                    'subject': result.subject,
-                    'marks': result.marks,
-                    'grade': subject_data['grade']
-                })
+        if not serializer.is_valid():
+            return Response(
+                {"error": "Semester and valid subjects are required", "details": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            return Response({
-                "message": f"Marks for Semester {semester} saved successfully",
-                "semester": semester,
-                "subjects_saved": len(saved_subjects),
-                "subjects": saved_subjects
-            }, status=status.HTTP_201_CREATED)
+        entries = serializer.validated_data["semesters"] if multi else [serializer.validated_data]
 
+        try:
+            replace_semester_results(request.user, {
+                entry["semester"]: {item["subject"]: item["marks"] for item in entry["subjects"]}
+                for entry in entries
+            })
         except Exception as e:
-            print(f"Error saving manual marks: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error saving manual marks for user %s", request.user.pk)
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        
+
+        refresh_snapshot_on_commit(request.user.pk)
+
+        saved = [
+            {
+                "semester": entry["semester"],
+                "subjects_saved": len(entry["subjects"]),
+                "subjects": [
+                    {"subject": item["subject"], "marks": item["marks"], "grade": item["grade"]}
+                    for item in entry["subjects"]
+                ]
+            }
+            for entry in entries
+        ]
+
+        if not multi:
+            return Response({
+                "message": f"Marks for Semester {saved[0]['semester']} saved successfully",
+                **saved[0]
+            }, status=status.HTTP_201_CREATED)
+
+        return Response({
+            "message": f"Marks for {len(saved)} semester(s) saved successfully",
+            "subjects_saved": sum(entry["subjects_saved"] for entry in saved),
+            "semesters": saved
+        }, status=status.HTTP_201_CREATED)
+
 
 class HealthCheckView(APIView):
     authentication_classes = []
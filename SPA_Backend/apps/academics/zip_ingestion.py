@@ -0,0 +1,220 @@
+#zip_ingestion.py
+"""
+Whole-class ingestion of grade sheets from one ZIP archive.
+
+Entries are read one batch at a time straight out of the archive (nothing
+is extracted to disk), mapped to a student and semester from their names,
+parsed concurrently by pdf_pool, and each batch's results are written in a
+single transaction via replace_results_for_students. Sheets already in the
+extraction cache are not parsed again.
+
+Entry names must contain the enrollment number followed by the semester,
+e.g. 220303105123_sem4.pdf or 220303105123/Semester 4.pdf.
+"""
+import logging
+import os
+import re
+import time
+import zipfile
+import zlib
+
+from django.conf import settings
+
+from apps.accounts.models import UserProfile
+
+from .extraction_cache import content_digest, get_cached_rows, store_rows
+from .ingestion import grade_to_marks
+from .pdf_pool import extract_grades_from_pdfs
+from .services import replace_results_for_students
+from .uploads import PDF_MAGIC
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+
+ENTRY_NAME_RE = re.compile(
+    r"(?P<enrollment>[A-Za-z0-9]+)[\s_\-/]+sem(?:ester)?[\s_\-]*(?P<semester>[1-6])(?!\d)",
+    re.IGNORECASE
+)
+
+STATUS_COMPLETED = "COMPLETED"
+STATUS_FAILED = "FAILED"
+STATUS_SKIPPED = "SKIPPED"
+
+
+def parse_entry_name(name):
+    """Return (enrollment number, semester) for an archive entry name, or None"""
+    match = ENTRY_NAME_RE.search(os.path.splitext(name)[0])
+    if not match:
+        return None
+    return match.group("enrollment"), int(match.group("semester"))
+
+
+def _entry(name, status, error="", enrollment_no=None, semester=None):
+    return {
+        "file": name,
+        "enrollment_no": enrollment_no,
+        "semester": semester,
+        "status": status,
+        "subjects": 0,
+        "extraction_tier": "",
+        "error": error,
+    }
+
+
+def _plan(archive):
+    """Map archive members to students; returns (entries to parse, report of skipped entries)"""
+    candidates = []
+    skipped = []
+
+    for info in archive.infolist():
+        name = info.filename
+        if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+            continue
+        if not name.lower().endswith(".pdf"):
+            skipped.append(_entry(name, STATUS_SKIPPED, "not a PDF"))
+            continue
+        target = parse_entry_name(name)
+        if target is None:
+            skipped.append(_entry(name, STATUS_SKIPPED, "name does not contain <enrollment>_sem<N>"))
+            continue
+        candidates.append((info, target))
+
+    students = dict(
+        UserProfile.objects.filter(
+            enrollment_no__in={enrollment for _, (enrollment, _) in candidates}
+        ).values_list("enrollment_no", "user_id")
+    )
+
+    planned = []
+    seen = set()
+    for info, (enrollment, semester) in candidates:
+        student_id = students.get(enrollment)
+        if student_id is None:
+            skipped.append(_entry(info.filename, STATUS_SKIPPED, "unknown enrollment number", enrollment, semester))
+        elif (student_id, semester) in seen:
+            skipped.append(_entry(info.filename, STATUS_SKIPPED, "duplicate semester for this student", enrollment, semester))
+        elif info.file_size > settings.RESULT_PDF_MAX_BYTES:
+            # Checked against the header before anything is decompressed
+            skipped.append(_entry(info.filename, STATUS_FAILED, "file too large", enrollment, semester))
+        else:
+            seen.add((student_id, semester))
+            item = _entry(info.filename, STATUS_FAILED, "", enrollment, semester)
+            item["student_id"] = student_id
+            planned.append((info, item))
+
+    return planned, skipped
+
+
+def _extract_batch(archive, batch):
+    """Read and parse one batch; returns key -> (rows, tier) or Exception"""
+    extracted = {}
+    to_parse = {}
+    digests = {}
+
+    for index, (info, _) in enumerate(batch):
+        try:
+            data = archive.read(info)
+        except (zipfile.BadZipFile, zlib.error, OSError) as e:
+            # A corrupt member fails on its own; the rest of the archive is still read
+            extracted[index] = ValueError(f"corrupt archive entry: {e}")
+            continue
+        if not data.startswith(PDF_MAGIC):
+            extracted[index] = ValueError("not a PDF")
+            continue
+        digest = content_digest(data)
+        digests[index] = digest
+        cached = get_cached_rows(digest)
+        if cached is not None:
+            extracted[index] = (cached, "cache")
+        else:
+            to_parse[index] = data
+
+    fresh = extract_grades_from_pdfs(
+        to_parse,
+        workers=settings.PDF_PARSE_WORKERS,
+        timeout=settings.PDF_PARSE_TIMEOUT,
+        memory_limit_mb=settings.PDF_PARSE_MEMORY_LIMIT_MB
+    )
+    for index, result in fresh.items():
+        if isinstance(result, Exception):
+            extracted[index] = result
+            continue
+        rows, tier, _ = result
+        store_rows(digests[index], rows, len(to_parse[index]))
+        extracted[index] = (rows, tier)
+
+    return extracted
+
+
+def _ingest_batch(archive, batch):
+    extracted = _extract_batch(archive, batch)
+    results = {}
+
+    for index, (_, item) in enumerate(batch):
+        result = extracted[index]
+        if isinstance(result, Exception):
+            item["error"] = str(result)
+            continue
+        rows, item["extraction_tier"] = result
+        if not rows:
+            item["error"] = "PDF parsed but no grade data found (unsupported format)"
+            continue
+        results.setdefault(item["student_id"], {})[item["semester"]] = {
+            row["subject"]: grade_to_marks(row["grade"]) for row in rows
+        }
+        item["subjects"] = len(rows)
+
+    try:
+        replace_results_for_students(results)
+    except Exception as e:
+        logger.exception("Writing ZIP ingestion batch failed")
+        for _, item in batch:
+            if not item["error"]:
+                item["error"] = f"database write failed: {e}"
+        return
+
+    for _, item in batch:
+        if not item["error"]:
+            item["status"] = STATUS_COMPLETED
+
+
+def ingest_grade_sheet_zip(archive_file, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Ingest every student's grade sheets from a ZIP archive.
+
+    archive_file: path or seekable binary file object
+    progress: optional callable(done, total) called after each batch
+    Returns {"files": [per-file report], "totals": {...}, "seconds", "files_per_sec"}.
+    """
+    start = time.perf_counter()
+
+    with zipfile.ZipFile(archive_file) as archive:
+        planned, report = _plan(archive)
+
+        for offset in range(0, len(planned), batch_size):
+            batch = planned[offset:offset + batch_size]
+            _ingest_batch(archive, batch)
+            if progress:
+                progress(offset + len(batch), len(planned))
+
+    for _, item in planned:
+        del item["student_id"]
+        report.append(item)
+
+    seconds = time.perf_counter() - start
+    totals = {"files": len(report)}
+    for status in (STATUS_COMPLETED, STATUS_FAILED, STATUS_SKIPPED):
+        totals[status.lower()] = sum(1 for item in report if item["status"] == status)
+    totals["subjects"] = sum(item["subjects"] for item in report if item["status"] == STATUS_COMPLETED)
+
+    logger.info(
+        "ZIP ingestion: files=%d completed=%d failed=%d skipped=%d in %.2fs",
+        totals["files"], totals["completed"], totals["failed"], totals["skipped"], seconds
+    )
+    return {
+        "files": report,
+        "totals": totals,
+        "seconds": round(seconds, 3),
+        "files_per_sec": round(len(planned) / seconds, 2) if seconds else 0.0,
+    }
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class MlEngineConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.ml_engine'
+
+    def ready(self):
+        if settings.ML_MODEL_WARMUP:
+            from .predictor import holder
+            holder.get()
@@ -0,0 +1,158 @@
+#domain_matrix.py
+"""
+Vectorised domain scoring.
+
+WEIGHT_MATRIX is SUBJECT_DOMAIN_WEIGHTS as a subject type x domain array.
+From it, a subject x domain matrix is built for the subject catalogue
+(each row is the subject's type weights scaled by its weightage) and
+rebuilt only when the catalogue is reloaded. A batch of students' marks
+becomes a sparse student x subject matrix, and one product with the
+subject matrix gives every student's domain vector, in DOMAINS order.
+
+domain_vectors() serves single students and small batches;
+iter_cohort_domain_vectors() walks every student with marks for cohort jobs.
+"""
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from apps.academics.models import StudentMark, Subject
+
+from .domain_weights import DOMAINS, SUBJECT_DOMAIN_WEIGHTS
+
+DEFAULT_BATCH_SIZE = 500
+
+SUBJECT_TYPES = list(SUBJECT_DOMAIN_WEIGHTS)
+TYPE_INDEX = {subject_type: index for index, subject_type in enumerate(SUBJECT_TYPES)}
+
+WEIGHT_MATRIX = np.array([
+    [weights.get(domain, 0.0) for domain in DOMAINS]
+    for weights in SUBJECT_DOMAIN_WEIGHTS.values()
+])
+
+# The predictor's input feature each of DOMAINS feeds (see predictor.FEATURE_KEYS)
+DOMAIN_FEATURES = {
+    "BACKEND": "backend",
+    "WEB": "frontend",
+    "DATA": "data_science",
+    "AI_ML": "ai_ml",
+    "CYBER": "cybersecurity",
+}
+
+_lock = threading.Lock()
+_subject_state = {"catalogue": None, "index": None, "matrix": None}
+
+
+def _subject_rows(subject_types, weightages):
+    """Subject x domain rows; subjects of a type without weights score nothing"""
+    rows = np.zeros((len(subject_types), len(DOMAINS)))
+    for row, (subject_type, weightage) in enumerate(zip(subject_types, weightages)):
+        index = TYPE_INDEX.get(subject_type)
+        if index is not None:
+            rows[row] = WEIGHT_MATRIX[index] * weightage
+    return rows
+
+
+def _catalogue_matrix():
+    """(subject id -> row, subject x domain matrix) for the current catalogue"""
+    from apps.academics.subject_catalogue import get_subjects_by_id
+
+    catalogue = get_subjects_by_id()
+    with _lock:
+        if _subject_state["catalogue"] is not catalogue:
+            subjects = list(catalogue.values())
+            _subject_state["index"] = {subject.id: row for row, subject in enumerate(subjects)}
+            _subject_state["matrix"] = _subject_rows(
+                [subject.subject_type for subject in subjects],
+                [subject.weightage for subject in subjects]
+            )
+            _subject_state["catalogue"] = catalogue
+        return _subject_state["index"], _subject_state["matrix"]
+
+
+def _with_missing_subjects(index, matrix, subject_ids):
+    """Extend the matrix with subjects added after this process loaded the catalogue"""
+    from .feature_builder import map_subject_to_type
+
+    missing = list(Subject.objects.filter(id__in=subject_ids).only("id", "name", "category", "weightage"))
+    if not missing:
+        return index, matrix
+
+    index = dict(index)
+    for offset, subject in enumerate(missing):
+        index[subject.id] = len(matrix) + offset
+    extra = _subject_rows(
+        [map_subject_to_type(subject) for subject in missing],
+        [subject.weightage for subject in missing]
+    )
+    return index, np.vstack([matrix, extra])
+
+
+def score_marks(rows):
+    """
+    Domain scores for a batch of marks.
+
+    rows: iterable of (student id, subject id, grade point)
+    Returns (student ids, array of shape (len(student ids), len(DOMAINS))).
+    Marks for subjects that no longer exist are ignored.
+    """
+    index, matrix = _catalogue_matrix()
+
+    student_index = {}
+    student_rows, subject_rows, values = [], [], []
+    unknown = set()
+    for student_id, subject_id, marks in rows:
+        student_rows.append(student_index.setdefault(student_id, len(student_index)))
+        subject_rows.append(subject_id)
+        values.append(marks)
+        if subject_id not in index:
+            unknown.add(subject_id)
+
+    if unknown:
+        index, matrix = _with_missing_subjects(index, matrix, unknown)
+
+    columns = np.array([index.get(subject_id, -1) for subject_id in subject_rows], dtype=np.int64)
+    known = columns >= 0
+    # Duplicate (student, subject) entries are summed, as the dict loops did
+    marks = sparse.csr_matrix(
+        (np.array(values, dtype=float)[known], (np.array(student_rows, dtype=np.int64)[known], columns[known])),
+        shape=(len(student_index), len(matrix))
+    )
+    return list(student_index), np.asarray(marks @ matrix)
+
+
+def as_features(vector):
+    """Predictor feature dict for a domain vector; features with no domain are left out"""
+    return {DOMAIN_FEATURES[domain]: score for domain, score in zip(DOMAINS, vector)}
+
+
+def domain_vectors(student_ids):
+    """
+    student id -> [score per DOMAINS] for every given student.
+
+    One query loads the whole batch; students without marks get zeros.
+    """
+    student_ids = list(student_ids)
+    rows = StudentMark.objects.filter(student_id__in=student_ids).values_list("student_id", "subject_id", "marks")
+    scored_ids, scores = score_marks(rows.iterator(chunk_size=5000))
+
+    vectors = {student_id: [0.0] * len(DOMAINS) for student_id in student_ids}
+    vectors.update(zip(scored_ids, scores.tolist()))
+    return vectors
+
+
+def iter_cohort_domain_vectors(batch_size=DEFAULT_BATCH_SIZE, student_ids=None):
+    """
+    Yield {student id: domain vector} for every student with marks, batch_size students at a time.
+
+    student_ids: restrict the cohort to these students
+    """
+    students = StudentMark.objects.order_by("student_id").values_list("student_id", flat=True).distinct()
+    if student_ids is not None:
+        students = students.filter(student_id__in=list(student_ids))
+
+    # Ids only, so the whole cohort fits in memory; marks are loaded one batch at a time
+    student_ids = list(students)
+    for offset in range(0, len(student_ids), batch_size):
+        yield domain_vectors(student_ids[offset:offset + batch_size])
@@ -1,4 +1,5 @@
-from .domain_weights import SUBJECT_DOMAIN_WEIGHTS, DOMAINS
+from .domain_weights import DOMAINS
+from .subject_classifier import subject_types
 
 def map_subject_to_type(subject):
     if subject.category == "PROJECT":
@@ -8,41 +9,15 @@ def map_subject_to_type(subject):
     if subject.category == "SOFT":
         return "SOFT"
 
-    name = subject.name.lower()
-
-    if "data structure" in name or "algorithm" in name:
-        return "DSA"
-    if "operating system" in name:
-        return "OS"
-    if "database" in name:
-        return "DBMS"
-    if "web" in name or "php" in name:
-        return "WEB"
-    if "security" in name:
-        return "SECURITY"
-
-    return "PROGRAMMING"
+    return subject_types.first(subject.name, default="PROGRAMMING")
 
 
 def build_feature_vector(student_marks):
     """
-    student_marks: queryset of StudentMark
+    student_marks: queryset of StudentMark for one student
+    Scored by domain_matrix, so only subject_id and marks are loaded.
     """
-    domain_scores = {d: 0.0 for d in DOMAINS}
-
-    for record in student_marks:
-        subject = record.subject
-        grade_point = record.marks  # grade point stored here
-
-        subject_type = map_subject_to_type(subject)
-        weights = SUBJECT_DOMAIN_WEIGHTS.get(subject_type)
-
-        if not weights:
-            continue
-
-        for domain, w in weights.items():
-            domain_scores[domain] += (
-                grade_point * subject.weightage * w
-            )
+    from .domain_matrix import score_marks
 
-    return [domain_scores[d] for d in DOMAINS]
+    _, scores = score_marks((0, record.subject_id, record.marks) for record in student_marks)
+    return scores[0].tolist() if len(scores) else [0.0] * len(DOMAINS)
@@ -0,0 +1,238 @@
+#inference_server.py
+"""
+Optional local inference server shared by all web workers.
+
+`manage.py run_inference_server` owns the one copy of the model (through
+predictor's ModelHolder, so hot reload still applies) and listens on the
+Unix socket ML_INFERENCE_SOCKET. Each client connection gets a thread
+that queues its rows; a single batcher thread takes everything queued
+(waiting up to ML_INFERENCE_BATCH_WINDOW_MS for more when requests are
+arriving concurrently, up to ML_INFERENCE_MAX_BATCH rows), scores it with
+one model call and hands each caller its own rows back.
+
+Messages use multiprocessing.connection framing and its HMAC handshake,
+keyed from SECRET_KEY, so only processes of this deployment can connect.
+Every prediction is answered with the fingerprint of the model that made
+it, and a client can ask for the fingerprint of the model currently
+loaded alone (remote_fingerprint()), so snapshots and ETags name the
+server's model rather than whatever file is on disk.
+
+When ML_INFERENCE_SOCKET is set, predictor.predict_domains() sends its
+rows here through remote_predict(). If the server cannot be reached or
+does not answer within ML_INFERENCE_TIMEOUT, the call is served in-process
+and the server is not tried again for ML_INFERENCE_RETRY_SECONDS.
+"""
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceUnavailable(Exception):
+    pass
+
+
+def _authkey():
+    return hashlib.sha256(f"ml-inference:{settings.SECRET_KEY}".encode()).digest()
+
+
+class _Request:
+    __slots__ = ("rows", "done", "result", "fingerprint", "error")
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.done = threading.Event()
+        self.result = None
+        self.fingerprint = None
+        self.error = None
+
+
+class InferenceServer:
+    def __init__(self, path, window_ms=None, max_batch=None):
+        self.path = path
+        self.window = (settings.ML_INFERENCE_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch = max_batch or settings.ML_INFERENCE_MAX_BATCH
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._listener = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Bind the socket and start the batcher; serve_forever() then accepts clients"""
+        if os.path.exists(self.path):
+            try:
+                Client(self.path, family="AF_UNIX", authkey=_authkey()).close()
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a server that did not shut down cleanly
+                os.unlink(self.path)
+            else:
+                raise RuntimeError(f"An inference server is already listening on {self.path}")
+
+        self._listener = Listener(self.path, family="AF_UNIX", authkey=_authkey())
+        threading.Thread(target=self._batch_loop, name="inference-batcher", daemon=True).start()
+
+    def serve_forever(self):
+        while not self._stopping.is_set():
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._stopping.is_set():
+                    break
+                # Failed handshake or a client that went away mid-accept
+                logger.warning("Rejected inference client", exc_info=True)
+                continue
+            threading.Thread(target=self._serve_client, args=(conn,), daemon=True).start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _serve_client(self, conn):
+        from .predictor import holder
+
+        with conn:
+            while True:
+                try:
+                    kind, rows = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if kind == "fingerprint":
+                    # The model the next batch will be scored with
+                    reply = ("ok", holder.get_with_fingerprint()[1])
+                else:
+                    request = _Request(np.atleast_2d(np.asarray(rows, dtype=float)))
+                    self._queue.put(request)
+                    request.done.wait()
+                    reply = ("error", request.error) if request.error else ("ok", (request.result, request.fingerprint))
+                try:
+                    conn.send(reply)
+                except OSError:
+                    return
+
+    def _collect(self):
+        """
+        Block for one request and take every request already queued.
+
+        A request that arrives alone is scored at once. When others were
+        already waiting, the batcher keeps gathering for up to the window.
+        """
+        requests = [self._queue.get()]
+        size = len(requests[0].rows)
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if len(requests) == 1 or remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            requests.append(request)
+            size += len(request.rows)
+        return requests
+
+    def _batch_loop(self):
+        from .predictor import predict_locally_served
+
+        while True:
+            requests = self._collect()
+            try:
+                predictions, fingerprint = predict_locally_served(np.vstack([request.rows for request in requests]))
+            except Exception as e:
+                logger.exception("Batch prediction failed")
+                for request in requests:
+                    request.error = str(e)
+                    request.done.set()
+                continue
+
+            offset = 0
+            for request in requests:
+                count = len(request.rows)
+                request.result = None if predictions is None else predictions[offset:offset + count]
+                request.fingerprint = fingerprint
+                offset += count
+                request.done.set()
+
+            self.batches += 1
+            self.rows += offset
+            logger.debug("Scored %d rows from %d requests", offset, len(requests))
+
+
+_local = threading.local()
+_state = {"unavailable_until": 0.0}
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = Client(settings.ML_INFERENCE_SOCKET, family="AF_UNIX", authkey=_authkey())
+        _local.conn = conn
+    return conn
+
+
+def _drop_connection():
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+
+def remote_predict(rows):
+    """
+    predict_domains_served() through the inference server.
+
+    Returns (predictions, fingerprint) as predict_domains_served() would
+    ((None, None) when the server has no model); raises InferenceUnavailable
+    when the caller should predict in-process.
+    """
+    return _call("predict", np.asarray(rows, dtype=float))
+
+
+def remote_fingerprint():
+    """Fingerprint of the model the inference server is serving, None when it has none"""
+    return _call("fingerprint")
+
+
+def _call(kind, rows=None):
+    if time.monotonic() < _state["unavailable_until"]:
+        raise InferenceUnavailable("inference server recently unreachable")
+
+    try:
+        conn = _connection()
+        conn.send((kind, rows))
+        if not conn.poll(settings.ML_INFERENCE_TIMEOUT):
+            # A late answer would be read as the reply to the next request
+            raise TimeoutError(f"no answer within {settings.ML_INFERENCE_TIMEOUT}s")
+        status, payload = conn.recv()
+    except Exception as e:
+        _drop_connection()
+        _state["unavailable_until"] = time.monotonic() + settings.ML_INFERENCE_RETRY_SECONDS
+        logger.warning(
+            "Inference server at %s unavailable (%s), predicting in-process for %ss",
+            settings.ML_INFERENCE_SOCKET, e, settings.ML_INFERENCE_RETRY_SECONDS
+        )
+        raise InferenceUnavailable(str(e))
+
+    if status != "ok":
+        raise InferenceUnavailable(payload)
+    return payload
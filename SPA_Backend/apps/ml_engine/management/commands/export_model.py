@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ml_engine.packed_forest import PackedForest, export_forest
+from apps.ml_engine.predictor import MODEL_PATH, PACKED_MODEL_PATH
+
+
+class Command(BaseCommand):
+    help = "Export the pickled career forest to the packed .npz format predictor serves"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default=str(MODEL_PATH), help="Pickled RandomForestClassifier")
+        parser.add_argument("--output", default=str(PACKED_MODEL_PATH), help="Packed forest to write")
+
+    def handle(self, *args, **options):
+        import joblib
+        import numpy as np
+
+        try:
+            model = joblib.load(options["source"])
+        except OSError as e:
+            raise CommandError(str(e))
+        if not hasattr(model, "estimators_"):
+            raise CommandError(f"{options['source']} is not a fitted tree ensemble")
+
+        # Never publish a packed model that disagrees with the original
+        packed = PackedForest.from_model(model)
+        rows = np.random.default_rng(0).uniform(0, 100, size=(1000, model.n_features_in_))
+        if not np.array_equal(packed.predict_proba(rows), model.predict_proba(rows)):
+            raise CommandError(f"Packed forest does not reproduce {options['source']}")
+
+        export_forest(model, options["output"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {len(model.estimators_)} trees to {options['output']} ({packed.nbytes / 1024:.0f} KiB)"
+        ))
@@ -0,0 +1,87 @@
+import csv
+import time
+from collections import Counter
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.models import UserProfile
+from apps.ml_engine.predictor import holder, predict_domains
+from apps.ml_engine.training import iter_student_features
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Predict the career domain of every student with results, one batch per model call"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Students scored per query and per model call",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write enrollment_no, domain, confidence and the top three probabilities per student to this CSV",
+        )
+
+    def handle(self, *args, **options):
+        model = holder.get()
+        if model is None:
+            raise CommandError(f"No model at {holder.path}; train one first")
+        version = holder.version
+
+        writer = None
+        if options["output"]:
+            out = open(options["output"], "w", newline="")
+            writer = csv.writer(out)
+            writer.writerow(["student_id", "enrollment_no", "domain", "confidence", "top_probabilities"])
+
+        domains = Counter()
+        students = 0
+        predict_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            # The features the model was trained on and the dashboard predicts from
+            features = iter_student_features(chunk_size=options["batch_size"])
+            while True:
+                batch = list(islice(features, options["batch_size"]))
+                if not batch:
+                    break
+                student_ids = [student_id for student_id, _ in batch]
+                rows = [row for _, row in batch]
+
+                # The same model for every batch, even if model.pkl is replaced meanwhile
+                predict_start = time.perf_counter()
+                predictions = predict_domains(rows, model=model)
+                predict_seconds += time.perf_counter() - predict_start
+
+                domains.update(prediction["domain"] for prediction in predictions)
+                students += len(predictions)
+
+                if writer:
+                    enrollments = dict(
+                        UserProfile.objects.filter(user_id__in=student_ids).values_list("user_id", "enrollment_no")
+                    )
+                    for student_id, prediction in zip(student_ids, predictions):
+                        writer.writerow([
+                            student_id,
+                            enrollments.get(student_id, ""),
+                            prediction["domain"],
+                            prediction["confidence"],
+                            "; ".join(f"{domain} {pct}" for domain, pct in prediction["probabilities"][:3]),
+                        ])
+                self.stdout.write(f"  {students} students scored")
+        finally:
+            if writer:
+                out.close()
+
+        seconds = time.perf_counter() - start
+        for domain, count in domains.most_common():
+            self.stdout.write(f"{domain:24} {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{students} students scored with model v{version} in {seconds:.2f}s "
+            f"(model {students / predict_seconds if predict_seconds else 0:.0f} rows/s)"
+        ))
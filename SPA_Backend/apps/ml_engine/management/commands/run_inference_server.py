@@ -0,0 +1,55 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ml_engine.inference_server import InferenceServer
+from apps.ml_engine.prediction_cache import prediction_cache
+from apps.ml_engine.predictor import holder
+
+
+class Command(BaseCommand):
+    help = "Serve career-domain predictions to the web workers over ML_INFERENCE_SOCKET"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", default=settings.ML_INFERENCE_SOCKET, help="Unix socket path")
+        parser.add_argument(
+            "--window-ms",
+            type=float,
+            default=settings.ML_INFERENCE_BATCH_WINDOW_MS,
+            help="How long to gather concurrent requests into one batch",
+        )
+        parser.add_argument(
+            "--max-batch",
+            type=int,
+            default=settings.ML_INFERENCE_MAX_BATCH,
+            help="Rows scored per model call at most",
+        )
+
+    def handle(self, *args, **options):
+        if not options["socket"]:
+            raise CommandError("Set ML_INFERENCE_SOCKET or pass --socket")
+
+        # Load before accepting clients so the first requests do not wait for it
+        if holder.get() is None:
+            self.stderr.write(self.style.WARNING("No model loaded yet; clients will use their fallback"))
+
+        server = InferenceServer(options["socket"], window_ms=options["window_ms"], max_batch=options["max_batch"])
+        try:
+            server.start()
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        def shutdown(signum, frame):
+            raise SystemExit(0)
+
+        signal.signal(signal.SIGTERM, shutdown)
+        self.stdout.write(self.style.SUCCESS(f"Inference server listening on {options['socket']}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+            self.stdout.write(f"Stopped after {server.batches} batches, {server.rows} rows")
+            self.stdout.write(f"Prediction cache: {prediction_cache.stats()}")
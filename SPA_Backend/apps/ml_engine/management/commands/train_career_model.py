@@ -0,0 +1,135 @@
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ml_engine.predictor import FEATURE_KEYS
+from apps.ml_engine.training import (
+    ARTIFACT_DIR,
+    DEFAULT_CHUNK_SIZE,
+    collect_training_data,
+    publish,
+    read_labels,
+    synthetic_samples,
+    write_artifacts,
+)
+
+
+class Command(BaseCommand):
+    help = "Train the career forest on stored results, on every core, and publish it as a versioned artifact"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Result rows fetched per round trip, and students per profile query",
+        )
+        parser.add_argument(
+            "--labels",
+            help="CSV of enrollment_no,domain; trains on those students only instead of their top-scoring domain",
+        )
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            help="Add this many synthetic students, e.g. while few results are stored",
+        )
+        parser.add_argument("--estimators", type=int, default=200, help="Trees in the forest")
+        parser.add_argument("--jobs", type=int, default=-1, help="Training processes; -1 uses every core")
+        parser.add_argument("--test-size", type=float, default=0.2, help="Share of students held out for accuracy")
+        parser.add_argument("--min-samples", type=int, default=50, help="Refuse to train on fewer students")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--artifact-dir", default=str(ARTIFACT_DIR), help="Versioned models are saved under it")
+        parser.add_argument(
+            "--no-publish",
+            action="store_true",
+            help="Only save the versioned artifact; leave the served model.pkl/model.npz alone",
+        )
+
+    def handle(self, *args, **options):
+        from joblib import effective_n_jobs
+        from sklearn import __version__ as sklearn_version
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import train_test_split
+
+        if not 0 < options["test_size"] < 1:
+            raise CommandError("--test-size must be between 0 and 1")
+
+        labels = None
+        if options["labels"]:
+            try:
+                labels = read_labels(options["labels"])
+            except (OSError, ValueError) as e:
+                raise CommandError(str(e))
+
+        start = time.perf_counter()
+        X, y, skipped = collect_training_data(chunk_size=options["chunk_size"], labels=labels)
+        students = len(y)
+        if options["synthetic"]:
+            X_synthetic, y_synthetic = synthetic_samples(options["synthetic"], seed=options["seed"])
+            X, y = np.vstack([X, X_synthetic]), np.concatenate([y, y_synthetic])
+        collect_seconds = time.perf_counter() - start
+        self.stdout.write(
+            f"{students} students from stored results ({skipped} skipped), "
+            f"{options['synthetic']} synthetic, in {collect_seconds:.2f}s"
+        )
+
+        if len(y) < options["min_samples"]:
+            raise CommandError(
+                f"Only {len(y)} training rows, fewer than --min-samples {options['min_samples']}; "
+                "add --synthetic rows or lower --min-samples"
+            )
+        class_counts = Counter(y.tolist())
+        if len(class_counts) < 2:
+            raise CommandError("Every training row has the same domain; there is nothing to learn")
+
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y,
+            test_size=options["test_size"],
+            random_state=options["seed"],
+            stratify=y if min(class_counts.values()) >= 2 else None,
+        )
+
+        jobs = effective_n_jobs(options["jobs"])
+        model = RandomForestClassifier(
+            n_estimators=options["estimators"], n_jobs=options["jobs"], random_state=options["seed"]
+        )
+        train_start = time.perf_counter()
+        model.fit(X_train, y_train)
+        training_seconds = time.perf_counter() - train_start
+        accuracy = float(model.score(X_test, y_test))
+        # Web requests score a handful of rows; thread start-up would cost more than it saves
+        model.set_params(n_jobs=None)
+
+        trained_at = datetime.now(timezone.utc)
+        version = trained_at.strftime("%Y%m%dT%H%M%SZ")
+        metadata = {
+            "version": version,
+            "trained_at": trained_at.isoformat(),
+            "training_seconds": round(training_seconds, 3),
+            "collect_seconds": round(collect_seconds, 3),
+            "jobs": jobs,
+            "estimators": options["estimators"],
+            "feature_keys": FEATURE_KEYS,
+            "labels": "file" if labels is not None else "top_domain",
+            "students": students,
+            "synthetic": options["synthetic"],
+            "train_rows": len(y_train),
+            "test_rows": len(y_test),
+            "accuracy": round(accuracy, 4),
+            "class_counts": dict(class_counts.most_common()),
+            "sklearn_version": sklearn_version,
+        }
+        directory = write_artifacts(model, metadata, f"{options['artifact_dir']}/{version}")
+
+        if not options["no_publish"]:
+            publish(directory)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Trained model {version} on {len(y_train)} rows with {jobs} jobs in {training_seconds:.2f}s; "
+            f"held-out accuracy {accuracy:.2%} on {len(y_test)} rows; "
+            f"{'published' if not options['no_publish'] else 'saved'} from {directory}"
+        ))
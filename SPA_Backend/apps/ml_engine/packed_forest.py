@@ -0,0 +1,158 @@
+#packed_forest.py
+"""
+The career RandomForest flattened into packed NumPy arrays.
+
+export_forest() writes every tree's nodes into shared arrays (split
+feature, threshold, left/right child, and a row of class probabilities
+for each leaf) in one .npz file. PackedForest evaluates it with NumPy
+alone: every (tree, row) pair steps down one level at a time as one
+vectorised operation, pairs leave the working set as they reach a leaf,
+and importing it does not import scikit-learn.
+
+Predictions are identical to the forest's: inputs are cast to float32
+and compared with float64 thresholds as sklearn does, and the trees'
+leaf probabilities are added in tree order before dividing by the
+number of trees.
+"""
+import io
+import os
+import tempfile
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def _leaf_probabilities(value):
+    proba = value[:, 0, :].astype(np.float64)
+    if np.allclose(proba.sum(axis=1), 1.0):
+        # scikit-learn >= 1.4 stores fractions and returns them unchanged
+        return proba
+    # Older versions store sample counts and normalise them in predict_proba
+    normalizer = proba.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    return proba / normalizer
+
+
+def pack_forest(model):
+    """Packed arrays for a fitted RandomForestClassifier"""
+    features, thresholds, lefts, rights, leaf_rows, leaf_values, roots = [], [], [], [], [], [], []
+    offset = 0
+    leaf_offset = 0
+    max_depth = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        count = tree.node_count
+        is_leaf = tree.children_left == -1
+        nodes = np.arange(count)
+
+        # Leaves point at themselves, so extra steps down the tree leave them in place
+        lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+
+        leaf_row = np.full(count, -1)
+        leaf_row[is_leaf] = np.arange(is_leaf.sum()) + leaf_offset
+        leaf_rows.append(leaf_row)
+        leaf_values.append(_leaf_probabilities(tree.value[is_leaf]))
+
+        roots.append(offset)
+        offset += count
+        leaf_offset += int(is_leaf.sum())
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        "format_version": np.array(FORMAT_VERSION),
+        "classes": np.asarray(model.classes_).astype(str),
+        "n_features": np.array(model.n_features_in_),
+        "max_depth": np.array(max_depth),
+        "roots": np.array(roots, dtype=np.int32),
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "left": np.concatenate(lefts).astype(np.int32),
+        "right": np.concatenate(rights).astype(np.int32),
+        "leaf_row": np.concatenate(leaf_rows).astype(np.int32),
+        "leaf_values": np.concatenate(leaf_values),
+    }
+
+
+def export_forest(model, path):
+    """Write a fitted RandomForestClassifier to path (.npz), replacing any existing file atomically"""
+    buffer = io.BytesIO()
+    np.savez(buffer, **pack_forest(model))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(buffer.getvalue())
+        # mkstemp creates the file owner-only; the web workers may run as another user
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+class PackedForest:
+    """Evaluates an exported forest; has the classes_/predict/predict_proba surface predictor uses"""
+
+    def __init__(self, arrays):
+        if int(arrays["format_version"]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported packed forest format {int(arrays['format_version'])}")
+        self.classes_ = arrays["classes"]
+        self.n_features_in_ = int(arrays["n_features"])
+        self.max_depth = int(arrays["max_depth"])  # reported only; traversal stops at the leaves
+        self.roots = arrays["roots"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.leaf_row = arrays["leaf_row"]
+        self.leaf_values = arrays["leaf_values"]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(pack_forest(model))
+
+    @property
+    def nbytes(self):
+        return sum(
+            array.nbytes for array in (
+                self.roots, self.feature, self.threshold, self.left, self.right, self.leaf_row, self.leaf_values
+            )
+        )
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected rows of {self.n_features_in_} features, got shape {X.shape}")
+
+        # One entry per (tree, row), tree-major; only entries not yet at a leaf are stepped
+        nodes = np.repeat(self.roots, len(X))
+        row_of = np.tile(np.arange(len(X)), len(self.roots))
+        active = np.flatnonzero(self.left[nodes] != nodes)
+        while active.size:
+            current = nodes[active]
+            go_left = X[row_of[active], self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = current
+            active = active[self.left[current] != current]
+
+        leaves = self.leaf_row[nodes].reshape(len(self.roots), len(X))
+        proba = np.zeros((len(X), len(self.classes_)))
+        for tree_leaves in leaves:
+            proba += self.leaf_values[tree_leaves]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
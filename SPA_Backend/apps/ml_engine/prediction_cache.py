@@ -0,0 +1,153 @@
+#prediction_cache.py
+"""
+Memoised predictions, keyed on the model plus a quantised feature row.
+
+Rows are rounded to ML_PREDICTION_CACHE_QUANTUM (0.01 by default, the
+precision scores are shown at) and the model is run on the rounded row,
+so a cached answer is exactly what the model returns for its key.
+
+Entries live in a per-process LRU of ML_PREDICTION_CACHE_SIZE rows that
+expire after ML_PREDICTION_CACHE_TTL seconds. With
+ML_PREDICTION_CACHE_SHARED, misses are also looked up in, and results
+written to, the Django cache so other processes can reuse them. Keys
+include the model fingerprint (file, mtime and size): a reloaded model
+empties the local LRU and never sees the old shared entries.
+
+It sits in predictor.predict_locally(), i.e. wherever the model runs: in
+each web worker, or once for all of them in the inference server.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ml:prediction"
+
+
+class PredictionCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._fingerprint = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def quantise(self, rows):
+        quantum = settings.ML_PREDICTION_CACHE_QUANTUM
+        steps = np.rint(np.asarray(rows, dtype=float) / quantum)
+        return steps * quantum, steps.astype(np.int64)
+
+    def _check_model(self, fingerprint):
+        # Called with the lock held
+        if fingerprint != self._fingerprint:
+            if self._entries:
+                logger.info("Model changed, dropping %d cached predictions", len(self._entries))
+            self._entries.clear()
+            self._fingerprint = fingerprint
+
+    def predict(self, rows, fingerprint, compute):
+        """
+        Predictions for rows, computing only the rows not cached.
+
+        fingerprint: identifies the model, see ModelHolder.fingerprint
+        compute: callable(array of quantised rows) -> list of predictions
+        """
+        if settings.ML_PREDICTION_CACHE_SIZE <= 0:
+            return compute(rows)
+
+        rounded, steps = self.quantise(rows)
+        keys = [row.tobytes() for row in steps]
+        results = [None] * len(keys)
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_model(fingerprint)
+            for index, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    results[index] = entry[1]
+        missing = [index for index, result in enumerate(results) if result is None]
+        local_hits = len(keys) - len(missing)
+
+        shared_found = {}
+        if missing and settings.ML_PREDICTION_CACHE_SHARED:
+            shared_found = self._shared_get(fingerprint, {keys[index] for index in missing})
+            for index in missing:
+                if keys[index] in shared_found:
+                    results[index] = shared_found[keys[index]]
+            missing = [index for index in missing if results[index] is None]
+
+        computed = {}
+        if missing:
+            # One model call for every distinct uncached row
+            unique = list(dict.fromkeys(keys[index] for index in missing))
+            positions = {keys[index]: index for index in missing}
+            predictions = compute(rounded[[positions[key] for key in unique]])
+            computed = dict(zip(unique, predictions))
+            for index in missing:
+                results[index] = computed[keys[index]]
+            if settings.ML_PREDICTION_CACHE_SHARED:
+                self._shared_set(fingerprint, computed)
+
+        fresh = {**shared_found, **computed}
+        with self._lock:
+            self.hits += local_hits
+            self.shared_hits += len(keys) - local_hits - len(missing)
+            self.misses += len(missing)
+            if self._fingerprint == fingerprint:
+                expires = now + settings.ML_PREDICTION_CACHE_TTL
+                for key, prediction in fresh.items():
+                    self._entries[key] = (expires, prediction)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > settings.ML_PREDICTION_CACHE_SIZE:
+                    self._entries.popitem(last=False)
+
+        return results
+
+    def _shared_key(self, fingerprint, key):
+        return f"{KEY_PREFIX}:{hashlib.blake2b(fingerprint.encode() + key, digest_size=16).hexdigest()}"
+
+    def _shared_get(self, fingerprint, keys):
+        names = {self._shared_key(fingerprint, key): key for key in keys}
+        try:
+            found = shared_cache.get_many(list(names))
+        except Exception:
+            logger.warning("Shared prediction cache unavailable", exc_info=True)
+            return {}
+        return {names[name]: prediction for name, prediction in found.items()}
+
+    def _shared_set(self, fingerprint, predictions):
+        try:
+            shared_cache.set_many(
+                {self._shared_key(fingerprint, key): prediction for key, prediction in predictions.items()},
+                timeout=settings.ML_PREDICTION_CACHE_TTL
+            )
+        except Exception:
+            logger.warning("Could not write to the shared prediction cache", exc_info=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+prediction_cache = PredictionCache()
@@ -1,62 +1,276 @@
-import joblib
+#predictor.py
+"""
+Career-domain prediction with a lazily loaded, hot-reloadable model.
+
+The model is loaded on first use, not at import. Each process then checks
+the model file at most once per ML_MODEL_CHECK_SECONDS and, when its
+mtime, size or inode has changed, loads the new file and swaps it in with
+a single reference assignment. Requests already holding the old model
+finish on it. A file that fails to load (e.g. one still being written)
+leaves the current model in place and is retried at the next check.
+
+model.npz, the forest exported by packed_forest, is served when present:
+it is evaluated with NumPy alone, so web workers never import
+scikit-learn. model.pkl is the fallback, loaded with mmap_mode="r" so
+uncompressed arrays are read straight from the page cache. Set ML_MODEL_WARMUP to load the model in
+AppConfig.ready(); with `gunicorn --preload` that happens once in the
+master and the forked workers share its pages.
+"""
+import logging
+import os
+import threading
+import time
 from pathlib import Path
 
+import joblib
+import numpy as np
+from django.conf import settings
+
+from .packed_forest import PackedForest
+from .prediction_cache import prediction_cache
+
+logger = logging.getLogger(__name__)
+
 # Get the absolute path to the model file
 BASE_DIR = Path(__file__).resolve().parent
 MODEL_PATH = BASE_DIR / "model.pkl"
+# The same forest exported by packed_forest.export_forest; preferred when present
+PACKED_MODEL_PATH = BASE_DIR / "model.npz"
+
+
+def load_model(path):
+    """A PackedForest for .npz files, otherwise the pickled sklearn model"""
+    path = Path(path)
+    if path.suffix == ".npz":
+        return PackedForest.load(path)
+    return joblib.load(path, mmap_mode="r")
+
+
+class ModelHolder:
+    def __init__(self, *paths):
+        """paths: model files in order of preference; the first that exists is served"""
+        self.paths = [Path(path) for path in paths]
+        self.path = self.paths[0]
+        self.version = 0  # bumped on every (re)load
+        self._lock = threading.Lock()
+        # (model, fingerprint) replaced as one reference; the fingerprint names
+        # the loaded file the same way in every process
+        self._loaded = (None, None)
+        self._stamp = None
+        self._checked_at = None
+        self._warned_missing = False
+
+    def get(self):
+        """The current model, or None when no model file has been loaded"""
+        return self.get_with_fingerprint()[0]
+
+    def get_with_fingerprint(self):
+        """(model, fingerprint) from the same load; (None, None) before any"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < settings.ML_MODEL_CHECK_SECONDS:
+            return self._loaded
+
+        with self._lock:
+            if self._checked_at is None or now - self._checked_at >= settings.ML_MODEL_CHECK_SECONDS:
+                self._refresh()
+                self._checked_at = now
+            return self._loaded
+
+    @property
+    def fingerprint(self):
+        return self._loaded[1]
+
+    def _stat(self):
+        """(path, stat) of the first model file that exists, or (None, None)"""
+        for path in self.paths:
+            try:
+                return path, os.stat(path)
+            except FileNotFoundError:
+                continue
+        return None, None
+
+    def _refresh(self):
+        path, stat = self._stat()
+        if path is None:
+            if self._loaded[0] is None and not self._warned_missing:
+                logger.warning(
+                    "Model file not found at %s; train it with: python manage.py train_career_model",
+                    " or ".join(str(path) for path in self.paths)
+                )
+                self._warned_missing = True
+            return
+
+        stamp = (str(path), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp == self._stamp:
+            return
+
+        start = time.perf_counter()
+        try:
+            model = load_model(path)
+        except Exception:
+            logger.exception("Could not load model from %s, keeping the current one", path)
+            return
+
+        self.path = path
+        self._loaded = (model, _fingerprint(path, stat))
+        self._stamp = stamp
+        self.version += 1
+        self._warned_missing = False
+        logger.info(
+            "Loaded model v%d from %s in %.0fms", self.version, self.path, (time.perf_counter() - start) * 1000
+        )
+
+
+def _fingerprint(path, stat):
+    return f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+holder = ModelHolder(PACKED_MODEL_PATH, MODEL_PATH)
+
+
+def model_fingerprint():
+    """
+    Fingerprint of the model predictions are served from, "" when there is none.
+
+    With ML_INFERENCE_SOCKET set, the model the inference server has loaded,
+    so the web process never loads the model just to name it; this process's
+    own model when it predicts locally or the server cannot be reached.
+    """
+    if settings.ML_INFERENCE_SOCKET:
+        from .inference_server import InferenceUnavailable, remote_fingerprint
+        try:
+            return remote_fingerprint() or ""
+        except InferenceUnavailable:
+            pass
+    return holder.get_with_fingerprint()[1] or ""
+
+
+# Model input columns, in order
+FEATURE_KEYS = [
+    'frontend', 'backend', 'ai_ml', 'cybersecurity', 'data_science',
+    'mobile', 'devops', 'iot', 'blockchain', 'game_dev'
+]
+
+
+def feature_row(feature_dict):
+    """One model input row from a dict keyed by FEATURE_KEYS; missing keys are 0"""
+    return [feature_dict.get(key, 0) for key in FEATURE_KEYS]
+
+
+def predict_domains(batch, model=None):
+    """
+    Predict career domains for many students with one forest traversal.
+
+    batch: N x len(FEATURE_KEYS) array-like, rows built with feature_row()
+    model: defaults to the shared model, served by the inference server when
+    ML_INFERENCE_SOCKET is set and reachable, otherwise by this process
+    Returns one dict per row, {"domain", "confidence", "probabilities"}, where
+    confidence is a percentage and probabilities lists (domain, percentage)
+    for every class, highest first. Returns None when no model is loaded.
+    """
+    if model is not None:
+        return _predict_with(model, batch)
+    return predict_domains_served(batch)[0]
+
+
+def predict_domains_served(batch):
+    """
+    (predict_domains(batch), fingerprint of the model that made them)
+
+    The fingerprint comes from whichever process scored the rows, so it can
+    be stored with the predictions; None when no model is loaded.
+    """
+    if settings.ML_INFERENCE_SOCKET:
+        from .inference_server import InferenceUnavailable, remote_predict
+        try:
+            return remote_predict(batch)
+        except InferenceUnavailable:
+            pass
+
+    return predict_locally_served(batch)
+
+
+def predict_locally(batch):
+    """predict_domains() with this process's own copy of the model, through the prediction cache"""
+    return predict_locally_served(batch)[0]
+
+
+def predict_locally_served(batch):
+    """predict_locally() and the fingerprint of the model it used, as predict_domains_served()"""
+    model, fingerprint = holder.get_with_fingerprint()
+    if model is None:
+        return None, None
+    rows = np.asarray(batch, dtype=float)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    predictions = prediction_cache.predict(rows, fingerprint, lambda uncached: _predict_with(model, uncached))
+    return predictions, fingerprint
+
+
+def _predict_with(model, batch):
+    rows = np.asarray(batch, dtype=float)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    if not len(rows):
+        return []
+
+    # predict() is argmax over predict_proba(); one pass gives both
+    probs = model.predict_proba(rows)
+    ranked = np.argsort(-probs, axis=1, kind="stable")
+    classes = model.classes_.tolist()
+    percentages = np.round(probs * 100, 2).tolist()
+
+    predictions = []
+    for order, row in zip(ranked.tolist(), percentages):
+        probabilities = [(classes[index], row[index]) for index in order]
+        domain, confidence = probabilities[0]
+        predictions.append({"domain": domain, "confidence": confidence, "probabilities": probabilities})
+    return predictions
+
+
+def _highest_score(feature_dict):
+    sorted_scores = sorted(feature_dict.items(), key=lambda x: x[1], reverse=True)
+    if sorted_scores and sorted_scores[0][1] > 0:
+        return sorted_scores[0][0], 0.0
+    return "backend", 0.0
 
-# Try to load the model, handle if it doesn't exist
-try:
-    model = joblib.load(MODEL_PATH)
-    print(f"Model loaded successfully from {MODEL_PATH}")
-except FileNotFoundError:
-    print(f"Warning: Model file not found at {MODEL_PATH}")
-    print("Please train the model by running: python apps/ml_engine/train_model.py")
-    model = None
 
 def predict_domain(feature_dict):
     """
     Predict career domain based on subject scores
-    
+
     Args:
-        feature_dict: Dictionary with keys: frontend, backend, ai_ml, cybersecurity, 
+        feature_dict: Dictionary with keys: frontend, backend, ai_ml, cybersecurity,
                       data_science, mobile, devops, iot, blockchain, game_dev
-    
+
     Returns:
         tuple: (predicted_domain, confidence)
     """
-    if model is None:
-        # Return a placeholder response when model isn't trained yet
-        print("Model not loaded, using fallback logic")
-        
-        # Simple fallback: recommend based on highest score
-        sorted_scores = sorted(feature_dict.items(), key=lambda x: x[1], reverse=True)
-        if sorted_scores and sorted_scores[0][1] > 0:
-            return sorted_scores[0][0], 0.0
-        return "backend", 0.0
-    
-    # Ensure all required keys exist with default values
-    required_keys = [
-        'frontend', 'backend', 'ai_ml', 'cybersecurity', 'data_science',
-        'mobile', 'devops', 'iot', 'blockchain', 'game_dev'
-    ]
-    
-    feature_vector = []
-    for key in required_keys:
-        feature_vector.append(feature_dict.get(key, 0))
-    
-    print(f"Feature vector for prediction: {feature_vector}")
-    
+    domain, confidence, _ = predict_domain_served(feature_dict)
+    return domain, confidence
+
+
+def predict_domain_served(feature_dict):
+    """
+    predict_domain() plus the fingerprint of the model that made the prediction.
+
+    Returns (domain, confidence, fingerprint); the fingerprint is "" for the
+    highest-score fallback when no model is loaded, and None when prediction
+    failed, as it is then unknown which model would have served it.
+    """
+    feature_vector = feature_row(feature_dict)
+    logger.debug("Feature vector for prediction: %s", feature_vector)
+
     try:
-        prediction = model.predict([feature_vector])[0]
-        probs = model.predict_proba([feature_vector])[0]
-        confidence = max(probs)
-        
-        return prediction, round(confidence * 100, 2)
-    except Exception as e:
-        print(f"Prediction error: {str(e)}")
+        predictions, fingerprint = predict_domains_served([feature_vector])
+    except Exception:
+        logger.exception("Prediction error")
         # Fallback to highest score
-        sorted_scores = sorted(feature_dict.items(), key=lambda x: x[1], reverse=True)
-        if sorted_scores and sorted_scores[0][1] > 0:
-            return sorted_scores[0][0], 0.0
-        return "backend", 0.0
\ No newline at end of file
+        return (*_highest_score(feature_dict), None)
+
+    if predictions is None:
+        # Simple fallback: recommend based on highest score
+        logger.debug("Model not loaded, using fallback logic")
+        return (*_highest_score(feature_dict), "")
+
+    return predictions[0]["domain"], predictions[0]["confidence"], fingerprint
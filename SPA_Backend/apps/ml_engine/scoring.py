@@ -1,19 +1,22 @@
-from .domain_weights import DOMAINS, SUBJECT_DOMAIN_WEIGHTS
+import numpy as np
 
-def calculate_domain_scores(marks_map):
-    scores = {domain: 0.0 for domain in DOMAINS}
+from .domain_matrix import TYPE_INDEX, WEIGHT_MATRIX
+from .domain_weights import DOMAINS
+from .subject_classifier import weight_keys
 
+def calculate_domain_scores(marks_map):
+    # Total marks per subject type, then one product with the weight matrix
+    type_marks = np.zeros(len(TYPE_INDEX))
     for subject, marks in marks_map.items():
-        subject = subject.upper()
+        for key in weight_keys.matches(subject):
+            type_marks[TYPE_INDEX[key]] += marks
 
-        for key, weights in SUBJECT_DOMAIN_WEIGHTS.items():
-            if key in subject:
-                for domain, weight in weights.items():
-                    scores[domain] += marks * weight
+    scores = dict(zip(DOMAINS, (type_marks @ WEIGHT_MATRIX).tolist()))
 
     return {
         "backend": round(scores["BACKEND"], 2) if scores["BACKEND"] else 0,
         "web": round(scores["WEB"], 2) if scores["WEB"] else 0,
         "data": round(scores["DATA"], 2) if scores["DATA"] else 0,
-        "soft": round(scores["SOFT"], 2) if scores["SOFT"] else 0,
-}
\ No newline at end of file
+        # SOFT is a subject type, not one of DOMAINS
+        "soft": round(scores["SOFT"], 2) if scores.get("SOFT") else 0,
+}
@@ -0,0 +1,104 @@
+#subject_classifier.py
+"""
+Keyword classification of subject names.
+
+Each keyword table (label -> keywords, in priority order) compiles into one
+regex: a lookahead alternation of every keyword, longest first, tried at
+each position of the lower-cased name. At a given position the regex
+reports the longest keyword, and every shorter keyword matching there is
+a prefix of it, so each keyword is stored with the labels of all its
+prefixes. One scan therefore finds every label whose keywords occur
+anywhere in the name, with the same result as testing each keyword with
+`in`. Results are memoised per name in a bounded LRU cache.
+
+The tables below are shared by the dashboard analysis, the keyword
+fallback, the ML feature builder and scoring.
+"""
+import re
+from functools import lru_cache
+
+from .domain_weights import SUBJECT_DOMAIN_WEIGHTS
+
+MEMO_SIZE = 4096
+
+
+class KeywordClassifier:
+    def __init__(self, categories, memo_size=MEMO_SIZE):
+        """categories: dict of label -> keywords; earlier labels win in first()"""
+        self.labels = tuple(categories)
+        keyword_labels = {}
+        for index, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                keyword_labels.setdefault(keyword.lower(), set()).add(index)
+
+        # A match of keyword k also means every keyword that is a prefix of k matched
+        self._labels_for = {
+            keyword: frozenset().union(*(
+                indexes for other, indexes in keyword_labels.items() if keyword.startswith(other)
+            ))
+            for keyword in keyword_labels
+        }
+
+        alternation = "|".join(
+            re.escape(keyword) for keyword in sorted(keyword_labels, key=len, reverse=True)
+        )
+        self._pattern = re.compile(f"(?=({alternation}))")
+        self._classify = lru_cache(maxsize=memo_size)(self._scan)
+
+    def _scan(self, text):
+        found = set()
+        for match in self._pattern.finditer(text.lower()):
+            found |= self._labels_for[match.group(1)]
+        return tuple(sorted(found))
+
+    def matches(self, text):
+        """Every label with a keyword in text, in priority order"""
+        return tuple(self.labels[index] for index in self._classify(text))
+
+    def first(self, text, default=None):
+        """Highest-priority label with a keyword in text"""
+        found = self._classify(text)
+        return self.labels[found[0]] if found else default
+
+    def cache_info(self):
+        return self._classify.cache_info()
+
+
+# Dashboard analysis: subject -> one of the ten analysis domains
+ANALYSIS_DOMAIN_KEYWORDS = {
+    'frontend': ['web', 'html', 'css', 'javascript', 'react', 'angular', 'vue', 'ui', 'ux', 'frontend'],
+    'backend': ['backend', 'server', 'api', 'database', 'sql', 'node', 'django', 'flask', 'spring', '.net', 'java', 'programming'],
+    'ai_ml': ['machine learning', 'artificial intelligence', 'neural', 'deep learning', 'ai', 'ml', 'nlp', 'computer vision'],
+    'cybersecurity': ['security', 'cryptography', 'network security', 'ethical hacking', 'information security', 'cyber'],
+    'data_science': ['data', 'statistics', 'analytics', 'visualization', 'mining', 'big data', 'data science'],
+    'mobile': ['mobile', 'android', 'ios', 'flutter', 'react native', 'swift', 'kotlin'],
+    'devops': ['devops', 'docker', 'kubernetes', 'ci/cd', 'jenkins', 'aws', 'cloud', 'deployment'],
+    'iot': ['iot', 'internet of things', 'embedded', 'sensors', 'arduino', 'raspberry'],
+    'blockchain': ['blockchain', 'cryptocurrency', 'smart contract', 'ethereum', 'web3'],
+    'game_dev': ['game', 'unity', '3d', 'graphics', 'animation', 'game development']
+}
+
+# Keyword fallback used when the ML prediction fails
+FALLBACK_DOMAIN_KEYWORDS = {
+    'AI/ML': ['machine learning', 'artificial intelligence', 'data mining', 'neural', 'deep learning'],
+    'Web Development': ['web', 'internet', 'html', 'javascript', 'react', '.net', 'programming'],
+    'Cybersecurity': ['security', 'cryptography', 'network security', 'ethical hacking', 'information security'],
+    'IoT': ['iot', 'internet of things', 'embedded', 'sensors'],
+    'Data Science': ['data', 'statistics', 'analytics', 'visualization', 'mining'],
+    'Software Engineering': ['software', 'engineering', 'design patterns', 'testing', 'project']
+}
+
+# feature_builder.map_subject_to_type, for subjects whose category does not decide it
+SUBJECT_TYPE_KEYWORDS = {
+    'DSA': ['data structure', 'algorithm'],
+    'OS': ['operating system'],
+    'DBMS': ['database'],
+    'WEB': ['web', 'php'],
+    'SECURITY': ['security'],
+}
+
+analysis_domains = KeywordClassifier(ANALYSIS_DOMAIN_KEYWORDS)
+fallback_domains = KeywordClassifier(FALLBACK_DOMAIN_KEYWORDS)
+subject_types = KeywordClassifier(SUBJECT_TYPE_KEYWORDS)
+# scoring.calculate_domain_scores: every SUBJECT_DOMAIN_WEIGHTS key found in the name
+weight_keys = KeywordClassifier({key: [key] for key in SUBJECT_DOMAIN_WEIGHTS})
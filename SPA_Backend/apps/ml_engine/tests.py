@@ -1,3 +1,431 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+from unittest import mock
+
+import joblib
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+from sklearn.ensemble import RandomForestClassifier
+
+from apps.academics import subject_catalogue
+from apps.academics.analysis import domain_features, refresh_snapshot
+from apps.academics.models import SemesterResult, StudentAnalysisSnapshot, StudentMark, StudentProfile, Subject
+
+from . import inference_server, training
+from .domain_matrix import domain_vectors, iter_cohort_domain_vectors
+from .domain_weights import DOMAINS, SUBJECT_DOMAIN_WEIGHTS
+from .inference_server import InferenceServer
+from .packed_forest import PackedForest, export_forest
+from .prediction_cache import PredictionCache
+from .predictor import (
+    FEATURE_KEYS, ModelHolder, feature_row, model_fingerprint, predict_domains, predict_domains_served, predict_locally
+)
+from .subject_classifier import KeywordClassifier
+
+
+class KeywordClassifierTests(TestCase):
+    def test_matches_like_substring_checks_in_priority_order(self):
+        classifier = KeywordClassifier({
+            "network": ["network security", "network"],
+            "security": ["security", "sec"],
+            "data": ["data", "database"],
+        })
+
+        self.assertEqual(classifier.first("Network Security"), "network")
+        self.assertEqual(classifier.matches("Network Security"), ("network", "security"))
+        # "database" wins the position but "data", a prefix of it, matched too
+        self.assertEqual(classifier.matches("DATABASE Systems"), ("data",))
+        self.assertEqual(classifier.matches("Securing a database"), ("security", "data"))
+        self.assertIsNone(classifier.first("Mathematics"))
+        self.assertEqual(classifier.first("Mathematics", default="OTHER"), "OTHER")
+
+
+class DomainVectorTests(TestCase):
+    def setUp(self):
+        names = ["Data Structures", "Operating System", "Web Technology", "Computer Networks", "Network Security"]
+        Subject.objects.bulk_create([
+            Subject(code=f"0320{i:04d}", name=name, semester=1, category="CORE", weightage=1.0 + i / 2)
+            for i, name in enumerate(names)
+        ] + [Subject(code="03209999", name="Mini Project", semester=6, category="PROJECT", weightage=2.0)])
+        subject_catalogue.invalidate()
+        self.subjects = list(Subject.objects.all())
+        self.students = [
+            get_user_model().objects.create_user(email=f"vector{i}@example.com") for i in range(3)
+        ]
+        for offset, student in enumerate(self.students[:2]):
+            StudentMark.objects.bulk_create([
+                StudentMark(student=student, subject=subject, semester=subject.semester, marks=5 + (offset + i) % 5)
+                for i, subject in enumerate(self.subjects)
+            ])
+
+    def _expected(self, student):
+        # The per-subject, per-domain loop the matrix product replaces
+        scores = {domain: 0.0 for domain in DOMAINS}
+        for mark in StudentMark.objects.filter(student=student).select_related("subject"):
+            weights = SUBJECT_DOMAIN_WEIGHTS[subject_catalogue.get_subjects_by_id()[mark.subject_id].subject_type]
+            for domain, weight in weights.items():
+                scores[domain] += mark.marks * mark.subject.weightage * weight
+        return [scores[domain] for domain in DOMAINS]
+
+    def test_batch_matches_per_student_loops_in_one_query(self):
+        subject_catalogue.get_subjects_by_id()
+
+        with self.assertNumQueries(1):
+            vectors = domain_vectors([student.pk for student in self.students])
+
+        for student in self.students[:2]:
+            for got, want in zip(vectors[student.pk], self._expected(student)):
+                self.assertAlmostEqual(got, want)
+        self.assertEqual(vectors[self.students[2].pk], [0.0] * len(DOMAINS))
+
+    def test_cohort_batches_and_subjects_missing_from_catalogue(self):
+        subject_catalogue.get_subjects_by_id()
+        # Created without the signal-driven invalidation reaching this process
+        late = Subject.objects.bulk_create([
+            Subject(code="03208888", name="Database Systems", semester=2, category="CORE", weightage=1.0)
+        ])[0]
+        StudentMark.objects.create(student=self.students[0], subject=late, semester=2, marks=8)
+
+        batches = list(iter_cohort_domain_vectors(batch_size=1))
+        self.assertEqual([list(batch) for batch in batches], [[self.students[0].pk], [self.students[1].pk]])
+
+        # The reference reads subject types from a reloaded catalogue
+        subject_catalogue.invalidate()
+        for got, want in zip(batches[0][self.students[0].pk], self._expected(self.students[0])):
+            self.assertAlmostEqual(got, want)
+
+
+class ModelHolderTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "model.pkl")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _publish(self, model):
+        # Written beside the target and renamed over it, as a deploy would
+        joblib.dump(model, self.path + ".tmp")
+        os.replace(self.path + ".tmp", self.path)
+
+    def test_loads_lazily_and_swaps_on_change(self):
+        holder = ModelHolder(self.path)
+        self.assertIsNone(holder.get())
+
+        self._publish({"name": "first"})
+        with self.settings(ML_MODEL_CHECK_SECONDS=0):
+            first = holder.get()
+            self.assertEqual(first, {"name": "first"})
+            self.assertIs(holder.get(), first)
+
+            self._publish({"name": "second"})
+            self.assertEqual(holder.get(), {"name": "second"})
+            self.assertEqual(holder.version, 2)
+            # A request that picked up the old model still has it
+            self.assertEqual(first, {"name": "first"})
+
+            with open(self.path, "wb") as fh:
+                fh.write(b"half-written")
+            self.assertEqual(holder.get(), {"name": "second"})
+
+    def test_checks_the_file_at_most_once_per_interval(self):
+        self._publish({"name": "first"})
+        holder = ModelHolder(self.path)
+        holder.get()
+        self._publish({"name": "second"})
+
+        with self.settings(ML_MODEL_CHECK_SECONDS=3600):
+            self.assertEqual(holder.get(), {"name": "first"})
+
+
+class PredictDomainsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        rng = np.random.default_rng(0)
+        X = rng.uniform(20, 100, size=(300, len(FEATURE_KEYS)))
+        cls.model = RandomForestClassifier(n_estimators=10, random_state=0).fit(
+            X, np.array(FEATURE_KEYS)[X.argmax(axis=1)]
+        )
+        cls.rows = rng.uniform(0, 100, size=(40, len(FEATURE_KEYS)))
+
+    def test_one_pass_matches_predict_and_ranks_every_class(self):
+        predictions = predict_domains(self.rows, model=self.model)
+
+        self.assertEqual([p["domain"] for p in predictions], self.model.predict(self.rows).tolist())
+        for prediction, probs in zip(predictions, self.model.predict_proba(self.rows)):
+            self.assertEqual(prediction["confidence"], round(max(probs) * 100, 2))
+            ranked = [pct for _, pct in prediction["probabilities"]]
+            self.assertEqual(ranked, sorted(ranked, reverse=True))
+            self.assertEqual(len(ranked), len(self.model.classes_))
+
+        self.assertEqual(predict_domains(self.rows[0], model=self.model), predictions[:1])
+
+    def _students_with_results(self):
+        subjects = ["Web Technology", "Machine Learning", "Network Security"]
+        students = []
+        for i in range(3):
+            student = get_user_model().objects.create_user(email=f"cohort{i}@example.com")
+            SemesterResult.objects.bulk_create(
+                SemesterResult(student=student, semester=1, subject=subject, marks=50 + 15 * ((i + j) % 3))
+                for j, subject in enumerate(subjects)
+            )
+            students.append(student)
+        StudentProfile.objects.create(user=students[0], assessment_domain_scores={"ai_ml": 90})
+        return students
+
+    def _expected(self, student):
+        # The features analyze_domain() predicts from for the dashboard
+        results = SemesterResult.objects.filter(student=student).order_by("semester", "subject")
+        profile = StudentProfile.objects.filter(user=student).first()
+        features, _ = domain_features(
+            [(result.subject, result.marks) for result in results],
+            profile.assessment_domain_scores if profile else None
+        )
+        return predict_domains([feature_row(features)], model=self.model)[0]
+
+    def test_rescore_cohort_matches_predict_domains_on_dashboard_features(self):
+        students = self._students_with_results()
+        holder = mock.Mock(path="model.pkl", version=1)
+        holder.get.return_value = self.model
+        out = io.StringIO()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "scores.csv")
+            with mock.patch("apps.ml_engine.management.commands.rescore_cohort.holder", holder):
+                call_command("rescore_cohort", "--batch-size", "2", "--output", path, stdout=out)
+            with open(path, newline="") as fh:
+                scored = {int(row["student_id"]): row for row in csv.DictReader(fh)}
+
+        self.assertIn("3 students scored with model v1", out.getvalue())
+        for student in students:
+            expected = self._expected(student)
+            self.assertEqual(scored[student.pk]["domain"], expected["domain"])
+            self.assertEqual(float(scored[student.pk]["confidence"]), expected["confidence"])
+
+    def test_recommendation_view_predicts_from_stored_results(self):
+        student = self._students_with_results()[0]
+        student.profile.is_completed = True
+        student.profile.save()
+        client = APIClient()
+        client.force_authenticate(student)
+
+        served = mock.patch(
+            "apps.ml_engine.predictor.predict_domains_served",
+            side_effect=lambda rows: (predict_domains(rows, model=self.model), "model.npz:1:100")
+        )
+        with served:
+            response = client.get("/api/career/recommend/")
+
+        expected = self._expected(student)
+        self.assertEqual(response.data, {"recommended_domain": expected["domain"], "confidence": expected["confidence"]})
+
+        student.results.all().delete()
+        self.assertEqual(client.get("/api/career/recommend/").status_code, 400)
+
+
+class PackedForestTests(TestCase):
+    def test_identical_to_the_sklearn_forest_and_served_in_preference(self):
+        rng = np.random.default_rng(1)
+        X = np.round(rng.uniform(20, 100, size=(400, len(FEATURE_KEYS))))
+        model = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=1).fit(
+            X, np.array(FEATURE_KEYS)[X.argmax(axis=1)]
+        )
+        rows = np.vstack([X[:50], rng.uniform(0, 120, size=(200, len(FEATURE_KEYS)))])
+
+        with tempfile.TemporaryDirectory() as directory:
+            packed_path = os.path.join(directory, "model.npz")
+            pickle_path = os.path.join(directory, "model.pkl")
+            joblib.dump(model, pickle_path)
+            export_forest(model, packed_path)
+
+            packed = PackedForest.load(packed_path)
+            np.testing.assert_array_equal(packed.predict_proba(rows), model.predict_proba(rows))
+            self.assertEqual(predict_domains(rows, model=packed), predict_domains(rows, model=model))
+
+            holder = ModelHolder(packed_path, pickle_path)
+            self.assertIsInstance(holder.get(), PackedForest)
+            os.unlink(packed_path)
+            with self.settings(ML_MODEL_CHECK_SECONDS=0):
+                self.assertIsInstance(holder.get(), RandomForestClassifier)
+
+
+class InferenceServerTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        X = rng.uniform(20, 100, size=(300, len(FEATURE_KEYS)))
+        model = RandomForestClassifier(n_estimators=10, random_state=2).fit(X, np.array(FEATURE_KEYS)[X.argmax(axis=1)])
+        self.rows = rng.uniform(0, 100, size=(24, len(FEATURE_KEYS)))
+
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        export_forest(model, os.path.join(self.dir.name, "model.npz"))
+        patcher = mock.patch("apps.ml_engine.predictor.holder", ModelHolder(os.path.join(self.dir.name, "model.npz")))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.socket = os.path.join(self.dir.name, "inference.sock")
+        # Forget failures recorded by other tests
+        inference_server._state["unavailable_until"] = 0.0
+
+    def test_concurrent_requests_are_batched_and_match_in_process(self):
+        server = InferenceServer(self.socket, window_ms=50)
+        server.start()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.stop)
+
+        results = [None] * len(self.rows)
+
+        def call(index):
+            results[index] = predict_domains(self.rows[index])[0]
+
+        with self.settings(ML_INFERENCE_SOCKET=self.socket):
+            threads = [threading.Thread(target=call, args=(i,)) for i in range(len(self.rows))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(results, predict_locally(self.rows))
+        self.assertEqual(server.rows, len(self.rows))
+        self.assertLess(server.batches, len(self.rows))
+
+    def test_snapshot_stores_the_fingerprint_of_the_server_model(self):
+        server = InferenceServer(self.socket, window_ms=0)
+        server.start()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.stop)
+
+        student = get_user_model().objects.create_user(email="served@example.com")
+        SemesterResult.objects.create(student=student, semester=1, subject="Machine Learning", marks=88)
+
+        with self.settings(ML_INFERENCE_SOCKET=self.socket):
+            _, served = predict_domains_served(self.rows[:1])
+            self.assertTrue(served)
+            # A new file the server has not loaded yet must not count as the served model
+            path = os.path.join(self.dir.name, "model.npz")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(model_fingerprint(), served)
+
+            refresh_snapshot(student.pk)
+        self.assertEqual(StudentAnalysisSnapshot.objects.get(student=student).model_fingerprint, served)
+
+    def test_falls_back_in_process_when_the_server_is_down(self):
+        with self.settings(ML_INFERENCE_SOCKET=self.socket), self.assertLogs("apps.ml_engine.inference_server", "WARNING"):
+            self.assertEqual(predict_domains(self.rows), predict_locally(self.rows))
+
+
+class PredictionCacheTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        X = rng.uniform(20, 100, size=(300, len(FEATURE_KEYS)))
+        self.model = RandomForestClassifier(n_estimators=10, random_state=3).fit(
+            X, np.array(FEATURE_KEYS)[X.argmax(axis=1)]
+        )
+        self.rows = np.round(rng.uniform(0, 100, size=(20, len(FEATURE_KEYS))), 2)
+
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "model.npz")
+        export_forest(self.model, self.path)
+
+        self.cache = PredictionCache()
+        for target, value in (("holder", ModelHolder(self.path)), ("prediction_cache", self.cache)):
+            patcher = mock.patch(f"apps.ml_engine.predictor.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_repeat_rows_are_served_from_memory(self):
+        first = predict_locally(self.rows)
+        self.assertEqual(first, predict_domains(self.rows, model=self.model))
+
+        # Differences below the quantum map to the same entry
+        self.assertEqual(predict_locally(self.rows + 0.001), first)
+        self.assertEqual(self.cache.stats()["hits"], 20)
+        self.assertEqual(self.cache.stats()["misses"], 20)
+
+    def test_reloaded_model_invalidates(self):
+        predict_locally(self.rows)
+        os.utime(self.path, ns=(0, 0))
+
+        with self.settings(ML_MODEL_CHECK_SECONDS=0):
+            predict_locally(self.rows)
+        self.assertEqual(self.cache.stats()["misses"], 40)
+
+    def test_shared_cache_serves_other_processes(self):
+        with self.settings(ML_PREDICTION_CACHE_SHARED=True):
+            first = predict_locally(self.rows[:5])
+            other_process = PredictionCache()
+            with mock.patch("apps.ml_engine.predictor.prediction_cache", other_process):
+                self.assertEqual(predict_locally(self.rows[:5]), first)
+
+        self.assertEqual(other_process.stats()["shared_hits"], 5)
+        self.assertEqual(other_process.stats()["misses"], 0)
+
+
+class TrainCareerModelTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        subjects = ["Web Technology", "Machine Learning", "Computer Networks", "Database Systems", "Mobile Computing"]
+        self.students = []
+        for i in range(12):
+            student = get_user_model().objects.create_user(email=f"train{i}@example.com")
+            SemesterResult.objects.bulk_create(
+                SemesterResult(student=student, semester=1, subject=subject, marks=float(marks))
+                for subject, marks in zip(subjects, rng.integers(35, 100, size=len(subjects)))
+            )
+            if i % 2:
+                StudentProfile.objects.create(user=student, assessment_domain_scores={"ai_ml": 90, "iot": 40})
+            self.students.append(student)
+
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def test_features_match_analyze_domain_in_chunks(self):
+        with self.assertNumQueries(1 + 4):  # results, then one profile query per 3 students
+            features = dict(training.iter_student_features(chunk_size=3))
+
+        self.assertEqual(len(features), 12)
+        for student in self.students:
+            # What analyze_domain() predicts from for the student page
+            results = SemesterResult.objects.filter(student=student).order_by("semester", "subject")
+            profile = StudentProfile.objects.filter(user=student).first()
+            expected, _ = domain_features(
+                [(result.subject, result.marks) for result in results],
+                profile.assessment_domain_scores if profile else None
+            )
+            self.assertEqual(features[student.id], [expected[key] for key in FEATURE_KEYS])
+        self.assertGreater(features[self.students[1].id][FEATURE_KEYS.index("iot")], 0)
+
+    def test_writes_a_versioned_artifact_and_publishes_it(self):
+        served = {name: os.path.join(self.dir.name, name) for name in ("model.pkl", "model.npz", "model.json")}
+        with mock.patch.object(training, "MODEL_PATH", served["model.pkl"]), \
+                mock.patch.object(training, "PACKED_MODEL_PATH", served["model.npz"]), \
+                mock.patch.object(training, "METADATA_PATH", served["model.json"]):
+            call_command(
+                "train_career_model", synthetic=300, estimators=10, seed=0, min_samples=100,
+                artifact_dir=self.dir.name, stdout=io.StringIO()
+            )
+
+        with open(served["model.json"]) as fh:
+            metadata = json.load(fh)
+        self.assertEqual((metadata["students"], metadata["synthetic"]), (12, 300))
+        self.assertGreater(metadata["accuracy"], 0.5)
+        version_dir = os.path.join(self.dir.name, metadata["version"])
+        self.assertEqual(metadata["artifact_bytes"]["model.npz"], os.path.getsize(served["model.npz"]))
+
+        model = joblib.load(os.path.join(version_dir, "model.pkl"))
+        rows = np.random.default_rng(4).uniform(0, 100, size=(50, len(FEATURE_KEYS)))
+        self.assertEqual(model.n_jobs, None)
+        np.testing.assert_array_equal(PackedForest.load(served["model.npz"]).predict_proba(rows), model.predict_proba(rows))
 
-# Create your tests here.
+    def test_refuses_too_few_students(self):
+        with self.assertRaises(CommandError):
+            call_command("train_career_model", artifact_dir=self.dir.name, stdout=io.StringIO())
+        self.assertEqual(os.listdir(self.dir.name), [])
@@ -2,6 +2,7 @@ import random
 import joblib
 from sklearn.ensemble import RandomForestClassifier
 from .domain_weights import DOMAINS
+from .packed_forest import export_forest
 
 def generate_sample():
     scores = [random.uniform(20, 100) for _ in DOMAINS]
@@ -21,6 +22,8 @@ def train_model():
     model.fit(X, y)
 
     joblib.dump(model, "apps/ml_engine/model.pkl")
+    # What predictor serves: the same forest, evaluated without sklearn
+    export_forest(model, "apps/ml_engine/model.npz")
     print("✅ ML Model trained and saved")
 
 
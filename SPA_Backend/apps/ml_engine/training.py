@@ -0,0 +1,181 @@
+#training.py
+"""
+Training the career model from stored results.
+
+collect_training_data() streams SemesterResult rows in student order with
+QuerySet.iterator(), so the whole table is never held in memory, and
+builds each student's features with academics.analysis.domain_features(),
+the function analyze_domain() predicts from, blending in the profile's
+assessment_domain_scores fetched one query per chunk of students.
+
+No outcome is stored for a student, so unless a labels file is given each
+one is labelled with their highest-scoring domain, the rule train_model.py
+applied to its synthetic scores. Students with no domain score are skipped.
+
+write_artifacts() saves each run as artifacts/<version>/ (model.pkl,
+model.npz, metadata.json), every file written to a temporary name and
+renamed into place; publish() then replaces the served model.pkl,
+model.npz and model.json the same way, so predictor's ModelHolder picks
+the new model up at its next check.
+"""
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from .packed_forest import pack_forest
+from .predictor import BASE_DIR, FEATURE_KEYS, MODEL_PATH, PACKED_MODEL_PATH
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = BASE_DIR / "artifacts"
+METADATA_PATH = BASE_DIR / "model.json"
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def _student_features(students):
+    """(student_id, features) for a chunk of (student_id, [(subject, marks), ...])"""
+    from apps.academics.analysis import domain_features
+    from apps.academics.models import StudentProfile
+
+    assessments = dict(
+        StudentProfile.objects.filter(user_id__in=[student_id for student_id, _ in students])
+        .values_list("user_id", "assessment_domain_scores")
+    )
+    for student_id, subject_marks in students:
+        features, _ = domain_features(subject_marks, assessments.get(student_id))
+        yield student_id, [float(features[key]) for key in FEATURE_KEYS]
+
+
+def iter_student_features(chunk_size=DEFAULT_CHUNK_SIZE, student_ids=None):
+    """
+    (student_id, feature row) for every student with results.
+
+    The rows are what the career model is trained on and what
+    analyze_domain() predicts from, in FEATURE_KEYS order.
+    student_ids: restrict to these students
+    """
+    from apps.academics.models import SemesterResult
+
+    results = SemesterResult.objects.order_by("student_id", "semester", "subject")
+    if student_ids is not None:
+        results = results.filter(student_id__in=list(student_ids))
+    results = results.values_list("student_id", "subject", "marks").iterator(chunk_size=chunk_size)
+    pending = []
+    for student_id, rows in groupby(results, key=itemgetter(0)):
+        pending.append((student_id, [(subject, marks) for _, subject, marks in rows]))
+        if len(pending) >= chunk_size:
+            yield from _student_features(pending)
+            pending = []
+    if pending:
+        yield from _student_features(pending)
+
+
+def read_labels(path):
+    """{enrollment_no: domain} from a CSV with enrollment_no and domain columns"""
+    with open(path, newline="") as fh:
+        reader = csv.DictReader(fh)
+        if not reader.fieldnames or not {"enrollment_no", "domain"} <= set(reader.fieldnames):
+            raise ValueError(f"{path} needs enrollment_no and domain columns")
+        labels = {}
+        for line, row in enumerate(reader, start=2):
+            domain = row["domain"].strip()
+            if domain not in FEATURE_KEYS:
+                raise ValueError(f"{path}:{line}: unknown domain {domain!r}")
+            labels[row["enrollment_no"].strip()] = domain
+    return labels
+
+
+def collect_training_data(chunk_size=DEFAULT_CHUNK_SIZE, labels=None):
+    """
+    Feature matrix and labels from the stored results.
+
+    labels: {enrollment_no: domain}; when given only those students are used
+    Returns (X, y, skipped) where skipped counts students left out.
+    """
+    student_labels = None
+    if labels is not None:
+        from apps.accounts.models import UserProfile
+
+        student_labels = {
+            user_id: labels[enrollment_no]
+            for user_id, enrollment_no in UserProfile.objects.filter(enrollment_no__in=list(labels))
+            .values_list("user_id", "enrollment_no")
+        }
+
+    X, y = [], []
+    skipped = 0
+    for student_id, row in iter_student_features(chunk_size):
+        if student_labels is not None:
+            label = student_labels.get(student_id)
+        elif max(row) > 0:
+            label = FEATURE_KEYS[int(np.argmax(row))]
+        else:
+            label = None
+        if label is None:
+            skipped += 1
+            continue
+        X.append(row)
+        y.append(label)
+
+    return np.array(X, dtype=float).reshape(-1, len(FEATURE_KEYS)), np.array(y, dtype=str), skipped
+
+
+def synthetic_samples(count, seed=None):
+    """Uniform 20-100 scores labelled with their top domain, as train_model.py generates them"""
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(20, 100, size=(count, len(FEATURE_KEYS)))
+    return X, np.array(FEATURE_KEYS)[X.argmax(axis=1)]
+
+
+def _atomic_write(path, write):
+    """Write path through write(fileobj) to a temporary file renamed over it"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            write(fh)
+        # mkstemp creates the file owner-only; the web workers may run as another user
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path.stat().st_size
+
+
+def write_artifacts(model, metadata, directory):
+    """
+    Save model.pkl, model.npz and metadata.json to directory.
+
+    The file sizes are added to metadata["artifact_bytes"]; metadata.json is
+    written last, so a directory with one holds a complete model.
+    """
+    directory = Path(directory)
+    packed = io.BytesIO()
+    np.savez(packed, **pack_forest(model))
+
+    metadata["artifact_bytes"] = {
+        "model.pkl": _atomic_write(directory / "model.pkl", lambda fh: joblib.dump(model, fh)),
+        "model.npz": _atomic_write(directory / "model.npz", lambda fh: fh.write(packed.getvalue())),
+    }
+    _atomic_write(directory / "metadata.json", lambda fh: fh.write(json.dumps(metadata, indent=2).encode()))
+    return directory
+
+
+def publish(directory):
+    """Serve the model saved in directory; model.npz is replaced last as predictor prefers it"""
+    directory = Path(directory)
+    for name, target in (("model.pkl", MODEL_PATH), ("metadata.json", METADATA_PATH), ("model.npz", PACKED_MODEL_PATH)):
+        data = (directory / name).read_bytes()
+        _atomic_write(target, lambda fh: fh.write(data))
+    logger.info("Published model from %s", directory)
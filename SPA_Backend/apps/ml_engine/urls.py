@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import CareerRecommendationView
+from .views import CareerRecommendationView, ModelStatusView
 
 
 urlpatterns = [
     path('recommend/', CareerRecommendationView.as_view()),
+    path('status/', ModelStatusView.as_view()),
 ]
\ No newline at end of file
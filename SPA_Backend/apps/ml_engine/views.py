@@ -1,29 +1,24 @@
-from django.shortcuts import render
+from django.conf import settings
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from .service import recommend_career
-from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
 from apps.accounts.permissions import IsProfileCompleted
-from apps.academics.models import SemesterResult
-from .feature_builder import build_feature_vector
-from .predictor import predict_domain
+from .prediction_cache import prediction_cache
+from .predictor import FEATURE_KEYS, holder, predict_domain
+from .training import iter_student_features
 
 
 class CareerRecommendationView(APIView):
     permission_classes = [IsAuthenticated, IsProfileCompleted]
 
     def get(self, request):
-        marks = StudentMark.objects.filter(student=request.user)
-
-        if not marks.exists():
+        # Built from stored results the same way as for training and the dashboard
+        features = dict(iter_student_features(student_ids=[request.user.pk]))
+        if request.user.pk not in features:
             return Response({"error": "No academic data found"}, status=400)
 
-        feature_vector = build_feature_vector(marks)
-        domain, confidence = predict_domain(feature_vector)
+        domain, confidence = predict_domain(dict(zip(FEATURE_KEYS, features[request.user.pk])))
 
         return Response({
             "recommended_domain": domain,
@@ -31,4 +26,22 @@ class CareerRecommendationView(APIView):
         })
 
 
+class ModelStatusView(APIView):
+    """
+    The model and prediction-cache counters of the process serving this request.
+    With ML_INFERENCE_SOCKET set, predictions are cached in the inference
+    server instead, which logs its counters when it stops.
+    """
+    permission_classes = [IsAdminUser]
 
+    def get(self, request):
+        holder.get()
+        return Response({
+            "model": {
+                "path": str(holder.path),
+                "version": holder.version,
+                "fingerprint": holder.fingerprint,
+            },
+            "inference_socket": settings.ML_INFERENCE_SOCKET or None,
+            "prediction_cache": prediction_cache.stats(),
+        })
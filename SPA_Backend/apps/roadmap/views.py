@@ -1,10 +1,15 @@
-from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from apps.academics.etags import student_etag
 from .service import generate_roadmap
 
 
+# The roadmap is derived from the student's results by the rule-based recommender, not
+# the trained career model, so only the data version goes into the tag
+@method_decorator(condition(etag_func=student_etag("roadmap")), name="get")
 class RoadmapView(APIView):
     permission_classes = [IsAuthenticated]
 
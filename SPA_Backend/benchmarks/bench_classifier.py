@@ -0,0 +1,176 @@
+"""
+Benchmark of apps.ml_engine.subject_classifier against the keyword loops it replaced.
+
+Classifies a corpus of subject names built from gradesheet_corpus with
+every table (analysis domains, keyword fallback, subject types, scoring
+weight keys), first with the old nested loops, then with the compiled
+classifier on a cold memo and again on a warm one:
+
+    python -m benchmarks.bench_classifier
+    python -m benchmarks.bench_classifier --names 50000 --repeat 3
+
+Exits non-zero if the classifier disagrees with the loops on any name.
+"""
+import argparse
+import random
+import sys
+import time
+
+from apps.ml_engine.subject_classifier import (
+    ANALYSIS_DOMAIN_KEYWORDS,
+    FALLBACK_DOMAIN_KEYWORDS,
+    SUBJECT_DOMAIN_WEIGHTS,
+    SUBJECT_TYPE_KEYWORDS,
+    KeywordClassifier,
+)
+
+from .gradesheet_corpus import SUBJECT_WORDS
+
+PREFIXES = ["", "Advanced ", "Introduction to ", "Fundamentals of ", "Applied "]
+SUFFIXES = ["", " Lab", " - I", " - II", " and Applications", " (Elective)"]
+EXTRA_WORDS = [
+    "React Native Development", "Big Data Analytics", "Ethical Hacking", "DevOps with Docker",
+    "Blockchain and Smart Contracts", "Game Development with Unity", "Natural Language Processing (NLP)",
+    "Embedded Systems and Arduino", "Design Patterns", "Server Side Scripting with PHP",
+    "Computer Vision", "UI/UX Design", "Kotlin for Android", "Statistics for Data Science",
+]
+
+
+def make_names(count, seed=0):
+    """count subject names; roughly one in ten is distinct, like a real class's sheets"""
+    rng = random.Random(seed)
+    words = SUBJECT_WORDS + EXTRA_WORDS
+    distinct = [
+        f"{rng.choice(PREFIXES)}{rng.choice(words)}{rng.choice(SUFFIXES)}"
+        for _ in range(max(1, count // 10))
+    ]
+    return [rng.choice(distinct) for _ in range(count)]
+
+
+# The loops as they were before the classifier, kept as the reference
+def loop_analysis_domain(name):
+    subject_name = name.lower()
+    for category, keywords in ANALYSIS_DOMAIN_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in subject_name:
+                return category
+    return None
+
+
+def loop_fallback_domains(name):
+    subject_name = name.lower()
+    found = []
+    for domain, keywords in FALLBACK_DOMAIN_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in subject_name:
+                found.append(domain)
+                break
+    return tuple(found)
+
+
+def loop_subject_type(name):
+    name = name.lower()
+    if "data structure" in name or "algorithm" in name:
+        return "DSA"
+    if "operating system" in name:
+        return "OS"
+    if "database" in name:
+        return "DBMS"
+    if "web" in name or "php" in name:
+        return "WEB"
+    if "security" in name:
+        return "SECURITY"
+    return "PROGRAMMING"
+
+
+def loop_weight_keys(name):
+    subject = name.upper()
+    return tuple(key for key in SUBJECT_DOMAIN_WEIGHTS if key in subject)
+
+
+# table -> (reference loop, classifier method to compare, keyword table)
+TABLES = {
+    "analysis_domains": (
+        loop_analysis_domain,
+        lambda c: c.first,
+        ANALYSIS_DOMAIN_KEYWORDS,
+    ),
+    "fallback_domains": (
+        loop_fallback_domains,
+        lambda c: c.matches,
+        FALLBACK_DOMAIN_KEYWORDS,
+    ),
+    "subject_types": (
+        loop_subject_type,
+        lambda c: (lambda name: c.first(name, default="PROGRAMMING")),
+        SUBJECT_TYPE_KEYWORDS,
+    ),
+    "weight_keys": (
+        loop_weight_keys,
+        lambda c: c.matches,
+        {key: [key] for key in SUBJECT_DOMAIN_WEIGHTS},
+    ),
+}
+
+
+def _time(func, names, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name in names:
+            func(name)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(names, repeat):
+    results = {}
+    for table, (loop, bind, keywords) in TABLES.items():
+        expected = [loop(name) for name in names]
+        loop_seconds = _time(loop, names, repeat)
+
+        # Cold: a new classifier per run, so the memo starts empty
+        cold_best = float("inf")
+        for _ in range(repeat):
+            classify = bind(KeywordClassifier(keywords))
+            start = time.perf_counter()
+            for name in names:
+                classify(name)
+            cold_best = min(cold_best, time.perf_counter() - start)
+
+        classify = bind(KeywordClassifier(keywords))
+        got = [classify(name) for name in names]
+        warm_seconds = _time(classify, names, repeat)
+
+        results[table] = {
+            "loop_per_sec": round(len(names) / loop_seconds),
+            "cold_per_sec": round(len(names) / cold_best),
+            "warm_per_sec": round(len(names) / warm_seconds),
+            "mismatches": sum(1 for a, b in zip(expected, got) if a != b),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=20000, help="Subject names to classify")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    names = make_names(args.names, args.seed)
+    results = run(names, args.repeat)
+
+    print(f"{len(names)} names, {len(set(names))} distinct\n")
+    print(f"{'table':18} {'loops/s':>10} {'cold/s':>10} {'warm/s':>10} {'speedup':>8} {'mismatch':>9}")
+    for table, r in results.items():
+        print(
+            f"{table:18} {r['loop_per_sec']:>10} {r['cold_per_sec']:>10} {r['warm_per_sec']:>10} "
+            f"{r['warm_per_sec'] / r['loop_per_sec']:>7.1f}x {r['mismatches']:>9}"
+        )
+
+    return 1 if any(r["mismatches"] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Throughput and correctness benchmark for apps.academics.pdf_extractor.
+
+Runs offline against synthetic grade sheets from gradesheet_corpus, one
+forked process per case so peak RSS is measured per case:
+
+    python -m benchmarks.bench_extractor                  # print results
+    python -m benchmarks.bench_extractor --compare        # diff against baselines.json
+    python -m benchmarks.bench_extractor --save-baseline  # overwrite baselines.json
+    python -m benchmarks.bench_extractor --dump-corpus DIR # write the PDFs and expected rows
+
+Each case is also timed against a reference path in the same process:
+pdfplumber opening the PDF and reading every page's text, the least any
+tier has to do. baselines.json stores that ratio (relative_cost) and the
+row counts, not absolute timings, so it holds across machines. --compare
+exits non-zero when a case's relative cost grows by more than --tolerance
+or it extracts fewer rows correctly than before.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+import pdfplumber
+
+from apps.academics.pdf_extractor import extract_grade_sheet
+
+from .gradesheet_corpus import build_pdf, expected_rows, make_rows
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+# Stored per case; everything else in a result depends on the machine
+BASELINE_KEYS = ("pages", "rows", "tier", "relative_cost", "correct_rows", "accuracy")
+
+# name -> (pages, rows per page, generator options)
+CASES = {
+    "single_page": (1, 10, {"merged": True}),
+    "six_pages_long_names": (6, 12, {"merged": True, "long_names": True}),
+    "six_pages_one_row_per_subject": (6, 12, {"merged": False, "long_names": True}),
+    "template_no_credits": (6, 12, {"merged": True, "credits": False}),
+    "tables_other_issuer": (6, 12, {"merged": True, "credits": False, "issuer": "OTHER COLLEGE"}),
+    "large_twenty_pages": (20, 25, {"merged": True}),
+}
+
+
+def _build_case(name):
+    pages, per_page, options = CASES[name]
+    options = dict(options)
+    row_options = {k: options.pop(k) for k in ("long_names", "credits") if k in options}
+    pages_rows = [make_rows(per_page, seed=index, **row_options) for index in range(pages)]
+    return build_pdf(pages_rows, **options), expected_rows(pages_rows), pages
+
+
+def _correct_rows(extracted, expected):
+    return sum(1 for got, want in zip(extracted, expected) if got == want)
+
+
+def _read_text(data):
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            page.extract_text()
+            page.close()
+
+
+def _run_case(name, repeat, conn):
+    data, expected, pages = _build_case(name)
+    best = float("inf")
+    reference = float("inf")
+    extracted, tier = [], None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _read_text(data)
+        reference = min(reference, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        try:
+            extracted, tier = extract_grade_sheet(io.BytesIO(data))
+        except ValueError:
+            extracted, tier = [], "failed"
+        best = min(best, time.perf_counter() - start)
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn.send({
+        "pages": pages,
+        "rows": len(expected),
+        "tier": tier,
+        "seconds": round(best, 4),
+        "relative_cost": round(best / reference, 3),
+        "pages_per_sec": round(pages / best, 2),
+        "rows_per_sec": round(len(expected) / best, 2),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "correct_rows": _correct_rows(extracted, expected),
+        "accuracy": round(_correct_rows(extracted, expected) / len(expected), 4),
+    })
+    conn.close()
+
+
+def run(cases, repeat):
+    ctx = multiprocessing.get_context("fork")
+    results = {}
+    for name in cases:
+        parent_conn, child_conn = ctx.Pipe(duplex=False)
+        process = ctx.Process(target=_run_case, args=(name, repeat, child_conn))
+        process.start()
+        child_conn.close()
+        results[name] = parent_conn.recv()
+        process.join()
+    return results
+
+
+def compare(results, baselines, tolerance):
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if not baseline:
+            print(f"{name:32} no baseline")
+            continue
+        change = result["relative_cost"] / baseline["relative_cost"] - 1
+        print(
+            f"{name:32} relative cost {baseline['relative_cost']:>6} -> {result['relative_cost']:>6} "
+            f"({change:+.1%})  accuracy {baseline['accuracy']} -> {result['accuracy']}"
+        )
+        if change > tolerance:
+            regressions.append(f"{name}: relative cost {change:+.1%}")
+        if result["correct_rows"] < baseline["correct_rows"]:
+            regressions.append(f"{name}: {baseline['correct_rows']} -> {result['correct_rows']} correct rows")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="Run only these cases")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the fastest is reported")
+    parser.add_argument("--compare", action="store_true", help="Compare against the stored baselines")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baselines")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative cost growth for --compare")
+    parser.add_argument("--dump-corpus", metavar="DIR", help="Write each case's PDF and expected rows, then exit")
+    args = parser.parse_args(argv)
+
+    if args.dump_corpus:
+        out = Path(args.dump_corpus)
+        out.mkdir(parents=True, exist_ok=True)
+        for name in args.case or CASES:
+            data, expected, _ = _build_case(name)
+            (out / f"{name}.pdf").write_bytes(data)
+            (out / f"{name}.json").write_text(json.dumps(expected, indent=2) + "\n")
+        print(f"Corpus written to {out}")
+        return 0
+
+    results = run(args.case or list(CASES), args.repeat)
+
+    print(f"{'case':32} {'tier':9} {'pages/s':>9} {'rows/s':>10} {'rel. cost':>9} {'peak MB':>8} {'accuracy':>9}")
+    for name, r in results.items():
+        print(
+            f"{name:32} {r['tier']:9} {r['pages_per_sec']:>9} {r['rows_per_sec']:>10} "
+            f"{r['relative_cost']:>9} {r['peak_rss_mb']:>8} {r['accuracy']:>9}"
+        )
+
+    if args.save_baseline:
+        baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+        baselines.update({name: {key: r[key] for key in BASELINE_KEYS} for name, r in results.items()})
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines written to {BASELINE_PATH}")
+
+    if args.compare:
+        if not BASELINE_PATH.exists():
+            print("No baselines stored yet, run with --save-baseline first")
+            return 1
+        print()
+        regressions = compare(results, json.loads(BASELINE_PATH.read_text()), args.tolerance)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Throughput benchmark for apps.ml_engine.predictor.
+
+Trains a RandomForest on synthetic scores (or loads --model) and reports
+rows/sec for:
+
+    two_pass_per_row   predict() then predict_proba() per row, as before predict_domains
+    single_row         predict_domains() with N=1, as the student views call it
+    batch              predict_domains() over --batch-size rows, as rescore_cohort calls it
+    packed_*           the same two calls on the forest exported by packed_forest
+
+    python -m benchmarks.bench_predictor
+    python -m benchmarks.bench_predictor --model apps/ml_engine/model.pkl --rows 5000
+
+Exits non-zero if the batch labels differ from predict() or the packed
+forest's probabilities differ from the sklearn forest's.
+"""
+import argparse
+import sys
+import time
+
+import joblib
+import numpy as np
+
+from apps.ml_engine.packed_forest import PackedForest
+from apps.ml_engine.predictor import FEATURE_KEYS, predict_domains
+
+
+def synthetic_model(n_estimators, seed=0):
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(20, 100, size=(2000, len(FEATURE_KEYS)))
+    y = np.array(FEATURE_KEYS)[X.argmax(axis=1)]
+    return RandomForestClassifier(n_estimators=n_estimators, random_state=seed).fit(X, y)
+
+
+def two_pass_per_row(model, rows):
+    for row in rows:
+        model.predict([row])[0]
+        max(model.predict_proba([row])[0])
+
+
+def single_row(model, rows):
+    for row in rows:
+        predict_domains([row], model=model)
+
+
+def batched(batch_size):
+    def run(model, rows):
+        for offset in range(0, len(rows), batch_size):
+            predict_domains(rows[offset:offset + batch_size], model=model)
+    return run
+
+
+def _rows_per_sec(func, model, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(model, rows)
+        best = min(best, time.perf_counter() - start)
+    return round(len(rows) / best, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="joblib model file; a synthetic forest is trained when omitted")
+    parser.add_argument("--estimators", type=int, default=100, help="Trees in the synthetic forest")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows scored in the batch case")
+    parser.add_argument("--per-row", type=int, default=200, help="Rows scored one at a time in the per-row cases")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    model = joblib.load(args.model, mmap_mode="r") if args.model else synthetic_model(args.estimators)
+    rows = np.random.default_rng(1).uniform(0, 100, size=(args.rows, len(FEATURE_KEYS)))
+
+    packed = PackedForest.from_model(model)
+
+    results = {
+        "two_pass_per_row": _rows_per_sec(two_pass_per_row, model, rows[:args.per_row], args.repeat),
+        "single_row": _rows_per_sec(single_row, model, rows[:args.per_row], args.repeat),
+        "batch": _rows_per_sec(batched(args.batch_size), model, rows, args.repeat),
+        "packed_single_row": _rows_per_sec(single_row, packed, rows[:args.per_row], args.repeat),
+        "packed_batch": _rows_per_sec(batched(args.batch_size), packed, rows, args.repeat),
+    }
+
+    print(f"{'case':20} {'rows/s':>10}")
+    for name, rate in results.items():
+        print(f"{name:20} {rate:>10}")
+    print(f"\npacked forest: {packed.nbytes / 1024:.0f} KiB of arrays, {len(packed.roots)} trees, depth {packed.max_depth}")
+
+    failed = False
+    labels = [prediction["domain"] for prediction in predict_domains(rows, model=model)]
+    if labels != model.predict(rows).tolist():
+        print("Batch labels differ from model.predict()")
+        failed = True
+    if not np.array_equal(packed.predict_proba(rows), model.predict_proba(rows)):
+        print("Packed forest probabilities differ from the sklearn forest")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
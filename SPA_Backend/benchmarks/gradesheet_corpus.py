@@ -0,0 +1,167 @@
+"""
+Synthetic Parul University grade-sheet generator.
+
+Writes minimal, dependency-free PDFs (Helvetica text plus ruling lines) whose
+table structure reproduces what pdfplumber's extract_tables() returns for the
+real sheets: one row per subject, or every subject merged into one
+newline-separated cell block when ``merged`` is set.
+"""
+import random
+
+GRADES = ["O", "A+", "A", "B+", "B", "P", "F"]
+
+SUBJECT_WORDS = [
+    "Programming", "Data Structures", "Database Management Systems",
+    "Operating System", "Computer Networks", "Web Technology",
+    "Machine Learning", "Information Security", "Software Engineering",
+    "Discrete Mathematics", "Cloud Computing", "Mobile Application Development",
+    "Internet of Things", "Artificial Intelligence", "Data Mining",
+    "Compiler Design", "Computer Graphics", "Professional Communication",
+]
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+COLUMNS = [("Subject Code", 40, 120), ("Subject Name", 120, 420), ("Credit", 420, 480), ("Grade", 480, 555)]
+LINE_HEIGHT = 12
+NAME_WRAP = 48
+
+
+def make_rows(count, seed=0, long_names=False, credits=True):
+    """
+    Random subject rows. long_names wraps every third name onto two lines;
+    credits=False prints "-" in the credit column, which the text-layer
+    tier cannot parse.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        name = rng.choice(SUBJECT_WORDS)
+        if long_names and i % 3 == 0:
+            name = f"{name} and {rng.choice(SUBJECT_WORDS)} Practices"
+        rows.append({
+            "code": f"{3030 + i:04d}{rng.randint(1000, 9999)}",
+            "subject": name,
+            "credit": str(rng.randint(1, 5)) if credits else "-",
+            "grade": rng.choice(GRADES),
+        })
+    return rows
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text, width=NAME_WRAP):
+    words, lines, current = text.split(), [], ""
+    for word in words:
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    if current:
+        lines.append(current)
+    return lines
+
+
+class _Page:
+    def __init__(self):
+        self.ops = []
+
+    def text(self, x, y, value, size=9):
+        self.ops.append(f"BT /F1 {size} Tf {x} {y} Td ({_escape(value)}) Tj ET")
+
+    def line(self, x1, y1, x2, y2):
+        self.ops.append(f"{x1} {y1} m {x2} {y2} l S")
+
+    def stream(self):
+        return ("0.5 w\n" + "\n".join(self.ops)).encode("latin-1")
+
+
+def _draw_table(page, rows, top, merged, with_total):
+    left, right = COLUMNS[0][1], COLUMNS[-1][2]
+    header_bottom = top - 18
+    for label, x0, _ in COLUMNS:
+        page.text(x0 + 3, top - 13, label)
+
+    blocks = [rows] if merged else [[row] for row in rows]
+    if with_total:
+        blocks.append([{"code": "", "subject": "Total", "credit": "", "grade": ""}])
+
+    y = header_bottom
+    horizontal = [top, header_bottom]
+    for block in blocks:
+        cursor = y - 10
+        for row in block:
+            name_lines = _wrap(row["subject"])
+            page.text(COLUMNS[0][1] + 3, cursor, row["code"])
+            page.text(COLUMNS[2][1] + 3, cursor, row["credit"])
+            page.text(COLUMNS[3][1] + 3, cursor, row["grade"])
+            for offset, part in enumerate(name_lines):
+                page.text(COLUMNS[1][1] + 3, cursor - offset * LINE_HEIGHT, part)
+            cursor -= LINE_HEIGHT * len(name_lines)
+        y = cursor - 2
+        horizontal.append(y)
+
+    for hy in horizontal:
+        page.line(left, hy, right, hy)
+    for _, x0, _ in COLUMNS:
+        page.line(x0, top, x0, y)
+    page.line(right, top, right, y)
+    return y
+
+
+def build_pdf(pages_rows, merged=False, issuer="PARUL UNIVERSITY"):
+    """Return PDF bytes with one grade table per entry of ``pages_rows``"""
+    pages = []
+    for page_rows in pages_rows:
+        page = _Page()
+        page.text(220, 800, issuer, size=14)
+        page.text(230, 780, "Grade Sheet", size=11)
+        page.text(40, 750, "Enrollment No: 2203031000000")
+        _draw_table(page, page_rows, 720, merged, with_total=True)
+        pages.append(page)
+
+    objects = []
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    pages_id = add(None)
+    kids = []
+    for page in pages:
+        data = page.stream()
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        page_id = add(
+            (
+                f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+            ).encode("latin-1")
+        )
+        kids.append(page_id)
+    objects[pages_id - 1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>"
+    ).encode("latin-1")
+    catalog_id = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode("latin-1"))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref)
+    return bytes(out)
+
+
+def expected_rows(pages_rows):
+    return [
+        {"subject": row["subject"], "grade": row["grade"]}
+        for page_rows in pages_rows
+        for row in page_rows
+    ]
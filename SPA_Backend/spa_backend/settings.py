@@ -135,6 +135,50 @@ SIMPLE_JWT = {
 
 MARKS_ENCRYPTION_KEY = config('MARKS_ENCRYPTION_KEY', default='default-dev-key-32-chars-long!!').encode()
 
+# Grade-sheet parsing pool used by the ingestion worker (apps/academics/pdf_pool.py)
+PDF_PARSE_WORKERS = int(os.getenv('PDF_PARSE_WORKERS', os.cpu_count() or 1))
+PDF_PARSE_TIMEOUT = float(os.getenv('PDF_PARSE_TIMEOUT', 30))
+PDF_PARSE_MEMORY_LIMIT_MB = int(os.getenv('PDF_PARSE_MEMORY_LIMIT_MB', 512))
+PDF_EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv('PDF_EXTRACTION_CACHE_MAX_ENTRIES', 5000))
+# Ingestion jobs RUNNING without a heartbeat for this long are reclaimed, at most MAX_ATTEMPTS times in all
+INGESTION_JOB_TIMEOUT = float(os.getenv('INGESTION_JOB_TIMEOUT', 1800))
+INGESTION_JOB_MAX_ATTEMPTS = int(os.getenv('INGESTION_JOB_MAX_ATTEMPTS', 3))
+# Per-file cap enforced while result PDFs stream in (apps/academics/uploads.py)
+RESULT_PDF_MAX_BYTES = int(os.getenv('RESULT_PDF_MAX_BYTES', 10 * 1024 * 1024))
+# Queued uploads wait here for the ingestion worker, so it must be shared with the worker's host
+RESULT_UPLOAD_DIR = os.getenv('RESULT_UPLOAD_DIR', str(BASE_DIR / 'media' / 'result_uploads'))
+# How often each process checks the shared Subject catalogue version (apps/academics/subject_catalogue.py)
+SUBJECT_CATALOGUE_CHECK_SECONDS = float(os.getenv('SUBJECT_CATALOGUE_CHECK_SECONDS', 5))
+# Career model (apps/ml_engine/predictor.py): load at startup instead of on first use, and how often to check model.pkl for changes
+ML_MODEL_WARMUP = os.getenv('ML_MODEL_WARMUP', 'False').lower() in ('true', '1', 't')
+ML_MODEL_CHECK_SECONDS = float(os.getenv('ML_MODEL_CHECK_SECONDS', 30))
+# Optional shared inference server (apps/ml_engine/inference_server.py); empty keeps prediction in-process
+ML_INFERENCE_SOCKET = os.getenv('ML_INFERENCE_SOCKET', '')
+ML_INFERENCE_BATCH_WINDOW_MS = float(os.getenv('ML_INFERENCE_BATCH_WINDOW_MS', 5))
+ML_INFERENCE_MAX_BATCH = int(os.getenv('ML_INFERENCE_MAX_BATCH', 256))
+ML_INFERENCE_TIMEOUT = float(os.getenv('ML_INFERENCE_TIMEOUT', 2))
+ML_INFERENCE_RETRY_SECONDS = float(os.getenv('ML_INFERENCE_RETRY_SECONDS', 10))
+# Prediction memo (apps/ml_engine/prediction_cache.py); size 0 disables it, SHARED also uses CACHES['default']
+ML_PREDICTION_CACHE_SIZE = int(os.getenv('ML_PREDICTION_CACHE_SIZE', 10000))
+ML_PREDICTION_CACHE_TTL = float(os.getenv('ML_PREDICTION_CACHE_TTL', 3600))
+ML_PREDICTION_CACHE_QUANTUM = float(os.getenv('ML_PREDICTION_CACHE_QUANTUM', 0.01))
+ML_PREDICTION_CACHE_SHARED = os.getenv('ML_PREDICTION_CACHE_SHARED', 'False').lower() in ('true', '1', 't')
+
+# Shared by all gunicorn workers and the ingestion worker; `migrate` creates the tables (academics 0018, 0021).
+# 'state' holds version stamps that must outlive culling, so it has its own table, no expiry and no entry limit.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'django_cache'),
+    },
+    'state': {
+        'BACKEND': os.getenv('STATE_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('STATE_CACHE_LOCATION', 'django_cache_state'),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': sys.maxsize},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -177,3 +221,30 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Logging
+# https://docs.djangoproject.com/en/4.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'standard': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'standard',
+        },
+    },
+    'loggers': {
+        'apps': {
+            'handlers': ['console'],
+            'level': os.getenv('APP_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
@@ -189,20 +189,19 @@ export function ManualMarksEntry() {
         semData.some(sg => sg.grade !== '')
       );
 
-      for (const [semester, semData] of semestersToSubmit) {
-        const validSubjects = semData.filter(sg => sg.grade !== '');
-        
-        if (validSubjects.length > 0) {
-          await api.post('/academics/manual-marks/', {
-            semester: parseInt(semester),
-            subjects: validSubjects.map(sg => ({
+      // One request saves every semester atomically
+      await api.post('/academics/manual-marks/', {
+        semesters: semestersToSubmit.map(([semester, semData]) => ({
+          semester: parseInt(semester),
+          subjects: semData
+            .filter(sg => sg.grade !== '')
+            .map(sg => ({
               subject: sg.subject,
               marks: sg.marks,
               grade: sg.grade
             }))
-          });
-        }
-      }
+        }))
+      });
 
       toast({
         title: 'Success!',
@@ -6,6 +6,24 @@ import { toast } from '@/components/ui/use-toast';
 import api from '@/lib/api';
 import { Upload, FileText, X } from 'lucide-react';
 
+const JOB_POLL_INTERVAL_MS = 1500;
+const JOB_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+// Uploads are parsed by a background worker; poll until the job settles.
+async function waitForIngestionJob(jobId: number) {
+  const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+
+  while (Date.now() < deadline) {
+    const { data } = await api.get(`/academics/ingestion-jobs/${jobId}/`);
+    if (data.status === 'COMPLETED' || data.status === 'FAILED') {
+      return data;
+    }
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+
+  throw new Error('Processing is taking longer than expected. Please check back shortly.');
+}
+
 export function UploadResults() {
   const navigate = useNavigate();
   const [files, setFiles] = useState<{ [key: number]: File | null }>({
@@ -65,10 +83,15 @@ export function UploadResults() {
       });
 
       const response = await api.post('/academics/upload-result-pdf/', formData);
+      const job = await waitForIngestionJob(response.data.job_id);
+
+      if (job.status === 'FAILED') {
+        throw new Error(job.error || 'Failed to process PDFs');
+      }
 
       toast({
         title: 'Success!',
-        description: response.data.message,
+        description: `Results processed successfully (${job.total_subjects} subjects)`,
       });
 
       // Redirect to dashboard
@@ -78,7 +101,7 @@ export function UploadResults() {
       console.error('Upload error:', error);
       toast({
         title: 'Upload failed',
-        description: error.response?.data?.error || 'Failed to process PDFs',
+        description: error.response?.data?.error || error.message || 'Failed to process PDFs',
         variant: 'destructive',
       });
     } finally {